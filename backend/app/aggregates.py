@@ -0,0 +1,211 @@
+"""SQL-side aggregations used by /summary and /analytics/*.
+
+Every helper pushes SUM/GROUP BY down to the database, so the amount of
+Python work depends on the number of groups (kinds, categories, months),
+never on the number of transactions a user has. All-time totals and
+ranges on month boundaries read the ``MonthlyRollup`` table (see
+``rollup``), which holds a handful of rows per user and month; daily and
+weekly series and other ranges scan the ``(user_id, date)`` index.
+Sums are integer cents (see ``money``), so totals are exact.
+"""
+from datetime import datetime, time
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import and_, func
+from sqlmodel import Session, select
+from . import categories
+from .models import Budget, Category, MonthlyRollup, Transaction
+from .money import from_cents, raw_cents, sum_cents, to_cents
+
+UNCATEGORIZED = "Sem categoria"
+
+
+def month_key(session: Session):
+    """SQL expression rendering ``Transaction.date`` as 'YYYY-MM'."""
+    if session.get_bind().dialect.name == "postgresql":
+        return func.to_char(Transaction.date, "YYYY-MM")
+    return func.strftime("%Y-%m", Transaction.date)
+
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+
+def bucket_key(session: Session, granularity: str):
+    """SQL expression labelling ``Transaction.date`` with its period.
+
+    Weeks are labelled by their Monday ('YYYY-MM-DD').
+    """
+    if granularity == "month":
+        return month_key(session)
+    if session.get_bind().dialect.name == "postgresql":
+        if granularity == "week":
+            return func.to_char(func.date_trunc("week", Transaction.date), "YYYY-MM-DD")
+        return func.to_char(Transaction.date, "YYYY" if granularity == "year" else "YYYY-MM-DD")
+    if granularity == "week":
+        return func.date(Transaction.date, "weekday 0", "-6 days")
+    return func.strftime("%Y" if granularity == "year" else "%Y-%m-%d", Transaction.date)
+
+
+def _month_aligned(value: Optional[datetime]) -> bool:
+    return value is None or (value.day == 1 and value.time() == time())
+
+
+def _grouped(
+    session: Session,
+    user_id: int,
+    rollup_key,
+    transaction_key,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    """``(key, kind, cents)`` rows summed per key and kind over [from, to).
+
+    Ranges on month boundaries are answered from ``MonthlyRollup``; other
+    ranges, and keys the rollup cannot provide (``rollup_key=None``), fall
+    back to the ``(user_id, date)`` index on the transactions.
+    """
+    if rollup_key is not None and _month_aligned(date_from) and _month_aligned(date_to):
+        stmt = select(rollup_key, MonthlyRollup.kind, sum_cents(MonthlyRollup.total)).where(
+            MonthlyRollup.user_id == user_id
+        )
+        if date_from is not None:
+            stmt = stmt.where(MonthlyRollup.month >= date_from.strftime("%Y-%m"))
+        if date_to is not None:
+            stmt = stmt.where(MonthlyRollup.month < date_to.strftime("%Y-%m"))
+        key, kind = rollup_key, MonthlyRollup.kind
+    else:
+        stmt = select(
+            transaction_key, Transaction.kind, sum_cents(Transaction.amount)
+        ).where(Transaction.user_id == user_id)
+        if date_from is not None:
+            stmt = stmt.where(Transaction.date >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Transaction.date < date_to)
+        key, kind = transaction_key, Transaction.kind
+    return session.exec(stmt.group_by(key, kind).order_by(key)).all()
+
+
+def _by_key(rows, default_key: str = None) -> Dict[str, Dict[str, float]]:
+    # added up in cents; only the final totals become decimal amounts
+    grouped: Dict[str, Dict[str, int]] = {}
+    for key, kind, cents in rows:
+        bucket = grouped.setdefault(key or default_key, {"income": 0, "expense": 0})
+        bucket[kind] = bucket.get(kind, 0) + int(cents or 0)
+    return {
+        key: {kind: from_cents(cents) for kind, cents in bucket.items()}
+        for key, bucket in grouped.items()
+    }
+
+
+def totals_by_kind(
+    session: Session,
+    user_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Dict[str, float]:
+    rows = _grouped(
+        session, user_id, MonthlyRollup.kind, Transaction.kind, date_from, date_to
+    )
+    totals = {"income": 0.0, "expense": 0.0}
+    for _, kind, cents in rows:
+        if kind in totals:
+            totals[kind] = from_cents(cents or 0)
+    return totals
+
+
+def totals_by_month(
+    session: Session,
+    user_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Dict[str, Dict[str, float]]:
+    return totals_by_period(session, user_id, "month", date_from, date_to)
+
+
+def totals_by_period(
+    session: Session,
+    user_id: int,
+    granularity: str = "month",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Income and expense per day, week, month or year, oldest first."""
+    rollup_key = {
+        "month": MonthlyRollup.month,
+        "year": func.substr(MonthlyRollup.month, 1, 4),
+    }.get(granularity)
+    rows = _grouped(
+        session,
+        user_id,
+        rollup_key,
+        bucket_key(session, granularity),
+        date_from,
+        date_to,
+    )
+    return _by_key(rows)
+
+
+def totals_by_category(
+    session: Session,
+    user_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Income and expense per category name, grouped on the integer ids."""
+    rows = _grouped(
+        session,
+        user_id,
+        MonthlyRollup.category_id,
+        Transaction.category_id,
+        date_from,
+        date_to,
+    )
+    names = categories.names(session, user_id, {row[0] for row in rows})
+    named = sorted(
+        ((names.get(category_id), kind, cents) for category_id, kind, cents in rows),
+        key=lambda row: row[0] or "",
+    )
+    return _by_key(named, UNCATEGORIZED)
+
+
+def budget_execution(
+    session: Session, user_id: int, periods: Optional[Sequence[str]] = None
+) -> List[dict]:
+    """Planned vs. spent per (period, category) budget, in one grouped join.
+
+    Each budget matches at most one rollup row (its month, category and
+    kind 'expense'), so ``max`` picks the spending even when a category
+    has several budgets in the same period.
+    """
+    spent = raw_cents(func.coalesce(func.max(MonthlyRollup.total), 0))
+    stmt = (
+        select(Budget.period, Category.name, sum_cents(Budget.amount), spent)
+        .join(Category, Category.id == Budget.category_id)
+        .outerjoin(
+            MonthlyRollup,
+            and_(
+                MonthlyRollup.user_id == Budget.user_id,
+                MonthlyRollup.month == Budget.period,
+                MonthlyRollup.category_id == Budget.category_id,
+                MonthlyRollup.kind == "expense",
+            ),
+        )
+        .where(Budget.user_id == user_id)
+        .group_by(Budget.period, Budget.category_id, Category.name)
+        .order_by(Budget.period, Category.name)
+    )
+    if periods:
+        stmt = stmt.where(Budget.period.in_(periods))
+    return [
+        {
+            "period": period,
+            "category": category,
+            "planned": from_cents(planned or 0),
+            "spent": from_cents(total),
+            "remaining": from_cents(int(planned or 0) - int(total)),
+        }
+        for period, category, planned, total in session.exec(stmt).all()
+    ]
+
+
+def balance(totals: Dict[str, float]) -> float:
+    return from_cents(to_cents(totals["income"]) - to_cents(totals["expense"]))
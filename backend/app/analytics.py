@@ -0,0 +1,91 @@
+"""Result cache for /summary and /analytics/*.
+
+Entries are keyed by (user, query, data version). A write bumps the
+version, so entries are never invalidated explicitly; stale ones age out
+of the LRU. Concurrent identical requests that miss the cache (a
+dashboard opened in several tabs) are coalesced into a single query.
+
+With a shared cache backend, results are also stored there (as JSON), so
+a worker can reuse what another worker computed; the in-process LRU
+stays in front of it.
+"""
+import os
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional, Tuple
+import orjson
+from fastapi import HTTPException, Query, Request
+from . import backends
+from .cache import SingleFlight, TTLCache
+from .schemas import naive_utc
+
+CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "2048"))
+CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "3600"))
+
+result_cache = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+flights = SingleFlight()
+_MISSING = object()
+
+DateRange = Tuple[Optional[datetime], Optional[datetime]]
+
+
+def date_range(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+) -> DateRange:
+    """FastAPI dependency for ``?from=&to=``: [from, to), open-ended when omitted.
+
+    Bounds come back as naive UTC, like the stored dates.
+    """
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return date_from, date_to
+
+
+def cached(request: Request, user_id: int, query: Hashable, compute: Callable[[], Any]):
+    """``compute()`` at most once per (user, query, data version).
+
+    Call after ``versioning.conditional_get``, which records the version
+    it looked up on ``request.state``. The result is shared between
+    requests and must not be mutated.
+    """
+    key = (user_id, request.state.data_version, query)
+    value = result_cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    def load():
+        backend = backends.backend
+        if not backend.shared:
+            value = compute()
+        else:
+            # the timestamp tells apart a deleted user from one reusing the id
+            shared_key = "cf:analytics:{}:{}:{}:{}".format(
+                user_id, request.state.data_version, request.state.data_updated_at, query
+            )
+            stored = backend.get(shared_key)
+            if stored is not None:
+                value = orjson.loads(stored)
+            else:
+                value = compute()
+                backend.set(shared_key, orjson.dumps(value), ttl=CACHE_TTL_SECONDS)
+        result_cache.set(key, value)
+        return value
+
+    return flights.do(key, load)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget a deleted user's results: SQLite may hand the id to a new user."""
+    backends.bus.broadcast("analytics", user_id)
+
+
+def _forget(user_id: str) -> None:
+    result_cache.delete_keys(lambda key: key[0] == int(user_id))
+
+
+backends.bus.on("analytics", _forget)
+
+
+def stats() -> dict:
+    return {**result_cache.stats(), **flights.stats()}
@@ -1,10 +1,15 @@
+import math
+import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Generator
-from passlib.context import CryptContext
-from jose import jwt, JWTError
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import select, Session
+from . import backends, passwords
+from .cache import TTLCache
+from .ratelimit import RateLimiter
 from .models import User
 from .database import get_session
 
@@ -12,17 +17,39 @@ from .database import get_session
 SECRET_KEY = "dev-secret-change-me"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+# token -> authenticated user; skips the JWT decode and user lookup
+USER_CACHE_SIZE = 10_000
+USER_CACHE_TTL_SECONDS = 300
+# password-hashing endpoints per client IP, so hashing CPU can't be exhausted
+LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT", "10"))
+LOGIN_RATE_WINDOW_SECONDS = float(os.getenv("LOGIN_RATE_WINDOW_SECONDS", "60"))
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+token_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+# counted in the cache backend, so the limit holds across workers
+login_limiter = RateLimiter(
+    LOGIN_RATE_LIMIT, LOGIN_RATE_WINDOW_SECONDS, backend=backends.backend, name="login"
+)
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_and_update(plain_password, hashed_password)[0]
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return passwords.hash_password(password)
+
+
+def throttle_login(request: Request):
+    """Dependency limiting password-hashing requests per client IP."""
+    client = request.client.host if request.client else "unknown"
+    retry_after = login_limiter.hit(client)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -32,21 +59,72 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt  # imported on first use: it pulls in cryptography
+
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def authenticate_user(email: str, password: str, session: Session):
-    user = session.exec(select(User).where(User.email == email)).first()
+def user_by_email(email: str, session: Session) -> Optional[User]:
+    return session.exec(select(User).where(User.email == email)).first()
+
+
+def store_password_hash(user: User, hashed: str, session: Session) -> None:
+    user.hashed_password = hashed
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+
+
+async def authenticate_user(email: str, password: str, session: Session):
+    user = await run_in_threadpool(user_by_email, email, session)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await passwords.verify_and_update_async(
+        password, user.hashed_password
+    )
+    if not valid:
         return None
+    if new_hash:
+        # stored hash used other settings: upgrade it while we have the password
+        await run_in_threadpool(store_password_hash, user, new_hash, session)
     return user
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
-):
+def token_claims(user: User) -> dict:
+    # 'uid' turns a cache miss into a primary-key lookup
+    return {"sub": user.email, "uid": user.id}
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget every cached token of a user (password change, deletion).
+
+    Users hold password hashes, so they are only cached in-process; the
+    eviction is broadcast so the other workers drop their copies too.
+    """
+    backends.bus.broadcast("user", user_id)
+
+
+def _forget_user(user_id: str) -> int:
+    return token_cache.delete_where(lambda cached: cached.id == int(user_id))
+
+
+backends.bus.on("user", _forget_user)
+
+
+def _detached(user: User) -> User:
+    # cached users outlive the session that loaded them
+    return User(
+        id=user.id,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        created_at=user.created_at,
+    )
+
+
+def _load_user(token: str, session: Session) -> User:
+    """Decode ``token`` and load its user; blocking, so never run on the loop."""
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=401, detail="Could not validate credentials"
     )
@@ -57,7 +135,24 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = session.exec(select(User).where(User.email == email)).first()
-    if user is None:
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = session.get(User, user_id)
+    else:  # tokens issued before the 'uid' claim
+        user = session.exec(select(User).where(User.email == email)).first()
+    if user is None or user.email != email:
         raise credentials_exception
+    user = _detached(user)
+    token_cache.set(token, user, ttl=payload["exp"] - time.time())
     return user
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+):
+    # cache hits are answered on the event loop; the sync Session lookup
+    # behind a miss goes to the threadpool so it cannot stall other requests
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(_load_user, token, session)
@@ -0,0 +1,340 @@
+"""Cache and state backends shared by the worker processes.
+
+``CACHE_BACKEND_URL`` picks the backend:
+
+* ``memory://`` (default): per-process, for a single worker;
+* ``redis://[:password@]host:port/db``: a Redis server (or anything that
+  speaks its protocol) shared by every worker, through the small RESP
+  client below.
+
+Rate-limit counters and analytics results are stored in the backend.
+Caches that stay in-process (the per-token user cache holds password
+hashes, so it never leaves the process) are kept coherent by the
+``InvalidationBus``. An eviction made in one worker is published, and
+every other worker drops its local copy. A lost message is bounded by
+the cache TTL.
+
+A Redis outage degrades to cache misses and open rate limits; it never
+fails a request. After a network failure the backend stops calling Redis
+for ``REDIS_RETRY_SECONDS``, so requests don't each wait for the timeout.
+"""
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from .cache import TTLCache
+
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "memory://")
+# seconds to wait for the Redis server before treating it as down
+REDIS_TIMEOUT_SECONDS = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.5"))
+# after a network failure, serve the fallbacks this long before trying again
+REDIS_RETRY_SECONDS = float(os.getenv("REDIS_RETRY_SECONDS", "5"))
+
+INVALIDATION_CHANNEL = "cf:invalidate"
+
+logger = logging.getLogger(__name__)
+
+
+class Backend(ABC):
+    """Interface of a cache backend; keys are str, values are bytes."""
+
+    # True when other processes see the same data
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, ttl: float) -> int:
+        """Increment a counter that expires ``ttl`` seconds after its creation."""
+
+    @abstractmethod
+    def publish(self, channel: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Deliver messages to ``callback`` in a thread; returns a stop function."""
+
+
+class MemoryBackend(Backend):
+    def __init__(self, maxsize: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self._values = TTLCache(maxsize=maxsize, ttl=float("inf"), clock=clock)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set(self, key, value, ttl):
+        self._values.set(key, value, ttl=ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._values.delete(key)
+
+    def incr(self, key, ttl):
+        with self._lock:
+            count = self._values.get(key, 0) + 1
+            self._values.set(key, count, ttl=ttl)
+        return count
+
+    def publish(self, channel, message):
+        pass  # one process: the publisher already applied it locally
+
+    def subscribe(self, channel, callback):
+        return lambda: None
+
+
+class RedisError(Exception):
+    pass
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: Optional[float]):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+
+    def send(self, *commands) -> None:
+        out = bytearray()
+        for args in commands:
+            out += b"*%d\r\n" % len(args)
+            for arg in args:
+                if not isinstance(arg, bytes):
+                    arg = str(arg).encode()
+                out += b"$%d\r\n%s\r\n" % (len(arg), arg)
+        self.sock.sendall(out)
+
+    def read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self.reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self.read() for _ in range(size)]
+        raise RedisError(f"unexpected reply {line!r}")
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(Backend):
+    """Minimal RESP2 client: a small connection pool plus a pub/sub thread."""
+
+    shared = True
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = REDIS_TIMEOUT_SECONDS,
+        pool_size: int = 8,
+        retry_after: float = REDIS_RETRY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._clock = clock
+        self._down_until = 0.0  # no calls to Redis before this time
+        self._idle: "queue.LifoQueue[_Connection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self, timeout: Optional[float]) -> _Connection:
+        conn = _Connection(self.host, self.port, timeout)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            conn.send(*setup)
+            for _ in setup:
+                conn.read()
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect(self.timeout)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()  # state unknown after a failure
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def pipeline(self, *commands) -> List:
+        """Send ``commands`` in one round trip; returns their replies."""
+        with self._connection() as conn:
+            conn.send(*commands)
+            return [conn.read() for _ in commands]
+
+    def execute(self, *args):
+        return self.pipeline(args)[0]
+
+    def _safe(self, defaults: List, *commands) -> List:
+        """Replies to ``commands``, or ``defaults`` when Redis can't answer."""
+        if self._clock() < self._down_until:
+            return defaults
+        try:
+            return self.pipeline(*commands)
+        except OSError as exc:
+            self._down_until = self._clock() + self.retry_after
+            logger.warning(
+                "cache backend unavailable (%s), retrying in %ss: %s",
+                commands[0][0], self.retry_after, exc,
+            )
+        except RedisError as exc:
+            logger.warning("cache backend error (%s): %s", commands[0][0], exc)
+        return defaults
+
+    def get(self, key):
+        return self._safe([None], ("GET", key))[0]
+
+    def set(self, key, value, ttl):
+        self._safe([None], ("SET", key, value, "PX", max(1, int(ttl * 1000))))
+
+    def delete(self, *keys):
+        if keys:
+            self._safe([None], ("DEL", *keys))
+
+    def incr(self, key, ttl):
+        # fails open: 0 never reaches a limit
+        _, count = self._safe(
+            [None, 0], ("SET", key, 0, "PX", max(1, int(ttl * 1000)), "NX"), ("INCR", key)
+        )
+        return count
+
+    def publish(self, channel, message):
+        self._safe([None], ("PUBLISH", channel, message))
+
+    def subscribe(self, channel, callback):
+        stopped = threading.Event()
+        current: Dict[str, _Connection] = {}
+
+        def listen():
+            while not stopped.is_set():
+                try:
+                    conn = current["conn"] = self._connect(timeout=None)
+                    conn.send(("SUBSCRIBE", channel))
+                    conn.read()  # subscription confirmation
+                    while not stopped.is_set():
+                        reply = conn.read()
+                        if isinstance(reply, list) and reply[0] == b"message":
+                            callback(reply[2].decode())
+                except (OSError, RedisError, ValueError) as exc:
+                    if not stopped.is_set():
+                        logger.warning("cache backend subscription lost: %s", exc)
+                        stopped.wait(1.0)
+                finally:
+                    conn = current.pop("conn", None)
+                    if conn is not None:
+                        conn.close()
+
+        thread = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        thread.start()
+
+        def stop():
+            stopped.set()
+            conn = current.get("conn")
+            if conn is not None:
+                try:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            thread.join(timeout=2)
+
+        return stop
+
+
+def from_url(url: str) -> Backend:
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "redis":
+        return RedisBackend(url)
+    raise ValueError(f"unsupported CACHE_BACKEND_URL: {url}")
+
+
+class InvalidationBus:
+    """Run local eviction handlers here and in every other worker."""
+
+    def __init__(self, backend_getter: Callable[[], Backend], channel: str = INVALIDATION_CHANNEL):
+        self._backend = backend_getter
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._stop: Optional[Callable[[], None]] = None
+
+    def on(self, kind: str, handler: Callable[[str], None]) -> None:
+        self._handlers[kind] = handler
+
+    def broadcast(self, kind: str, value) -> None:
+        self._dispatch(kind, str(value))
+        self._backend().publish(self.channel, f"{self.origin} {kind} {value}")
+
+    def _dispatch(self, kind: str, value: str) -> None:
+        handler = self._handlers.get(kind)
+        if handler is not None:
+            handler(value)
+
+    def _receive(self, message: str) -> None:
+        try:
+            origin, kind, value = message.split(" ", 2)
+        except ValueError:
+            return
+        if origin != self.origin:
+            self._dispatch(kind, value)
+
+    def start(self) -> None:
+        if self._stop is None:
+            self._stop = self._backend().subscribe(self.channel, self._receive)
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop()
+            self._stop = None
+
+
+backend: Backend = from_url(CACHE_BACKEND_URL)
+bus = InvalidationBus(lambda: backend)
@@ -0,0 +1,86 @@
+"""Many transaction edits, deletes and payments in one request.
+
+Each operation becomes one set-based UPDATE or DELETE over its target
+rows. Targets are given either as ``id IN (...)`` or as the same filters
+``GET /transactions`` accepts. The whole batch runs in a single DB
+transaction:
+- one data version bump
+- rollup deltas computed with GROUP BY, never by loading rows
+- tombstones for deleted rows written with INSERT ... SELECT
+
+If any operation names an id the user does not own (or that an earlier
+operation deleted), nothing is applied.
+"""
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from . import categories, rollup, sync, versioning
+from .models import Transaction
+from .queries import filter_clauses
+from .schemas import BatchOperation
+
+# fields whose change moves a row between rollup groups
+ROLLUP_FIELDS = {"amount", "kind", "category_id", "date"}
+
+
+def _where(user_id: int, op: BatchOperation) -> list:
+    if op.ids is not None:
+        return [Transaction.user_id == user_id, Transaction.id.in_(set(op.ids))]
+    return filter_clauses(user_id, op.filter)
+
+
+def _check_ids(session: Session, index: int, op: BatchOperation, where: list) -> int:
+    found = set(session.exec(select(Transaction.id).where(*where)).all())
+    missing = sorted(set(op.ids) - found)
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={"operation": index, "missing_ids": missing[:100]},
+        )
+    return len(found)
+
+
+def run(session: Session, user_id: int, operations: List[BatchOperation]) -> List[dict]:
+    """Apply ``operations`` in order and commit; all or nothing."""
+    stamp = versioning.stamp(session, user_id)
+    results = []
+    try:
+        for index, op in enumerate(operations):
+            where = _where(user_id, op)
+            if op.ids is not None:
+                _check_ids(session, index, op, where)
+            if op.op == "delete":
+                rollup.apply(
+                    session, user_id, rollup.deltas_for_query(session, *where, sign=-1)
+                )
+                sync.bury_matching(session, user_id, Transaction, where, stamp["version"])
+                result = session.execute(
+                    delete(Transaction)
+                    .where(*where)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                if op.op == "pay":
+                    values = {"is_paid": True}
+                else:
+                    values = op.values.dict(exclude_unset=True)
+                    categories.assign(session, user_id, [values])
+                if ROLLUP_FIELDS & values.keys():
+                    removed = rollup.deltas_for_query(session, *where, sign=-1)
+                    rollup.apply(session, user_id, rollup.reassign(removed, values))
+                result = session.execute(
+                    update(Transaction)
+                    .where(*where)
+                    .values(**values, **stamp)
+                    .execution_options(synchronize_session=False)
+                )
+            results.append({"op": op.op, "matched": result.rowcount})
+    except Exception:
+        session.rollback()
+        raise
+    if not any(r["matched"] for r in results):
+        session.rollback()  # nothing changed: keep the data version
+    else:
+        session.commit()
+    return results
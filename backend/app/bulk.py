@@ -0,0 +1,161 @@
+"""Batched transaction writes.
+
+Bulk paths (imports, installment plans, ...) validate their rows up front
+and then insert them with chunked multi-row INSERTs inside the
+caller's transaction: one commit, one fsync, no per-row refresh.
+"""
+from datetime import datetime
+from typing import Iterable, List, Tuple
+from pydantic import validate_model
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from . import categories, rollup, versioning
+from .models import Transaction
+from .money import raw_cents, to_cents
+from .schemas import ImportLineError, TransactionImport, naive_utc
+
+CHUNK_SIZE = 1000
+# bound parameters of one statement: SQLite >= 3.32 takes 32766, Postgres 65535
+MAX_PARAMETERS = 32766
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+DedupKey = Tuple[datetime, int, str]  # amount in cents
+
+
+def validate_rows(
+    rows: Iterable[Tuple[int, dict]], user_id: int
+) -> Tuple[List[dict], List[ImportLineError]]:
+    """Validate ``(line, raw)`` pairs with ``TransactionImport``.
+
+    Returns the insertable values and one error per rejected line.
+    """
+    now = datetime.utcnow()
+    values, errors = [], []
+    for line, raw in rows:
+        # the values ``parse_obj(raw).dict()`` would give, without the model
+        row, _, error = validate_model(TransactionImport, raw)
+        if error is not None:
+            message = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                for err in error.errors()
+            )
+            errors.append(ImportLineError(line=line, error=message))
+            continue
+        row["user_id"] = user_id
+        if row["date"] is None:
+            row["date"] = now
+        else:
+            # stored naive UTC; dedupe compares with the values read back
+            row["date"] = naive_utc(row["date"])
+        values.append(row)
+    return values, errors
+
+
+def _key(row: dict) -> DedupKey:
+    return row["date"], to_cents(row["amount"]), row["description"]
+
+
+def drop_duplicates(session: Session, user_id: int, values: List[dict]) -> List[dict]:
+    """Drop rows whose (date, amount, description) already exists.
+
+    Only the user's rows on the batch's dates are read, ``CHUNK_SIZE``
+    dates per ``IN`` lookup on the ``(user_id, date)`` index; a range scan
+    over the batch's span read every row of a year-long statement.
+    """
+    if not values:
+        return values
+    dates = list({row["date"] for row in values})
+    existing = set()
+    for start in range(0, len(dates), CHUNK_SIZE):
+        existing.update(
+            session.exec(
+                select(Transaction.date, raw_cents(Transaction.amount), Transaction.description)
+                .where(Transaction.user_id == user_id)
+                .where(Transaction.date.in_(dates[start:start + CHUNK_SIZE]))
+            ).all()
+        )
+    unique = []
+    for row in values:
+        key = _key(row)
+        if key not in existing:
+            existing.add(key)
+            unique.append(row)
+    return unique
+
+
+def insert_transactions(session: Session, values: List[dict]) -> int:
+    """Insert ``values`` with multi-row INSERTs of ``CHUNK_SIZE`` rows (no commit).
+
+    One statement per chunk, not one per row: on SQLite the search index
+    triggers flush their pending words at the end of every statement, and
+    an ``executemany`` of single-row INSERTs spent most of its time there.
+    The SQL is written here because SQLAlchemy 1.4 compiles a multi-row
+    ``values()`` bind by bind, which costs more than the rows it saves.
+    Columns missing from every row get their Python default, as
+    ``insert()`` would give them.
+    """
+    if not values:
+        return 0
+    connection = session.connection()
+    dialect = connection.dialect
+    placeholder = _PLACEHOLDERS.get(dialect.paramstyle)
+    table = Transaction.__table__
+    if placeholder is None:
+        for start in range(0, len(values), CHUNK_SIZE):
+            session.execute(insert(table), values[start:start + CHUNK_SIZE])
+        return len(values)
+
+    keys = set().union(*values)
+    columns, defaults = [], {}
+    for column in table.columns:
+        if column.key in keys:
+            columns.append(column)
+        elif column.default is not None and column.default.is_scalar:
+            defaults[column] = column.default.arg
+        elif column.default is not None and column.default.is_callable:
+            defaults[column] = column.default.arg(None)
+    columns += defaults
+    processors = [column.type.dialect_impl(dialect).bind_processor(dialect) for column in columns]
+    quote = dialect.identifier_preparer.quote
+    head = (
+        f"INSERT INTO {dialect.identifier_preparer.format_table(table)} "
+        f"({', '.join(quote(column.name) for column in columns)}) VALUES "
+    )
+    row_sql = f"({', '.join([placeholder] * len(columns))})"
+    per_statement = min(CHUNK_SIZE, MAX_PARAMETERS // len(columns))
+    for start in range(0, len(values), per_statement):
+        chunk = values[start:start + per_statement]
+        # column by column, each distinct value bound once (the stamp's
+        # ``updated_at`` is the same datetime on every row)
+        cells = []
+        for column, process in zip(columns, processors):
+            default = defaults.get(column)
+            cell = [row.get(column.key, default) for row in chunk]
+            if process is not None:
+                bound = {value: process(value) for value in set(cell) if value is not None}
+                bound[None] = None
+                cell = [bound[value] for value in cell]
+            cells.append(cell)
+        params = tuple(value for row in zip(*cells) for value in row)
+        connection.exec_driver_sql(head + ", ".join([row_sql] * len(chunk)), params)
+    return len(values)
+
+
+def import_rows(
+    session: Session, user_id: int, rows: Iterable[Tuple[int, dict]], dedupe: bool
+):
+    values, errors = validate_rows(rows, user_id)
+    unique = drop_duplicates(session, user_id, values) if dedupe else values
+    if unique:
+        categories.assign(session, user_id, unique)
+        stamp = versioning.stamp(session, user_id)
+        for row in unique:
+            row.update(stamp)
+    inserted = insert_transactions(session, unique)
+    rollup.add(session, user_id, unique)
+    session.commit()
+    return {
+        "inserted": inserted,
+        "skipped": len(values) - len(unique),
+        "errors": errors,
+    }
@@ -0,0 +1,147 @@
+"""Per-user categories, stored once and referenced by integer id.
+
+Transactions, budgets, recurring rules and rollups keep a
+``category_id``; the API keeps speaking names. Writes turn names into
+ids with ``assign`` (creating the missing categories), reads get the
+name back from the ``category`` column property of each model, and
+grouping and joins run on the integer keys.
+
+Both directions are cached per process. A category is never renamed or
+deleted while its user exists, so entries only go stale when a user is
+deleted; ``invalidate_user`` drops them in every worker. Categories
+created by a transaction that is not committed yet are not cached.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlmodel import Session, select
+from . import backends
+from .cache import TTLCache
+from .models import Category
+
+CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", "50000"))
+CACHE_TTL_SECONDS = float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "3600"))
+
+# rollup key of uncategorized transactions (the rollup primary key can't be NULL)
+UNCATEGORIZED_ID = 0
+
+_ids = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS)  # (user, name) -> id
+_names = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS)  # (user, id) -> name
+
+
+def _insert_missing(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Category.__table__).on_conflict_do_nothing()
+
+
+def resolve(session: Session, user_id: int, names: Iterable[Optional[str]]) -> Dict[str, int]:
+    """Ids of ``names`` (empty ones skipped), creating missing categories (no commit)."""
+    ids: Dict[str, int] = {}
+    missing = set()
+    for name in names:
+        if not name or name in ids:
+            continue
+        cached = _ids.get((user_id, name))
+        if cached is None:
+            missing.add(name)
+        else:
+            ids[name] = cached
+    if not missing:
+        return ids
+
+    def lookup():
+        return session.exec(
+            select(Category.name, Category.id).where(
+                Category.user_id == user_id, Category.name.in_(missing)
+            )
+        ).all()
+
+    found = dict(lookup())
+    uncommitted = _created(session)
+    for name, category_id in found.items():
+        if (user_id, name) not in uncommitted:
+            _ids.set((user_id, name), category_id)
+    new = missing - found.keys()
+    if new:
+        now = datetime.utcnow()
+        session.execute(
+            _insert_missing(session),
+            [{"user_id": user_id, "name": name, "created_at": now} for name in new],
+        )
+        uncommitted.update((user_id, name) for name in new)
+        found = dict(lookup())
+    ids.update(found)
+    return ids
+
+
+def _created(session: Session) -> set:
+    """(user, name) of categories inserted by the session's open transaction."""
+    transaction = session.get_transaction()
+    owner, created = session.info.get("categories_created", (None, set()))
+    if owner is not transaction:
+        created = set()
+        session.info["categories_created"] = (transaction, created)
+    return created
+
+
+def assign(session: Session, user_id: int, rows: List[dict]) -> List[dict]:
+    """Replace the ``category`` name of each row dict with its ``category_id``."""
+    ids = resolve(session, user_id, (row.get("category") for row in rows))
+    for row in rows:
+        if "category" in row:
+            row["category_id"] = ids.get(row.pop("category"))
+    return rows
+
+
+def names(session: Session, user_id: int, ids: Iterable[int]) -> Dict[int, str]:
+    """Names of the user's categories ``ids`` (unknown ids are left out)."""
+    result: Dict[int, str] = {}
+    missing = set()
+    for category_id in ids:
+        if not category_id:
+            continue
+        cached = _names.get((user_id, category_id))
+        if cached is None:
+            missing.add(category_id)
+        else:
+            result[category_id] = cached
+    if missing:
+        rows = session.exec(
+            select(Category.id, Category.name).where(
+                Category.user_id == user_id, Category.id.in_(missing)
+            )
+        ).all()
+        for category_id, name in rows:
+            _names.set((user_id, category_id), name)
+            result[category_id] = name
+    return result
+
+
+def id_subquery(user_id: int, name: str):
+    """SQL selecting the id of the user's category ``name``, for filters."""
+    return select(Category.id).where(Category.user_id == user_id, Category.name == name)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget a deleted user's categories: their ids may be handed out again."""
+    backends.bus.broadcast("categories", user_id)
+
+
+def _forget(user_id: str) -> None:
+    for cache in (_ids, _names):
+        cache.delete_keys(lambda key: key[0] == int(user_id))
+
+
+def clear() -> None:
+    _ids.clear()
+    _names.clear()
+
+
+def stats() -> dict:
+    return {f"ids_{k}": v for k, v in _ids.stats().items()}
+
+
+backends.bus.on("categories", _forget)
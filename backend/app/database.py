@@ -1,15 +1,97 @@
-from sqlmodel import SQLModel, create_engine, Session
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+from sqlmodel import create_engine, Session
 from typing import Generator, Optional
+# search registers the SQL function its triggers call on every connection
+from . import migrations, search  # noqa: F401
 
-DATABASE_URL = "sqlite:///./controle_financeiro.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./controle_financeiro.db")
 engine = None
+# upgrade the schema on boot instead of only checking it (single process)
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "0") == "1"
 
+# Pool settings (ignored for in-memory SQLite)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
-def init_db(db_url: Optional[str] = None):
+# Applied to every new SQLite connection. WAL lets readers run alongside
+# the writer instead of queueing on the rollback journal.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # KiB when < 0
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record, pragmas) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(
+    db_url: Optional[str] = None, sqlite_pragmas: Optional[dict] = None
+) -> Engine:
+    """Build an engine configured from the environment.
+
+    SQLite files get a real connection pool plus ``SQLITE_PRAGMAS``;
+    other backends (e.g. ``postgresql+psycopg2://``) get the pool settings
+    and ``pool_pre_ping``.
+    """
+    url = make_url(db_url or DATABASE_URL)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+    connect_args = {"check_same_thread": False}
+    if url.database in (None, "", ":memory:"):
+        return create_engine(url, connect_args=connect_args)
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    pragmas = SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+    event.listen(
+        engine,
+        "connect",
+        lambda conn, record: _set_sqlite_pragmas(conn, record, pragmas),
+    )
+    return engine
+
+
+def init_db(db_url: Optional[str] = None, migrate: Optional[bool] = None):
+    """Create the engine and make sure the schema is current.
+
+    Schema changes are a deploy step (``python -m app.migrations``): by
+    default this only checks the version, with one query, and refuses to
+    start on an outdated database. ``migrate`` (default
+    ``MIGRATE_ON_STARTUP``) upgrades it instead.
+    """
     global engine
-    url = db_url if db_url else DATABASE_URL
-    engine = create_engine(url, connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
+    engine = create_db_engine(db_url)
+    if MIGRATE_ON_STARTUP if migrate is None else migrate:
+        migrations.upgrade(engine)
+    else:
+        migrations.check(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -0,0 +1,83 @@
+"""Streaming export of a user's transactions as NDJSON or CSV.
+
+Rows are read through a server-side cursor (``yield_per``) and encoded in
+small chunks, so memory stays flat and the first bytes go out before the
+query has finished, whatever the size of the history.
+"""
+import csv
+import io
+import json
+from typing import Iterator
+from sqlmodel import Session, select
+from .models import Transaction
+from .queries import apply_filters, newest_first
+from .schemas import TransactionFilters
+
+EXPORT_FIELDS = (
+    "id",
+    "date",
+    "description",
+    "amount",
+    "kind",
+    "category",
+    "is_paid",
+    "installment_total",
+    "installment_index",
+)
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+BATCH_SIZE = 1000
+
+
+def iter_rows(
+    session: Session, user_id: int, filters: TransactionFilters
+) -> Iterator[tuple]:
+    columns = [getattr(Transaction, name) for name in EXPORT_FIELDS]
+    stmt = newest_first(apply_filters(select(*columns), user_id, filters))
+    result = session.execute(stmt.execution_options(yield_per=BATCH_SIZE))
+    for partition in result.partitions():
+        yield from partition
+
+
+def _ndjson_line(row: tuple) -> str:
+    record = dict(zip(EXPORT_FIELDS, row))
+    record["date"] = record["date"].isoformat()
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_ndjson(
+    session: Session, user_id: int, filters: TransactionFilters
+) -> Iterator[str]:
+    chunk = []
+    for row in iter_rows(session, user_id, filters):
+        chunk.append(_ndjson_line(row))
+        if len(chunk) >= BATCH_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_csv(
+    session: Session, user_id: int, filters: TransactionFilters
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for i, row in enumerate(iter_rows(session, user_id, filters), 1):
+        writer.writerow((row[0], row[1].isoformat()) + tuple(row[2:]))
+        if i % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_export(
+    fmt: str, session: Session, user_id: int, filters: TransactionFilters
+) -> Iterator[str]:
+    if fmt == "csv":
+        return iter_csv(session, user_id, filters)
+    return iter_ndjson(session, user_id, filters)
@@ -0,0 +1,91 @@
+"""Parsers turning uploaded bank statements into raw transaction dicts.
+
+Parsers only split the file into ``(line, raw)`` pairs; validation is left
+to ``bulk.validate_rows`` so every format reports errors the same way.
+"""
+import csv
+import io
+import re
+from datetime import datetime
+from typing import Iterator, Tuple
+
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y %H:%M")
+
+
+def decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # most Brazilian banks still export OFX/CSV in cp1252
+        return data.decode("cp1252", errors="replace")
+
+
+def _parse_amount(value: str) -> float:
+    value = value.strip().replace("R$", "").replace(" ", "")
+    if "," in value:
+        # '1.234,56' -> '1234.56'
+        value = value.replace(".", "").replace(",", ".")
+    return float(value)
+
+
+def _parse_date(value: str):
+    value = value.strip()
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    # let pydantic report the bad value
+    return value
+
+
+def _signed(raw: dict, amount) -> dict:
+    """Statements encode debits as negative amounts when there is no kind."""
+    if isinstance(amount, float) and not raw.get("kind"):
+        raw["kind"] = "expense" if amount < 0 else "income"
+        amount = abs(amount)
+    raw["amount"] = amount
+    return raw
+
+
+def parse_csv(text: str) -> Iterator[Tuple[int, dict]]:
+    """CSV with a header row: date, description, amount[, kind, category, is_paid]."""
+    sample = text[:2048]
+    delimiter = ";" if sample.count(";") > sample.count(",") else ","
+    reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+    for raw in reader:
+        row = {k.strip().lower(): (v or "").strip() for k, v in raw.items() if k}
+        row = {k: v for k, v in row.items() if v != ""}
+        if "date" in row:
+            row["date"] = _parse_date(row["date"])
+        amount = row.get("amount")
+        if amount is not None:
+            try:
+                amount = _parse_amount(amount)
+            except ValueError:
+                pass
+        yield reader.line_num, _signed(row, amount)
+
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|$)", re.S | re.I)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def parse_ofx(text: str) -> Iterator[Tuple[int, dict]]:
+    """OFX 1.x (SGML) or 2.x (XML) statements; ``line`` is the STMTTRN ordinal."""
+    for index, match in enumerate(_OFX_TRANSACTION.finditer(text), 1):
+        fields = {k.upper(): v.strip() for k, v in _OFX_FIELD.findall(match.group(1))}
+        row = {"description": fields.get("MEMO") or fields.get("NAME")}
+        posted = fields.get("DTPOSTED", "")
+        try:
+            row["date"] = datetime.strptime(posted[:8], "%Y%m%d")
+        except ValueError:
+            row["date"] = posted
+        try:
+            amount = _parse_amount(fields.get("TRNAMT", ""))
+        except ValueError:
+            amount = fields.get("TRNAMT")
+        yield index, _signed(row, amount)
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx}
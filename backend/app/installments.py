@@ -0,0 +1,123 @@
+"""Installment plans created and settled as a whole.
+
+A plan is one batched insert of N rows sharing an ``installment_group``;
+paying or cancelling what is left of it is a single set-based
+UPDATE/DELETE instead of one request per installment.
+"""
+import calendar
+import uuid
+from datetime import datetime
+from typing import List
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from . import categories, rollup, sync, versioning
+from .bulk import insert_transactions
+from .models import Transaction
+from .money import from_cents, to_cents
+from .schemas import InstallmentPlanCreate
+
+
+def add_months(date: datetime, months: int) -> datetime:
+    """Same day ``months`` later, clamped to the end of shorter months."""
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    day = min(date.day, calendar.monthrange(year, month)[1])
+    return date.replace(year=year, month=month, day=day)
+
+
+def split_amount(total: float, parts: int) -> List[float]:
+    """Split ``total`` in cents; the last installment absorbs the rounding."""
+    cents = to_cents(total)
+    share = cents // parts
+    amounts = [share] * parts
+    amounts[-1] += cents - share * parts
+    return [from_cents(c) for c in amounts]
+
+
+def create_plan(session: Session, user_id: int, plan: InstallmentPlanCreate):
+    group = uuid.uuid4().hex
+    first = plan.first_date or datetime.utcnow()
+    stamp = versioning.stamp(session, user_id)
+    category_ids = categories.resolve(session, user_id, [plan.category])
+    values = [
+        {
+            "user_id": user_id,
+            "description": plan.description,
+            "amount": amount,
+            "kind": plan.kind,
+            "category_id": category_ids.get(plan.category),
+            "date": add_months(first, i),
+            "is_paid": False,
+            "installment_total": plan.installments,
+            "installment_index": i + 1,
+            "installment_group": group,
+            **stamp,
+        }
+        for i, amount in enumerate(split_amount(plan.total_amount, plan.installments))
+    ]
+    insert_transactions(session, values)
+    rollup.add(session, user_id, values)
+    session.commit()
+    return group, list_plan(session, user_id, group)
+
+
+def list_plan(session: Session, user_id: int, group: str) -> List[Transaction]:
+    return session.exec(
+        select(Transaction)
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.installment_group == group,
+        )
+        .order_by(Transaction.installment_index)
+    ).all()
+
+
+def _remaining_filter(user_id: int, group: str):
+    return (
+        Transaction.user_id == user_id,
+        Transaction.installment_group == group,
+        Transaction.is_paid == False,  # noqa: E712
+    )
+
+
+def _remaining(stmt, user_id: int, group: str):
+    return stmt.where(*_remaining_filter(user_id, group)).execution_options(
+        synchronize_session=False
+    )
+
+
+def pay_remaining(session: Session, user_id: int, group: str) -> int:
+    stamp = versioning.stamp(session, user_id)
+    result = session.execute(
+        _remaining(update(Transaction), user_id, group).values(is_paid=True, **stamp)
+    )
+    if not result.rowcount:
+        session.rollback()  # nothing changed: keep the data version
+        return 0
+    session.commit()
+    return result.rowcount
+
+
+def cancel_remaining(session: Session, user_id: int, group: str) -> int:
+    where = _remaining_filter(user_id, group)
+    rollup.apply(session, user_id, rollup.deltas_for_query(session, *where, sign=-1))
+    version = versioning.bump(session, user_id)
+    sync.bury_matching(session, user_id, Transaction, where, version)
+    result = session.execute(_remaining(delete(Transaction), user_id, group))
+    if not result.rowcount:
+        session.rollback()
+        return 0
+    session.commit()
+    return result.rowcount
+
+
+def plan_exists(session: Session, user_id: int, group: str) -> bool:
+    return (
+        session.exec(
+            select(Transaction.id).where(
+                Transaction.user_id == user_id,
+                Transaction.installment_group == group,
+            )
+        ).first()
+        is not None
+    )
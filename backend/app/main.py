@@ -1,25 +1,98 @@
-from fastapi import FastAPI, Depends, HTTPException
+import os
+from typing import Optional
+from fastapi import (
+    FastAPI,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    Body,
+    File,
+    Form,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select, Session
+from . import (
+    aggregates,
+    analytics,
+    backends,
+    batch,
+    categories,
+    installments,
+    metrics,
+    passwords,
+    recurring,
+    rollup,
+    search,
+    serialization,
+    sync,
+    versioning,
+)
 from .database import init_db, get_session
-from .models import User, Transaction, Budget
+from .models import (
+    User,
+    Transaction,
+    Budget,
+    Category,
+    MonthlyRollup,
+    RecurringRule,
+    Tombstone,
+)
 from .schemas import (
     UserCreate,
+    PasswordChange,
     Token,
     TransactionCreate,
     TransactionRead,
     BudgetCreate,
     BudgetRead,
+    BudgetExecution,
+    TransactionFilters,
+    BulkImportResult,
+    BatchRequest,
+    BatchResult,
+    InstallmentPlanCreate,
+    InstallmentPlanRead,
+    RecurringRuleCreate,
+    RecurringRuleRead,
+    SyncResponse,
+)
+from .bulk import import_rows
+from .importers import PARSERS, decode
+from .queries import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    transaction_filters,
+    apply_filters,
+    newest_first,
+    after_cursor,
+    encode_cursor,
 )
+from .export import EXPORT_FORMATS, iter_export
 from .auth import (
-    get_password_hash,
     authenticate_user,
     create_access_token,
     get_current_user,
+    invalidate_user,
+    store_password_hash,
+    throttle_login,
+    token_cache,
+    token_claims,
+    user_by_email,
 )
 
-app = FastAPI(title="Controle Financeiro API")
+# responses smaller than this (bytes) are sent uncompressed; 0 disables gzip
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+
+app = FastAPI(title="Controle Financeiro API", default_response_class=ORJSONResponse)
 
 # CORS
 app.add_middleware(
@@ -32,36 +105,71 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Server-Timing"],
 )
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument()
 
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    recurring.start()
+    backends.bus.start()
 
 
-@app.post("/auth/register", response_model=Token)
-def register(user: UserCreate, session: Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == user.email)).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = User(email=user.email, hashed_password=get_password_hash(user.password))
+@app.on_event("shutdown")
+async def on_shutdown():
+    await recurring.stop()
+    await run_in_threadpool(backends.bus.stop)
+    passwords.shutdown()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint; keep it off the public internet."""
+    return metrics.render(
+        {
+            "user": token_cache.stats(),
+            "analytics": analytics.stats(),
+            "category": categories.stats(),
+        }
+    )
+
+
+def _add_user(email: str, hashed_password: str, session: Session) -> User:
+    db_user = User(email=email, hashed_password=hashed_password)
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
-    access_token = create_access_token({"sub": db_user.email})
+    return db_user
+
+
+# Password hashing runs in passwords' process pool; the sync DB work around it
+# goes to the threadpool, so these handlers never block the event loop.
+@app.post(
+    "/auth/register", response_model=Token, dependencies=[Depends(throttle_login)]
+)
+async def register(user: UserCreate, session: Session = Depends(get_session)):
+    if await run_in_threadpool(user_by_email, user.email, session):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    hashed = await passwords.hash_password_async(user.password)
+    db_user = await run_in_threadpool(_add_user, user.email, hashed, session)
+    access_token = create_access_token(token_claims(db_user))
     return {"access_token": access_token}
 
 
-@app.post("/auth/token", response_model=Token)
-def login(
+@app.post("/auth/token", response_model=Token, dependencies=[Depends(throttle_login)])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session),
 ):
-    user = authenticate_user(form_data.username, form_data.password, session)
+    user = await authenticate_user(form_data.username, form_data.password, session)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_access_token(token_claims(user))
     return {"access_token": access_token}
 
 
@@ -71,102 +179,274 @@ def create_transaction(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    db_tr = Transaction(user_id=current_user.id, **tr.dict())
+    (data,) = categories.assign(session, current_user.id, [tr.dict()])
+    db_tr = Transaction(user_id=current_user.id, **data)
+    versioning.touch(session, current_user.id, db_tr)
     session.add(db_tr)
+    rollup.add(session, current_user.id, [db_tr])
     session.commit()
     session.refresh(db_tr)
     return db_tr
 
 
+@app.post("/transactions/bulk", response_model=BulkImportResult)
+def bulk_create_transactions(
+    items: list[dict] = Body(...),
+    dedupe: bool = Query(False),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Insert a JSON array of transactions in one DB transaction.
+
+    Invalid entries are reported by array position (starting at 1) and
+    skipped; ``dedupe`` skips entries whose (date, amount, description)
+    already exists.
+    """
+    return import_rows(session, current_user.id, enumerate(items, 1), dedupe)
+
+
+@app.post("/transactions/import", response_model=BulkImportResult)
+def import_transactions(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Form(None, alias="format", pattern="^(csv|ofx)$"),
+    dedupe: bool = Form(False),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Import a CSV or OFX bank statement (format inferred from the file name)."""
+    if fmt is None:
+        fmt = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if fmt not in PARSERS:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    rows = PARSERS[fmt](decode(file.file.read()))
+    return import_rows(session, current_user.id, rows, dedupe)
+
+
+@app.post("/transactions/installments", response_model=InstallmentPlanRead)
+def create_installment_plan(
+    plan: InstallmentPlanCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Create every installment of a purchase, one month apart, in one batch."""
+    group, rows = installments.create_plan(session, current_user.id, plan)
+    return {"installment_group": group, "transactions": rows}
+
+
+@app.post("/transactions/installments/{group}/pay")
+def pay_remaining_installments(
+    group: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    updated = installments.pay_remaining(session, current_user.id, group)
+    if not updated and not installments.plan_exists(session, current_user.id, group):
+        raise HTTPException(status_code=404, detail="Installment plan not found")
+    return {"updated": updated}
+
+
+@app.delete("/transactions/installments/{group}")
+def cancel_remaining_installments(
+    group: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Delete the unpaid installments of a plan; paid ones are kept."""
+    deleted = installments.cancel_remaining(session, current_user.id, group)
+    if not deleted and not installments.plan_exists(session, current_user.id, group):
+        raise HTTPException(status_code=404, detail="Installment plan not found")
+    return {"deleted": deleted}
+
+
 @app.get("/transactions", response_model=list[TransactionRead])
 def list_transactions(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    filters: TransactionFilters = Depends(transaction_filters),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    rows = session.exec(
-        select(Transaction)
-        .where(Transaction.user_id == current_user.id)
-        .order_by(Transaction.date.desc())
-    ).all()
-    return rows
+    """Newest-first page of transactions.
+
+    When more rows exist, ``X-Next-Cursor`` carries the cursor for the next
+    page; pass it back unchanged as ``?cursor=``.
+    """
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    columns = serialization.read_columns(Transaction, TransactionRead)
+    stmt = apply_filters(select(*columns), current_user.id, filters)
+    stmt = newest_first(after_cursor(stmt, cursor)).limit(limit + 1)
+    rows = session.exec(stmt).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].date, rows[-1].id)
+    return serialization.json_response(
+        serialization.records(rows, TransactionRead), response
+    )
+
+
+@app.get("/transactions/search", response_model=list[TransactionRead])
+def search_transactions(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    filters: TransactionFilters = Depends(transaction_filters),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Transactions whose description matches every word of ``q``, best first.
+
+    Words match as prefixes, ignoring case and accents. Paginates like
+    ``GET /transactions`` through ``X-Next-Cursor``.
+    """
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    if not search.terms(q):
+        return serialization.json_response([], response)
+    columns = serialization.read_columns(Transaction, TransactionRead)
+    stmt = apply_filters(select(*columns), current_user.id, filters)
+    stmt = search.search_stmt(session, stmt, current_user.id, q, cursor).limit(limit + 1)
+    rows = session.exec(stmt).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = search.encode_cursor(
+            rows[-1].search_score, rows[-1].id
+        )
+    return serialization.json_response(
+        serialization.records(rows, TransactionRead), response
+    )
+
+
+@app.get("/transactions/export")
+def export_transactions(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filters: TransactionFilters = Depends(transaction_filters),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Stream the whole (filtered) history as NDJSON or CSV."""
+    return StreamingResponse(
+        iter_export(fmt, session, current_user.id, filters),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{fmt}"'
+        },
+    )
 
 
 @app.get("/summary")
 def get_summary(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    transactions = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
-    total_income = sum(tr.amount for tr in transactions if tr.kind == "income")
-    total_expense = sum(tr.amount for tr in transactions if tr.kind == "expense")
-    return {
-        "total_income": total_income,
-        "total_expense": total_expense,
-        "balance": total_income - total_expense,
-    }
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+
+    def compute():
+        totals = aggregates.totals_by_kind(session, current_user.id)
+        return {
+            "total_income": totals["income"],
+            "total_expense": totals["expense"],
+            "balance": aggregates.balance(totals),
+        }
+
+    return analytics.cached(request, current_user.id, ("summary",), compute)
 
 
 @app.get("/analytics/overview")
 def analytics_overview(
+    request: Request,
+    response: Response,
+    period: analytics.DateRange = Depends(analytics.date_range),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    transactions = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
-    total_income = sum(tr.amount for tr in transactions if tr.kind == "income")
-    total_expense = sum(tr.amount for tr in transactions if tr.kind == "expense")
-    # Monthly breakdown
-    monthly = {}
-    for tr in transactions:
-        key = tr.date.strftime("%Y-%m")
-        if key not in monthly:
-            monthly[key] = {"income": 0.0, "expense": 0.0}
-        monthly[key][tr.kind] += tr.amount
-    return {
-        "totals": {
-            "income": total_income,
-            "expense": total_expense,
-            "balance": total_income - total_expense,
-        },
-        "monthly": monthly,
-    }
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+
+    def compute():
+        totals = aggregates.totals_by_kind(session, current_user.id, *period)
+        return {
+            "totals": {
+                "income": totals["income"],
+                "expense": totals["expense"],
+                "balance": aggregates.balance(totals),
+            },
+            "monthly": aggregates.totals_by_month(session, current_user.id, *period),
+        }
+
+    return analytics.cached(request, current_user.id, ("overview", *period), compute)
 
 
 @app.get("/analytics/categories")
 def analytics_categories(
+    request: Request,
+    response: Response,
+    period: analytics.DateRange = Depends(analytics.date_range),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    rows = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
-    by_cat = {}
-    for tr in rows:
-        cat = tr.category or "Sem categoria"
-        if cat not in by_cat:
-            by_cat[cat] = {"income": 0.0, "expense": 0.0}
-        by_cat[cat][tr.kind] += tr.amount
-    return by_cat
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    return analytics.cached(
+        request,
+        current_user.id,
+        ("categories", *period),
+        lambda: aggregates.totals_by_category(session, current_user.id, *period),
+    )
 
 
 @app.get("/analytics/monthly")
 def analytics_monthly(
+    request: Request,
+    response: Response,
+    period: analytics.DateRange = Depends(analytics.date_range),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    rows = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
-    monthly = {}
-    for tr in rows:
-        key = tr.date.strftime("%Y-%m")
-        if key not in monthly:
-            monthly[key] = {"income": 0.0, "expense": 0.0}
-        monthly[key][tr.kind] += tr.amount
-    return monthly
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    return analytics.cached(
+        request,
+        current_user.id,
+        ("period", "month", *period),
+        lambda: aggregates.totals_by_month(session, current_user.id, *period),
+    )
+
+
+@app.get("/analytics/series")
+def analytics_series(
+    request: Request,
+    response: Response,
+    granularity: str = Query("month", pattern="^(day|week|month|year)$"),
+    period: analytics.DateRange = Depends(analytics.date_range),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Income and expense per day, week (keyed by its Monday), month or year."""
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    return analytics.cached(
+        request,
+        current_user.id,
+        ("period", granularity, *period),
+        lambda: aggregates.totals_by_period(
+            session, current_user.id, granularity, *period
+        ),
+    )
 
 
 # Budgets CRUD
@@ -176,7 +456,9 @@ def create_budget(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    budget = Budget(user_id=current_user.id, **payload.dict())
+    (data,) = categories.assign(session, current_user.id, [payload.dict()])
+    budget = Budget(user_id=current_user.id, **data)
+    versioning.touch(session, current_user.id, budget)
     session.add(budget)
     session.commit()
     session.refresh(budget)
@@ -185,12 +467,32 @@ def create_budget(
 
 @app.get("/budgets", response_model=list[BudgetRead])
 def list_budgets(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    return session.exec(
-        select(Budget).where(Budget.user_id == current_user.id)
-    ).all()
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    columns = serialization.read_columns(Budget, BudgetRead)
+    rows = session.exec(select(*columns).where(Budget.user_id == current_user.id)).all()
+    return serialization.json_response(serialization.records(rows, BudgetRead), response)
+
+
+@app.get("/budgets/execution", response_model=list[BudgetExecution])
+def budget_execution(
+    request: Request,
+    response: Response,
+    period: Optional[list[str]] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Planned vs. spent vs. remaining per budget; all periods by default."""
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    return aggregates.budget_execution(session, current_user.id, period)
 
 
 @app.put("/budgets/{budget_id}", response_model=BudgetRead)
@@ -205,8 +507,10 @@ def update_budget(
     ).first()
     if not budget:
         raise HTTPException(status_code=404, detail="Budget not found")
-    for k, v in payload.dict().items():
+    (data,) = categories.assign(session, current_user.id, [payload.dict()])
+    for k, v in data.items():
         setattr(budget, k, v)
+    versioning.touch(session, current_user.id, budget)
     session.add(budget)
     session.commit()
     session.refresh(budget)
@@ -225,10 +529,27 @@ def delete_budget(
     if not budget:
         raise HTTPException(status_code=404, detail="Budget not found")
     session.delete(budget)
+    version = versioning.bump(session, current_user.id)
+    sync.bury(session, current_user.id, "budget", [budget.id], version)
     session.commit()
     return {"deleted": True}
 
 
+@app.post("/transactions/batch", response_model=BatchResult)
+def batch_transactions(
+    payload: BatchRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Apply update/delete/pay operations in order, all or nothing.
+
+    Each operation targets ``ids`` or a ``filter`` (the listing filters)
+    and reports how many rows it matched.
+    """
+    results = batch.run(session, current_user.id, payload.operations)
+    return {"results": results}
+
+
 @app.put("/transactions/{transaction_id}", response_model=TransactionRead)
 def update_transaction(
     transaction_id: int,
@@ -243,9 +564,13 @@ def update_transaction(
     ).first()
     if not db_tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    for key, value in tr.dict().items():
+    rollup.remove(session, current_user.id, [db_tr])
+    (data,) = categories.assign(session, current_user.id, [tr.dict()])
+    for key, value in data.items():
         setattr(db_tr, key, value)
+    versioning.touch(session, current_user.id, db_tr)
     session.add(db_tr)
+    rollup.add(session, current_user.id, [db_tr])
     session.commit()
     session.refresh(db_tr)
     return db_tr
@@ -265,11 +590,14 @@ def delete_transaction(
     if not db_tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
     session.delete(db_tr)
+    rollup.remove(session, current_user.id, [db_tr])
+    version = versioning.bump(session, current_user.id)
+    sync.bury(session, current_user.id, "transaction", [db_tr.id], version)
     session.commit()
     return {"deleted": True}
 
 
-@app.patch("/transactions/{transaction_id}/pay")
+@app.patch("/transactions/{transaction_id}/pay", response_model=TransactionRead)
 def mark_as_paid(
     transaction_id: int,
     current_user: User = Depends(get_current_user),
@@ -283,12 +611,134 @@ def mark_as_paid(
     if not db_tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
     db_tr.is_paid = True
+    versioning.touch(session, current_user.id, db_tr)
     session.add(db_tr)
     session.commit()
     session.refresh(db_tr)
     return db_tr
 
 
+# Recurring transactions; the scheduler in ``recurring`` creates the rows
+@app.post("/recurring", response_model=RecurringRuleRead)
+def create_recurring_rule(
+    payload: RecurringRuleCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Create a rule; occurrences already due are created right away."""
+    if payload.end_date and payload.end_date < payload.start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    (data,) = categories.assign(session, current_user.id, [payload.dict()])
+    rule = RecurringRule(user_id=current_user.id, next_date=payload.start_date, **data)
+    session.add(rule)
+    versioning.bump(session, current_user.id)
+    session.commit()
+    try:
+        recurring.materialize(session, rule_ids=[rule.id])
+    except IntegrityError:
+        # the scheduler materialized the same occurrences first
+        session.rollback()
+    session.refresh(rule)
+    return rule
+
+
+@app.get("/recurring", response_model=list[RecurringRuleRead])
+def list_recurring_rules(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    not_modified = versioning.conditional_get(request, response, session, current_user.id)
+    if not_modified:
+        return not_modified
+    return session.exec(
+        select(RecurringRule)
+        .where(RecurringRule.user_id == current_user.id)
+        .order_by(RecurringRule.id)
+    ).all()
+
+
+@app.delete("/recurring/{rule_id}")
+def delete_recurring_rule(
+    rule_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Stop a rule; the transactions it already created are kept."""
+    rule = session.exec(
+        select(RecurringRule).where(
+            RecurringRule.id == rule_id, RecurringRule.user_id == current_user.id
+        )
+    ).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Recurring rule not found")
+    # SQLite may give this id to the next rule; its occurrences must not clash
+    session.execute(
+        update(Transaction)
+        .where(
+            Transaction.user_id == current_user.id,
+            Transaction.recurring_rule_id == rule_id,
+        )
+        .values(recurring_rule_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    session.delete(rule)
+    versioning.bump(session, current_user.id)
+    session.commit()
+    return {"deleted": True}
+
+
+@app.get("/sync", response_model=SyncResponse)
+def sync_changes(
+    since: Optional[str] = Query(None),
+    limit: int = Query(sync.DEFAULT_LIMIT, ge=1, le=sync.MAX_LIMIT),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Rows created, updated or deleted after the ``since`` cursor.
+
+    Omit ``since`` for a full snapshot; keep calling with the returned
+    ``cursor`` while ``has_more`` is true.
+    """
+    return serialization.json_response(
+        sync.changes_since(session, current_user.id, since, limit)
+    )
+
+
 @app.get("/me")
 def me(current_user: User = Depends(get_current_user)):
     return {"email": current_user.email, "id": current_user.id}
+
+
+@app.post("/auth/password", dependencies=[Depends(throttle_login)])
+async def change_password(
+    payload: PasswordChange,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    user = await run_in_threadpool(session.get, User, current_user.id)
+    valid, _ = await passwords.verify_and_update_async(
+        payload.current_password, user.hashed_password
+    )
+    if not valid:
+        raise HTTPException(status_code=400, detail="Incorrect password")
+    hashed = await passwords.hash_password_async(payload.new_password)
+    await run_in_threadpool(store_password_hash, user, hashed, session)
+    invalidate_user(user.id)
+    return {"updated": True}
+
+
+@app.delete("/me")
+def delete_account(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    for model in (Transaction, Budget, MonthlyRollup, RecurringRule, Tombstone, Category):
+        session.execute(delete(model).where(model.user_id == current_user.id))
+    session.execute(delete(User).where(User.id == current_user.id))
+    session.commit()
+    invalidate_user(current_user.id)
+    analytics.invalidate_user(current_user.id)
+    categories.invalidate_user(current_user.id)
+    return {"deleted": True}
@@ -0,0 +1,240 @@
+"""Per-route latency and SQL profiling.
+
+``MetricsMiddleware`` times every request and labels it with the route
+template (``/transactions/{transaction_id}``, not the concrete path). The
+SQLAlchemy cursor hooks installed by ``instrument`` add each statement's
+count and duration to the request being served, and log statements
+slower than ``SLOW_QUERY_MS`` when it is set. Totals are exposed in the
+Prometheus text format by ``render`` (``GET /metrics``). Each response
+also carries a ``Server-Timing`` header with its own app and DB time.
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# log statements slower than this many milliseconds; 0 disables the log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+# upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("app.slow_query")
+
+Labels = Tuple[str, str]  # (method, route)
+
+
+class RequestStats:
+    """SQL work done on behalf of one request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# set by the middleware; worker threads get a copy of the context, and the
+# object inside it is shared, so sync endpoints report into the same stats
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Registry:
+    """Process-wide counters, keyed by (method, route)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Labels, Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.queries: Dict[Labels, int] = {}
+        self.db_seconds: Dict[Labels, float] = {}
+        self.slow_queries = 0
+
+    def observe(self, labels: Labels, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            self.latency.setdefault(labels, Histogram()).observe(seconds)
+            key = (*labels, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.queries[labels] = self.queries.get(labels, 0) + stats.queries
+            self.db_seconds[labels] = self.db_seconds.get(labels, 0.0) + stats.db_seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.responses.clear()
+            self.queries.clear()
+            self.db_seconds.clear()
+            self.slow_queries = 0
+
+
+registry = Registry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the statement's context: a statement that raises never reaches
+    # the after hook, and its start time goes away with the context
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        with registry._lock:
+            registry.slow_queries += 1
+        # parameter values may be personal data; only their count is logged
+        count = len(parameters) if parameters is not None else 0
+        logger.warning(
+            "slow query (%.1f ms, %s %d): %s",
+            elapsed * 1000,
+            "param sets" if executemany else "params",
+            count,
+            " ".join(statement.split()),
+        )
+
+
+def instrument() -> None:
+    """Attach the cursor hooks to every engine (idempotent)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(total: float, stats: RequestStats) -> str:
+    return (
+        f"app;dur={total * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are not buffered."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                value = server_timing(time.perf_counter() - start, stats)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # set by the router on the scope it was given
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            registry.observe(labels, status, time.perf_counter() - start, stats)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str, **extra) -> str:
+    pairs = {"method": method, "route": route, **extra}
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs.items())
+
+
+def _metric_name(prefix: str, key: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{key}")
+
+
+def render(caches: Optional[Dict[str, dict]] = None) -> str:
+    """All metrics in the Prometheus text exposition format.
+
+    ``caches`` maps a name to ``TTLCache.stats()`` and becomes gauges.
+    """
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with registry._lock:
+        for (method, route), hist in sorted(registry.latency.items()):
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                labels = _labels(method, route, le=bound)
+                lines.append(f"http_request_duration_seconds_bucket{{{labels}}} {cumulative}")
+            labels = _labels(method, route)
+            lines.append(
+                f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}'
+            )
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {hist.count}")
+
+        lines += [
+            "# HELP http_responses_total Responses by route and status code.",
+            "# TYPE http_responses_total counter",
+        ]
+        for (method, route, status), count in sorted(registry.responses.items()):
+            labels = _labels(method, route, status=status)
+            lines.append(f"http_responses_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP db_queries_total SQL statements executed while serving a route.",
+            "# TYPE db_queries_total counter",
+        ]
+        for (method, route), count in sorted(registry.queries.items()):
+            lines.append(f"db_queries_total{{{_labels(method, route)}}} {count}")
+
+        lines += [
+            "# HELP db_seconds_total Time spent in SQL while serving a route.",
+            "# TYPE db_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(registry.db_seconds.items()):
+            lines.append(f"db_seconds_total{{{_labels(method, route)}}} {seconds:.6f}")
+
+        lines += [
+            "# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {registry.slow_queries}",
+        ]
+
+    for name, stats in (caches or {}).items():
+        for key, value in stats.items():
+            metric = _metric_name(f"cache_{name}", key)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,153 @@
+"""Versioned schema migrations.
+
+Each ``vNNNN_<name>.py`` module in this package moves the schema one
+version forward in ``upgrade(conn)``, inside a transaction, and the
+versions applied are recorded in ``schema_migrations``. They run as a
+deploy step, before the app starts::
+
+    python -m app.migrations            # upgrade to the latest version
+    python -m app.migrations status
+
+On boot the app only checks, with a single query, that the database is
+at the latest version (``database.init_db``). A migration describes the
+schema as it was at its version, so it uses Core tables and SQL, never
+the current models.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+VERSION_TABLE = "schema_migrations"
+
+_versions = Table(
+    VERSION_TABLE,
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+_MODULE = re.compile(r"v(\d{4})_(\w+)$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: str
+
+    def upgrade(self, conn: Connection) -> None:
+        importlib.import_module(f"{__name__}.{self.module}").upgrade(conn)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def migrations() -> List[Migration]:
+    # found by file name; a module is only imported to run it
+    found = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MODULE.match(module.name)
+        if match:
+            found.append(Migration(int(match.group(1)), match.group(2), module.name))
+    return sorted(found)
+
+
+def head() -> int:
+    return migrations()[-1].version
+
+
+def current(engine: Engine) -> int:
+    """Latest applied version; 0 for a database without migrations."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(_versions.c.version))).scalar() or 0
+    except DBAPIError:
+        # no version table yet
+        return 0
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to ``target`` (default: all); returns them."""
+    done = current(engine)
+    applied = []
+    for migration in migrations():
+        if migration.version <= done or (target is not None and migration.version > target):
+            continue
+        # one transaction per step: a failed step leaves the previous version
+        with engine.begin() as conn:
+            _versions.create(conn, checkfirst=True)
+            migration.upgrade(conn)
+            conn.execute(
+                _versions.insert().values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+        applied.append(migration)
+    return applied
+
+
+def check(engine: Engine) -> int:
+    """Raise ``SchemaOutOfDate`` unless the database is at ``head()``."""
+    version = current(engine)
+    if version != head():
+        raise SchemaOutOfDate(
+            f"database schema is at version {version}, this code expects {head()}; "
+            "run `python -m app.migrations` (or set MIGRATE_ON_STARTUP=1)"
+        )
+    return version
+
+
+def create_missing_columns(conn: Connection, metadata: MetaData) -> None:
+    """Add columns declared in ``metadata`` to existing tables.
+
+    Only nullable columns and columns with a server default can be added
+    this way, which is what new fields are.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            default = column.server_default
+            if column.name in present or not (column.nullable or default):
+                continue
+            ddl = column.type.compile(dialect=conn.dialect)
+            if default is not None:
+                ddl += f" NOT NULL DEFAULT {default.arg}"
+            conn.execute(
+                text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {ddl}')
+            )
+
+
+def create_missing_indexes(conn: Connection, metadata: MetaData) -> None:
+    """Build indexes declared in ``metadata`` that the database lacks.
+
+    ``create_all`` skips tables that already exist, together with their
+    indexes. ``checkfirst`` makes this a no-op once the index is there.
+    """
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
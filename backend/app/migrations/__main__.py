@@ -0,0 +1,33 @@
+"""python -m app.migrations [upgrade|status] [--to N] [--database-url URL]"""
+import argparse
+import sys
+from ..database import create_db_engine
+from . import current, head, migrations, upgrade
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    parser.add_argument("--to", type=int, default=None, help="stop at this version")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+
+    engine = create_db_engine(args.database_url)
+    try:
+        if args.command == "status":
+            version = current(engine)
+            for migration in migrations():
+                mark = "x" if migration.version <= version else " "
+                print(f"[{mark}] {migration.version:04d} {migration.name}")
+            print(f"at version {version} of {head()}")
+            return 0 if version == head() else 1
+        for migration in upgrade(engine, args.to):
+            print(f"applied {migration.version:04d} {migration.name}")
+        print(f"at version {current(engine)}")
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
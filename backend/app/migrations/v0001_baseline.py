@@ -0,0 +1,198 @@
+"""Baseline: the schema as ``create_all`` built it before migrations.
+
+Databases made by older versions already have most of it; whatever
+they lack (tables, nullable columns, indexes, the search index) is
+added, and monthly rollups are backfilled if the table is new.
+"""
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import Connection
+from . import create_missing_columns, create_missing_indexes
+
+metadata = MetaData()
+
+Table(
+    "user",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("email", String, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("data_version", Integer, nullable=False, server_default="0"),
+    Column("data_updated_at", DateTime),
+    Index("ix_user_email", "email", unique=True),
+)
+
+Table(
+    "transaction",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("description", String, nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("kind", String, nullable=False),
+    Column("category", String),
+    Column("date", DateTime, nullable=False),
+    Column("is_paid", Boolean, nullable=False),
+    Column("installment_total", Integer),
+    Column("installment_index", Integer),
+    Column("installment_group", String),
+    Column("recurring_rule_id", Integer),
+    Column("version", Integer, nullable=False, server_default="0"),
+    Column("updated_at", DateTime),
+    Index("ix_transaction_user_date", "user_id", "date"),
+    Index("ix_transaction_user_category_kind", "user_id", "category", "kind"),
+    Index("ix_transaction_user_installment_group", "user_id", "installment_group"),
+    Index("ix_transaction_user_version", "user_id", "version", "id"),
+    Index("ux_transaction_recurring_occurrence", "recurring_rule_id", "date", unique=True),
+)
+
+Table(
+    "budget",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("category", String, nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("period", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("version", Integer, nullable=False, server_default="0"),
+    Column("updated_at", DateTime),
+    Index("ix_budget_user_period_category", "user_id", "period", "category"),
+    Index("ix_budget_user_version", "user_id", "version"),
+)
+
+Table(
+    "tombstone",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("entity", String, nullable=False),
+    Column("entity_id", Integer, nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("deleted_at", DateTime, nullable=False),
+    Index("ix_tombstone_user_version", "user_id", "version"),
+)
+
+Table(
+    "recurringrule",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("description", String, nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("kind", String, nullable=False),
+    Column("category", String),
+    Column("frequency", String, nullable=False),
+    Column("interval", Integer, nullable=False),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime),
+    Column("next_date", DateTime, nullable=False),
+    Column("occurrences", Integer, nullable=False),
+    Column("active", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_recurringrule_user_id", "user_id"),
+    Index("ix_recurringrule_active_next_date", "active", "next_date"),
+)
+
+Table(
+    "schedulerlease",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("owner", String, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+)
+
+Table(
+    "monthlyrollup",
+    metadata,
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("month", String, primary_key=True),
+    Column("category", String, primary_key=True),
+    Column("kind", String, primary_key=True),
+    Column("total", Float, nullable=False),
+    Column("tx_count", Integer, nullable=False),
+)
+
+# the search index as ``app.search`` created it at this version
+_FTS_TABLE = "transaction_fts"
+
+_SQLITE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_TABLE} USING fts5(
+        description,
+        content='transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ai AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ad AFTER DELETE ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_au
+    AFTER UPDATE OF id, description ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO {_FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END""",
+)
+
+_POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """CREATE OR REPLACE FUNCTION cf_unaccent(text) RETURNS text
+    AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT""",
+    """CREATE INDEX IF NOT EXISTS ix_transaction_description_fts ON "transaction"
+    USING gin (to_tsvector('simple', cf_unaccent(description)))""",
+)
+
+
+def _install_search(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        for ddl in _POSTGRES_SEARCH_DDL:
+            conn.execute(text(ddl))
+        return
+    new = not conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": _FTS_TABLE}
+    ).first()
+    for ddl in _SQLITE_SEARCH_DDL:
+        conn.execute(text(ddl))
+    if new:
+        # index the rows that predate the search table
+        conn.execute(text(f"INSERT INTO {_FTS_TABLE}({_FTS_TABLE}) VALUES ('rebuild')"))
+
+
+_MONTH = {
+    "sqlite": "strftime('%Y-%m', date)",
+    "postgresql": "to_char(date, 'YYYY-MM')",
+}
+
+
+def upgrade(conn: Connection) -> None:
+    new_rollup_table = not inspect(conn).has_table("monthlyrollup")
+    metadata.create_all(conn)
+    create_missing_columns(conn, metadata)
+    create_missing_indexes(conn, metadata)
+    _install_search(conn)
+    if new_rollup_table:
+        month = _MONTH[conn.dialect.name]
+        conn.execute(text(
+            "INSERT INTO monthlyrollup (user_id, month, category, kind, total, tx_count) "
+            f"SELECT user_id, {month}, coalesce(category, ''), kind, sum(amount), count(*) "
+            f'FROM "transaction" GROUP BY user_id, {month}, coalesce(category, \'\'), kind'
+        ))
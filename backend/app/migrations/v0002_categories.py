@@ -0,0 +1,135 @@
+"""Categories become a per-user table referenced by integer ids.
+
+Every distinct (user, name) found in transactions, budgets and recurring
+rules becomes a ``category`` row. The text columns are replaced by
+``category_id``, and the rollups are re-keyed on it, with 0 for
+uncategorized instead of ''. Empty names on transactions and rules
+counted as uncategorized before, so they become NULL.
+
+SQLite cannot add a NOT NULL column without a default or change a
+primary key in place, so ``budget`` (there only) and ``monthlyrollup``
+are rebuilt and renamed.
+"""
+from datetime import datetime
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table("user", metadata, Column("id", Integer, primary_key=True))
+
+category = Table(
+    "category",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("name", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ux_category_user_name", "user_id", "name", unique=True),
+)
+
+budget_new = Table(
+    "budget_new",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("category_id", Integer, ForeignKey("category.id"), nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("period", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("version", Integer, nullable=False, server_default="0"),
+    Column("updated_at", DateTime),
+)
+
+rollup_new = Table(
+    "monthlyrollup_new",
+    metadata,
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+    Column("month", String, primary_key=True),
+    Column("category_id", Integer, primary_key=True),
+    Column("kind", String, primary_key=True),
+    Column("total", Float, nullable=False),
+    Column("tx_count", Integer, nullable=False),
+)
+
+_NAMED = "category IS NOT NULL AND category <> ''"
+_LOOKUP = (
+    "(SELECT c.id FROM category c WHERE c.user_id = {table}.user_id "
+    "AND c.name = {table}.category)"
+)
+
+
+def _replace_column(conn: Connection, table: str) -> None:
+    """Add ``category_id``, fill it from the names, drop ``category``."""
+    conn.execute(text(
+        f'ALTER TABLE "{table}" ADD COLUMN category_id INTEGER REFERENCES category (id)'
+    ))
+    lookup = _LOOKUP.format(table=f'"{table}"')
+    conn.execute(text(f'UPDATE "{table}" SET category_id = {lookup} WHERE {_NAMED}'))
+    conn.execute(text(f'ALTER TABLE "{table}" DROP COLUMN category'))
+
+
+def upgrade(conn: Connection) -> None:
+    category.create(conn)
+    conn.execute(
+        text(
+            "INSERT INTO category (user_id, name, created_at) "
+            "SELECT user_id, category, :now FROM ("
+            f'SELECT user_id, category FROM "transaction" WHERE {_NAMED} '
+            "UNION SELECT user_id, category FROM budget "
+            f"UNION SELECT user_id, category FROM recurringrule WHERE {_NAMED}"
+            ") names"
+        ),
+        {"now": datetime.utcnow()},
+    )
+
+    conn.execute(text("DROP INDEX ix_transaction_user_category_kind"))
+    _replace_column(conn, "transaction")
+    conn.execute(text(
+        "CREATE INDEX ix_transaction_user_category_kind "
+        'ON "transaction" (user_id, category_id, kind)'
+    ))
+    _replace_column(conn, "recurringrule")
+
+    conn.execute(text("DROP INDEX ix_budget_user_period_category"))
+    if conn.dialect.name == "postgresql":
+        _replace_column(conn, "budget")
+        conn.execute(text("ALTER TABLE budget ALTER COLUMN category_id SET NOT NULL"))
+    else:
+        conn.execute(text("DROP INDEX ix_budget_user_version"))
+        budget_new.create(conn)
+        conn.execute(text(
+            "INSERT INTO budget_new "
+            "(id, user_id, category_id, amount, period, created_at, version, updated_at) "
+            "SELECT b.id, b.user_id, c.id, b.amount, b.period, b.created_at, b.version, "
+            "b.updated_at FROM budget b "
+            "JOIN category c ON c.user_id = b.user_id AND c.name = b.category"
+        ))
+        conn.execute(text("DROP TABLE budget"))
+        conn.execute(text("ALTER TABLE budget_new RENAME TO budget"))
+        conn.execute(text("CREATE INDEX ix_budget_user_version ON budget (user_id, version)"))
+    conn.execute(text(
+        "CREATE INDEX ix_budget_user_period_category ON budget (user_id, period, category_id)"
+    ))
+
+    rollup_new.create(conn)
+    conn.execute(text(
+        "INSERT INTO monthlyrollup_new (user_id, month, category_id, kind, total, tx_count) "
+        "SELECT r.user_id, r.month, coalesce(c.id, 0), r.kind, sum(r.total), sum(r.tx_count) "
+        "FROM monthlyrollup r "
+        "LEFT JOIN category c ON c.user_id = r.user_id AND c.name = r.category "
+        "GROUP BY r.user_id, r.month, coalesce(c.id, 0), r.kind"
+    ))
+    conn.execute(text("DROP TABLE monthlyrollup"))
+    conn.execute(text("ALTER TABLE monthlyrollup_new RENAME TO monthlyrollup"))
@@ -0,0 +1,49 @@
+"""Money as integer cents.
+
+``amount`` on transactions, budgets and recurring rules and the rollup
+``total`` become BIGINT cents (see ``app.money``), rounded to the nearest
+cent. The rollups are then recomputed from the converted transactions,
+which also drops any drift their float totals had accumulated.
+
+SQLite cannot change a column's type, so a ``<column>_cents`` column is
+added, filled and renamed over the old one; it keeps the ``DEFAULT 0``
+needed to add a NOT NULL column.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+COLUMNS = (
+    ("transaction", "amount"),
+    ("budget", "amount"),
+    ("recurringrule", "amount"),
+    ("monthlyrollup", "total"),
+)
+
+_MONTH = {
+    "sqlite": "strftime('%Y-%m', date)",
+    "postgresql": "to_char(date, 'YYYY-MM')",
+}
+
+
+def _to_cents(conn: Connection, table: str, column: str) -> None:
+    cents = f"CAST(round({column} * 100) AS BIGINT)"
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE BIGINT USING {cents}'))
+        return
+    conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column}_cents BIGINT NOT NULL DEFAULT 0'))
+    conn.execute(text(f'UPDATE "{table}" SET {column}_cents = {cents}'))
+    conn.execute(text(f'ALTER TABLE "{table}" DROP COLUMN {column}'))
+    conn.execute(text(f'ALTER TABLE "{table}" RENAME COLUMN {column}_cents TO {column}'))
+
+
+def upgrade(conn: Connection) -> None:
+    for table, column in COLUMNS:
+        _to_cents(conn, table, column)
+
+    month = _MONTH[conn.dialect.name]
+    conn.execute(text("DELETE FROM monthlyrollup"))
+    conn.execute(text(
+        "INSERT INTO monthlyrollup (user_id, month, category_id, kind, total, tx_count) "
+        f"SELECT user_id, {month}, coalesce(category_id, 0), kind, sum(amount), count(*) "
+        f'FROM "transaction" GROUP BY user_id, {month}, coalesce(category_id, 0), kind'
+    ))
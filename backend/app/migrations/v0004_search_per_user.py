@@ -0,0 +1,75 @@
+"""Search index scoped to each user.
+
+SQLite: ``transaction_fts`` becomes a contentless table whose words carry
+their owner (``u<user_id>x<word>``), built by the ``cf_search_terms``
+SQL function, and is filled again from ``transaction``. Before, one
+index held every user's words, so a query matched and ranked the rows of
+all users before filtering by ``user_id``.
+
+Postgres: the GIN index also covers ``user_id`` (``btree_gin``).
+"""
+import re
+import sqlite3
+import unicodedata
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# the search index and the function as ``app.search`` defines them at this version
+_FTS_TABLE = "transaction_fts"
+_TERMS_FUNCTION = "cf_search_terms"
+_WORD = re.compile(r"[^\W_]+")
+
+_SQLITE_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_TABLE} USING fts5(
+        words,
+        content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ai AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}(rowid, words)
+        VALUES (new.id, {_TERMS_FUNCTION}(new.user_id, new.description));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ad AFTER DELETE ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, words)
+        VALUES ('delete', old.id, {_TERMS_FUNCTION}(old.user_id, old.description));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_au
+    AFTER UPDATE OF id, user_id, description ON "transaction" BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, words)
+        VALUES ('delete', old.id, {_TERMS_FUNCTION}(old.user_id, old.description));
+        INSERT INTO {_FTS_TABLE}(rowid, words)
+        VALUES (new.id, {_TERMS_FUNCTION}(new.user_id, new.description));
+    END""",
+)
+
+_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    "DROP INDEX IF EXISTS ix_transaction_description_fts",
+    """CREATE INDEX IF NOT EXISTS ix_transaction_user_description_fts ON "transaction"
+    USING gin (user_id, to_tsvector('simple', cf_unaccent(description)))""",
+)
+
+
+def _terms(user_id: int, description) -> str:
+    decomposed = unicodedata.normalize("NFKD", (description or "").casefold())
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(f"u{user_id}x{word}" for word in _WORD.findall(folded))
+
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.execute(text(ddl))
+        return
+    dbapi_connection = conn.connection.dbapi_connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(_TERMS_FUNCTION, 2, _terms, deterministic=True)
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {_FTS_TABLE}_{suffix}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {_FTS_TABLE}"))
+    for ddl in _SQLITE_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text(
+        f"INSERT INTO {_FTS_TABLE}(rowid, words) "
+        f'SELECT id, {_TERMS_FUNCTION}(user_id, description) FROM "transaction"'
+    ))
@@ -1,6 +1,9 @@
 from typing import Optional
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Index
+from sqlalchemy.orm import column_property
+from sqlmodel import SQLModel, Field, Relationship, select
+from .money import Cents
 
 
 class User(SQLModel, table=True):
@@ -8,26 +11,147 @@ class User(SQLModel, table=True):
     email: str = Field(index=True, unique=True)
     hashed_password: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # bumped by every write to the user's data; drives ETags
+    data_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    data_updated_at: Optional[datetime] = None
+
+
+class Category(SQLModel, table=True):
+    """A user's category; other tables reference it by ``category_id``."""
+
+    __table_args__ = (Index("ux_category_user_name", "user_id", "name", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    name: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class Transaction(SQLModel, table=True):
+    __table_args__ = (
+        # listing/pagination (ORDER BY date DESC) and per-month aggregation
+        Index("ix_transaction_user_date", "user_id", "date"),
+        # per-category analytics and category filters
+        Index("ix_transaction_user_category_kind", "user_id", "category_id", "kind"),
+        Index("ix_transaction_user_installment_group", "user_id", "installment_group"),
+        # delta sync: rows changed since a data version
+        Index("ix_transaction_user_version", "user_id", "version", "id"),
+        # one row per occurrence of a recurring rule, whatever the schedulers do
+        Index(
+            "ux_transaction_recurring_occurrence",
+            "recurring_rule_id",
+            "date",
+            unique=True,
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     description: str
-    amount: float
+    amount: float = Field(sa_column=Column(Cents, nullable=False))  # stored as cents
     kind: str = Field(default="expense")  # 'income' or 'expense'
-    category: Optional[str] = None
+    category_id: Optional[int] = Field(default=None, foreign_key="category.id")
     date: datetime = Field(default_factory=datetime.utcnow)
     is_paid: bool = Field(default=False)
     # installment fields
     installment_total: Optional[int] = None
     installment_index: Optional[int] = None
+    installment_group: Optional[str] = None  # shared by every installment of a plan
+    recurring_rule_id: Optional[int] = None  # set on rows made by a RecurringRule
+    # sync metadata: owner's data_version and time of the last write
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 
 class Budget(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_budget_user_period_category", "user_id", "period", "category_id"),
+        Index("ix_budget_user_version", "user_id", "version"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
-    category: str
-    amount: float  # planned amount for the period
+    category_id: int = Field(foreign_key="category.id")
+    # planned amount for the period, stored as cents
+    amount: float = Field(sa_column=Column(Cents, nullable=False))
     period: str  # e.g., '2025-12' (YYYY-MM)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class Tombstone(SQLModel, table=True):
+    """Marks a deleted row so offline clients can drop their copy."""
+
+    __table_args__ = (Index("ix_tombstone_user_version", "user_id", "version"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    entity: str  # 'transaction' or 'budget'
+    entity_id: int
+    version: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class RecurringRule(SQLModel, table=True):
+    """A transaction repeated every ``interval`` days/weeks/months/years.
+
+    Occurrence ``n`` falls on ``start_date`` shifted by ``n * interval``
+    periods; ``occurrences`` of them already exist, and ``next_date`` is
+    the date of the next one.
+    """
+
+    __table_args__ = (Index("ix_recurringrule_active_next_date", "active", "next_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    description: str
+    amount: float = Field(sa_column=Column(Cents, nullable=False))
+    kind: str = Field(default="expense")
+    category_id: Optional[int] = Field(default=None, foreign_key="category.id")
+    frequency: str = Field(default="monthly")  # daily, weekly, monthly, yearly
+    interval: int = Field(default=1)
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    next_date: datetime
+    occurrences: int = Field(default=0)
+    active: bool = Field(default=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchedulerLease(SQLModel, table=True):
+    """Which process runs a background job, until ``expires_at``."""
+
+    name: str = Field(primary_key=True)
+    owner: str
+    expires_at: datetime
+
+
+class MonthlyRollup(SQLModel, table=True):
+    """Per-user totals by (month, category, kind), kept in step with writes.
+
+    ``category_id`` is 0 for uncategorized transactions so it can be part
+    of the primary key.
+    """
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    month: str = Field(primary_key=True)  # 'YYYY-MM'
+    category_id: int = Field(default=0, primary_key=True)
+    kind: str = Field(primary_key=True)
+    total: float = Field(default=0.0, sa_column=Column(Cents, nullable=False))
+    tx_count: int = 0
+
+
+def _category_name(model):
+    return column_property(
+        select(Category.name)
+        .where(Category.id == model.category_id)
+        .correlate_except(Category)
+        .scalar_subquery()
+    )
+
+
+# read-only ``category`` name next to each ``category_id``, so rows and
+# ``*Read`` schemas keep the name; writes go through ``categories.assign``
+for _model in (Transaction, Budget, RecurringRule):
+    _model.category = _category_name(_model)
@@ -0,0 +1,55 @@
+"""Money stored as integer cents.
+
+Amounts are BIGINT cents in the database (``Cents``), so SUM and GROUP BY
+are exact integer arithmetic. Python code and the API keep seeing decimal
+amounts (``12.34``): values are converted when bound and when loaded.
+
+Code that adds amounts up itself works in cents too. It reads sums with
+``sum_cents``, adds integers, and converts once at the end with
+``from_cents``; sums of two-decimal floats drift by fractions of a cent.
+"""
+from decimal import ROUND_HALF_EVEN, Decimal
+from sqlalchemy import BigInteger, func, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+
+def to_cents(amount) -> int:
+    """``amount`` (float, int, Decimal or str) rounded to whole cents."""
+    if isinstance(amount, float):
+        # exact for any two-decimal amount below 10**13
+        return round(amount * 100)
+    return int((Decimal(amount) * 100).to_integral_value(ROUND_HALF_EVEN))
+
+
+def from_cents(cents) -> float:
+    """The decimal amount of ``cents`` (the float nearest to it)."""
+    return int(cents) / 100
+
+
+class Cents(TypeDecorator):
+    """BIGINT column of cents that binds and loads decimal amounts."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def result_processor(self, dialect, coltype):
+        # a plain function instead of TypeDecorator's wrapper: list and
+        # export endpoints load one value per row
+        return _load
+
+
+def _load(cents):
+    return None if cents is None else cents / 100
+
+
+def raw_cents(expression):
+    """``expression`` over ``Cents`` columns, loaded as integer cents."""
+    return type_coerce(expression, BigInteger)
+
+
+def sum_cents(column):
+    """SUM of a ``Cents`` column in cents: None for no rows, Decimal on Postgres."""
+    return raw_cents(func.sum(column))
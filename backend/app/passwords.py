@@ -0,0 +1,111 @@
+"""Password hashing off the request path.
+
+Hashes are computed in a dedicated, bounded process pool so that a burst
+of logins spreads over the CPU cores instead of holding the event loop or
+the threadpool that every other endpoint shares. Algorithm and cost come
+from the environment; hashes made with other settings keep verifying and
+are upgraded transparently on the next successful login.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# 'sha256_crypt', 'bcrypt', 'pbkdf2_sha256' or 'argon2' (needs argon2-cffi)
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "sha256_crypt")
+# scheme-specific cost: rounds for sha256_crypt/pbkdf2, log2 cost for bcrypt
+PASSWORD_ROUNDS = int(os.getenv("PASSWORD_ROUNDS", "0")) or None
+# 0 hashes in the threadpool instead (single-core hosts)
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# hashes in flight before new ones are refused with 503
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# schemes still accepted for existing hashes; deprecated ones get rehashed
+KNOWN_SCHEMES = ("sha256_crypt", "bcrypt", "pbkdf2_sha256", "argon2")
+
+Settings = Tuple[str, Optional[int]]
+SETTINGS: Settings = (PASSWORD_SCHEME, PASSWORD_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+
+@lru_cache(maxsize=None)
+def get_context(settings: Settings = SETTINGS) -> "CryptContext":
+    # passlib is imported on first use, keeping it off the startup path
+    from passlib.context import CryptContext
+
+    scheme, rounds = settings
+    schemes = [scheme] + [s for s in KNOWN_SCHEMES if s != scheme]
+    options = {}
+    if rounds:
+        # pinning min == max makes needs_update() flag any other cost
+        for key in ("default_rounds", "min_rounds", "max_rounds"):
+            options[f"{scheme}__{key}"] = rounds
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **options)
+
+
+def hash_password(password: str, settings: Settings = SETTINGS) -> str:
+    return get_context(settings).hash(password)
+
+
+def verify_and_update(
+    password: str, hashed: str, settings: Settings = SETTINGS
+) -> Tuple[bool, Optional[str]]:
+    """``(valid, new_hash)``; ``new_hash`` is set when the stored one is outdated."""
+    return get_context(settings).verify_and_update(password, hashed)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs threads is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def _offload(fn, *args):
+    if not _pending.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many authentication requests",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        if HASH_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args, SETTINGS)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args, SETTINGS)
+    finally:
+        _pending.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _offload(hash_password, password)
+
+
+async def verify_and_update_async(
+    password: str, hashed: str
+) -> Tuple[bool, Optional[str]]:
+    return await _offload(verify_and_update, password, hashed)
@@ -0,0 +1,88 @@
+"""Reusable query building for transaction listings.
+
+Listing endpoints share the same server-side filters and paginate with a
+keyset cursor on ``(date, id)`` so that deep pages cost the same as the
+first one: the ``(user_id, date)`` index seeks straight to the cursor
+instead of skipping over OFFSET rows.
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+from . import categories
+from .models import Transaction
+from .schemas import TransactionFilters
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def transaction_filters(
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    kind: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    is_paid: Optional[bool] = Query(None),
+) -> TransactionFilters:
+    """FastAPI dependency collecting the listing filters from the query string."""
+    return TransactionFilters(
+        date_from=date_from,
+        date_to=date_to,
+        kind=kind,
+        category=category,
+        is_paid=is_paid,
+    )
+
+
+def filter_clauses(user_id: int, filters: TransactionFilters) -> list:
+    """WHERE clauses selecting the user's transactions matching ``filters``."""
+    clauses = [Transaction.user_id == user_id]
+    if filters.date_from is not None:
+        clauses.append(Transaction.date >= filters.date_from)
+    if filters.date_to is not None:
+        clauses.append(Transaction.date < filters.date_to)
+    if filters.kind is not None:
+        clauses.append(Transaction.kind == filters.kind)
+    if filters.category is not None:
+        clauses.append(
+            Transaction.category_id.in_(categories.id_subquery(user_id, filters.category))
+        )
+    if filters.is_paid is not None:
+        clauses.append(Transaction.is_paid == filters.is_paid)
+    return clauses
+
+
+def apply_filters(stmt, user_id: int, filters: TransactionFilters):
+    return stmt.where(*filter_clauses(user_id, filters))
+
+
+def newest_first(stmt):
+    return stmt.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    raw = f"{date.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(date), int(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(stmt, cursor: Optional[str]):
+    """Restrict a newest-first query to the rows following ``cursor``."""
+    if not cursor:
+        return stmt
+    date, id = decode_cursor(cursor)
+    return stmt.where(
+        and_(
+            Transaction.date <= date,
+            or_(Transaction.date < date, Transaction.id < id),
+        )
+    )
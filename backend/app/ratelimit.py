@@ -0,0 +1,44 @@
+"""Fixed-window rate limiting keyed by client (e.g. IP address)."""
+import math
+import time
+from typing import Callable, Hashable, Optional
+from .backends import Backend, MemoryBackend
+
+
+class RateLimiter:
+    """Allow ``limit`` hits per ``window`` seconds and key.
+
+    Counters live in a cache backend: a private bounded ``MemoryBackend``
+    by default, so a flood of distinct keys cannot grow memory without
+    limit, or a shared one so every worker enforces the same budget.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        maxsize: int = 100_000,
+        clock: Callable[[], float] = time.time,
+        backend: Optional[Backend] = None,
+        name: str = "default",
+    ):
+        self.limit = limit
+        self.window = window
+        self.name = name
+        self._clock = clock
+        self._backend = backend or MemoryBackend(maxsize=maxsize)
+        self._generation = 0
+
+    def hit(self, key: Hashable) -> float:
+        """Record a hit; returns 0 if allowed, else seconds until retry."""
+        now = self._clock()
+        slot = math.floor(now / self.window)
+        counter = f"cf:rl:{self.name}:{self._generation}:{key}:{slot}"
+        count = self._backend.incr(counter, ttl=self.window)
+        if count > self.limit:
+            return (slot + 1) * self.window - now
+        return 0.0
+
+    def reset(self) -> None:
+        """Start over with fresh counters (in this process)."""
+        self._generation += 1
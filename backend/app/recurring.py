@@ -0,0 +1,192 @@
+"""Recurring transactions (rent, salaries, subscriptions).
+
+A background task started with the app materializes the occurrences of
+every ``RecurringRule`` that have come due. It takes a lease row first,
+so only one worker process schedules at a time. Each run is a single DB
+transaction: it inserts every due occurrence of every rule in one batched
+insert and advances the rules. After downtime the missed occurrences are
+caught up in that same insert. The unique (recurring_rule_id, date) index
+makes a repeated run fail instead of duplicating rows, should two
+processes ever overlap.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from . import database, rollup, versioning
+from .bulk import insert_transactions
+from .installments import add_months
+from .models import RecurringRule, SchedulerLease
+
+# seconds between scheduler runs; 0 disables the background task
+INTERVAL_SECONDS = float(os.getenv("RECURRING_INTERVAL_SECONDS", "60"))
+# a worker that stops renewing its lease loses it after this long
+LEASE_SECONDS = float(os.getenv("RECURRING_LEASE_SECONDS", "300"))
+# occurrences of one rule created per run (bounds a catch-up after downtime)
+MAX_CATCH_UP = 1000
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+LEASE_NAME = "recurring"
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+logger = logging.getLogger(__name__)
+_task: Optional[asyncio.Task] = None
+
+
+def occurrence(rule: RecurringRule, n: int) -> datetime:
+    """Date of the ``n``-th occurrence (0-based) of ``rule``."""
+    step = n * rule.interval
+    if rule.frequency == "daily":
+        return rule.start_date + timedelta(days=step)
+    if rule.frequency == "weekly":
+        return rule.start_date + timedelta(weeks=step)
+    if rule.frequency == "yearly":
+        return add_months(rule.start_date, 12 * step)
+    return add_months(rule.start_date, step)
+
+
+def _due_dates(rule: RecurringRule, now: datetime) -> List[datetime]:
+    dates = []
+    n = rule.occurrences
+    while len(dates) < MAX_CATCH_UP:
+        date = occurrence(rule, n)
+        if date > now or (rule.end_date and date > rule.end_date):
+            break
+        dates.append(date)
+        n += 1
+    return dates
+
+
+def materialize(
+    session: Session, now: Optional[datetime] = None, rule_ids: Iterable[int] = ()
+) -> int:
+    """Insert every due occurrence and advance the rules; returns rows inserted."""
+    now = now or datetime.utcnow()
+    stmt = select(RecurringRule).where(
+        RecurringRule.active == True,  # noqa: E712
+        RecurringRule.next_date <= now,
+    )
+    rule_ids = list(rule_ids)
+    if rule_ids:
+        stmt = stmt.where(RecurringRule.id.in_(rule_ids))
+    rules = session.exec(stmt).all()
+    if not rules:
+        return 0
+
+    by_user = defaultdict(list)
+    for rule in rules:
+        dates = _due_dates(rule, now)
+        by_user[rule.user_id].extend(
+            {
+                "user_id": rule.user_id,
+                "description": rule.description,
+                "amount": rule.amount,
+                "kind": rule.kind,
+                "category_id": rule.category_id,
+                "date": date,
+                "is_paid": False,
+                "recurring_rule_id": rule.id,
+            }
+            for date in dates
+        )
+        rule.occurrences += len(dates)
+        rule.next_date = occurrence(rule, rule.occurrences)
+        if rule.end_date and rule.next_date > rule.end_date:
+            rule.active = False
+        session.add(rule)
+
+    values = []
+    for user_id, rows in by_user.items():
+        if not rows:
+            continue
+        stamp = versioning.stamp(session, user_id)
+        for row in rows:
+            row.update(stamp)
+        rollup.add(session, user_id, rows)
+        values.extend(rows)
+    insert_transactions(session, values)
+    session.commit()
+    return len(values)
+
+
+def _lease_insert(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(SchedulerLease.__table__).on_conflict_do_nothing()
+
+
+def acquire_lease(
+    session: Session,
+    owner: str = OWNER,
+    now: Optional[datetime] = None,
+    seconds: float = LEASE_SECONDS,
+) -> bool:
+    """Take or renew the scheduler lease; False while another owner holds it."""
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=seconds)
+    session.execute(
+        _lease_insert(session).values(name=LEASE_NAME, owner=owner, expires_at=now)
+    )
+    result = session.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == LEASE_NAME,
+            or_(SchedulerLease.owner == owner, SchedulerLease.expires_at <= now),
+        )
+        .values(owner=owner, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def run_once(engine=None, owner: str = OWNER, now: Optional[datetime] = None) -> int:
+    """One scheduler pass; returns the number of transactions created."""
+    with Session(engine or database.engine) as session:
+        if not acquire_lease(session, owner, now):
+            return 0
+        try:
+            return materialize(session, now)
+        except IntegrityError:
+            # another process materialized the same occurrences first
+            session.rollback()
+            logger.warning("recurring: occurrences already materialized, skipping run")
+            return 0
+
+
+async def _run_forever(interval: float) -> None:
+    while True:
+        try:
+            created = await run_in_threadpool(run_once)
+            if created:
+                logger.info("recurring: created %d transactions", created)
+        except Exception:
+            logger.exception("recurring: scheduler run failed")
+        await asyncio.sleep(interval)
+
+
+def start(interval: float = INTERVAL_SECONDS) -> None:
+    global _task
+    if interval > 0 and _task is None:
+        _task = asyncio.get_running_loop().create_task(_run_forever(interval))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,242 @@
+"""Incrementally maintained monthly rollups.
+
+Every write path that changes transactions calls into this module inside
+its own DB transaction, so ``MonthlyRollup`` always agrees with the
+``transaction`` table and analytics read dozens of rollup rows instead of
+the whole history.
+
+Maintenance commands::
+
+    python -m app.rollup rebuild [--user-id N]
+    python -m app.rollup check [--user-id N]
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+from .aggregates import month_key
+from .categories import UNCATEGORIZED_ID
+from .models import MonthlyRollup, Transaction
+from .money import from_cents, sum_cents, to_cents
+
+RollupKey = Tuple[str, int, str]  # (month, category_id, kind)
+Deltas = Dict[RollupKey, List[int]]  # key -> [total in cents, tx_count]
+
+
+def _key(date: datetime, category_id: Optional[int], kind: str) -> RollupKey:
+    # not strftime: bulk inserts compute one key per row
+    return f"{date.year:04d}-{date.month:02d}", category_id or UNCATEGORIZED_ID, kind
+
+
+def deltas_for_rows(rows: Iterable, sign: int = 1) -> Deltas:
+    """Deltas for ORM rows or insert dicts; ``sign=-1`` for removals."""
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    for row in rows:
+        if isinstance(row, dict):
+            key = _key(row["date"], row.get("category_id"), row["kind"])
+            amount = row["amount"]
+        else:
+            key = _key(row.date, row.category_id, row.kind)
+            amount = row.amount
+        deltas[key][0] += sign * to_cents(amount)
+        deltas[key][1] += sign
+    return deltas
+
+
+def deltas_for_query(session: Session, *where, sign: int = 1) -> Deltas:
+    """Grouped deltas for the rows matching ``where``, computed in SQL.
+
+    Used by set-based UPDATE/DELETE paths, which never load the rows.
+    """
+    month = month_key(session)
+    rows = session.exec(
+        select(
+            month,
+            Transaction.category_id,
+            Transaction.kind,
+            sum_cents(Transaction.amount),
+            func.count(),
+        )
+        .where(*where)
+        .group_by(month, Transaction.category_id, Transaction.kind)
+    ).all()
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    for month_value, category_id, kind, total, count in rows:
+        key = (month_value, category_id or UNCATEGORIZED_ID, kind)
+        deltas[key][0] += sign * int(total or 0)
+        deltas[key][1] += sign * count
+    return deltas
+
+
+def reassign(removed: Deltas, values: dict) -> Deltas:
+    """Net deltas for an UPDATE that set ``values`` on the ``removed`` rows.
+
+    ``removed`` comes from ``deltas_for_query(..., sign=-1)`` before the
+    update; since every row gets the same new values, where they land
+    follows from the groups alone, without loading the rows.
+    """
+    net: Deltas = defaultdict(lambda: [0, 0])
+    for (month, category, kind), (total, count) in removed.items():
+        net[(month, category, kind)][0] += total
+        net[(month, category, kind)][1] += count
+        if "date" in values:
+            month = values["date"].strftime("%Y-%m")
+        if "category_id" in values:
+            category = values["category_id"] or UNCATEGORIZED_ID
+        if "kind" in values:
+            kind = values["kind"]
+        added = to_cents(values["amount"]) * -count if "amount" in values else -total
+        net[(month, category, kind)][0] += added
+        net[(month, category, kind)][1] -= count
+    return net
+
+
+def _upsert_statement(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = MonthlyRollup.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key.columns],
+        set_={
+            "total": table.c.total + stmt.excluded.total,
+            "tx_count": table.c.tx_count + stmt.excluded.tx_count,
+        },
+    )
+
+
+def apply(session: Session, user_id: int, deltas: Deltas) -> None:
+    """Add ``deltas`` to the user's rollup rows (no commit)."""
+    values = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "category_id": category,
+            "kind": kind,
+            "total": from_cents(total),
+            "tx_count": count,
+        }
+        for (month, category, kind), (total, count) in deltas.items()
+        if count or total
+    ]
+    if not values:
+        return
+    session.execute(_upsert_statement(session), values)
+    if any(v["tx_count"] < 0 for v in values):
+        session.execute(
+            delete(MonthlyRollup).where(
+                MonthlyRollup.user_id == user_id, MonthlyRollup.tx_count <= 0
+            )
+        )
+
+
+def add(session: Session, user_id: int, rows: Iterable) -> None:
+    apply(session, user_id, deltas_for_rows(rows))
+
+
+def remove(session: Session, user_id: int, rows: Iterable) -> None:
+    apply(session, user_id, deltas_for_rows(rows, sign=-1))
+
+
+def _recompute(session: Session, user_id: Optional[int]):
+    month = month_key(session)
+    stmt = select(
+        Transaction.user_id,
+        month,
+        func.coalesce(Transaction.category_id, UNCATEGORIZED_ID),
+        Transaction.kind,
+        sum_cents(Transaction.amount),
+        func.count(),
+    ).group_by(Transaction.user_id, month, Transaction.category_id, Transaction.kind)
+    if user_id is not None:
+        stmt = stmt.where(Transaction.user_id == user_id)
+    expected: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+    for uid, month_value, category, kind, total, count in session.exec(stmt).all():
+        expected[(uid, month_value, category, kind)][0] += int(total or 0)
+        expected[(uid, month_value, category, kind)][1] += count
+    return expected
+
+
+def rebuild(session: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from scratch; returns the number of rollup rows."""
+    stmt = delete(MonthlyRollup)
+    if user_id is not None:
+        stmt = stmt.where(MonthlyRollup.user_id == user_id)
+    session.execute(stmt)
+    expected = _recompute(session, user_id)
+    if expected:
+        session.execute(
+            MonthlyRollup.__table__.insert(),
+            [
+                {
+                    "user_id": uid,
+                    "month": month,
+                    "category_id": category,
+                    "kind": kind,
+                    "total": from_cents(total),
+                    "tx_count": count,
+                }
+                for (uid, month, category, kind), (total, count) in expected.items()
+            ],
+        )
+    session.commit()
+    return len(expected)
+
+
+def check(session: Session, user_id: Optional[int] = None) -> List[dict]:
+    """Compare rollups with a full recompute; returns the mismatching keys."""
+    expected = _recompute(session, user_id)
+    stmt = select(MonthlyRollup)
+    if user_id is not None:
+        stmt = stmt.where(MonthlyRollup.user_id == user_id)
+    actual = {
+        (r.user_id, r.month, r.category_id, r.kind): (to_cents(r.total), r.tx_count)
+        for r in session.exec(stmt).all()
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        want = expected.get(key, (0, 0))
+        got = actual.get(key, (0, 0))
+        if tuple(want) != tuple(got):
+            user, month, category, kind = key
+            mismatches.append(
+                {
+                    "user_id": user,
+                    "month": month,
+                    "category_id": category,
+                    "kind": kind,
+                    "expected": {"total": from_cents(want[0]), "count": want[1]},
+                    "actual": {"total": from_cents(got[0]), "count": got[1]},
+                }
+            )
+    return mismatches
+
+
+def main(argv=None) -> int:
+    from . import database
+
+    parser = argparse.ArgumentParser(prog="python -m app.rollup")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+
+    # like the app: an outdated schema fails here, migrating is `python -m app.migrations`
+    database.init_db(args.database_url)
+    with Session(database.engine) as session:
+        if args.command == "rebuild":
+            print(f"rebuilt {rebuild(session, args.user_id)} rollup rows")
+            return 0
+        mismatches = check(session, args.user_id)
+        for mismatch in mismatches:
+            print(mismatch)
+        print("ok" if not mismatches else f"{len(mismatches)} mismatching rollups")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,18 @@
 from typing import Optional
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field, root_validator, validator
+from pydantic.datetime_parse import datetime_re
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """``value`` as the naive UTC datetime stored in the database.
+
+    Naive values are taken as UTC already; aware ones are converted, so
+    they compare with stored dates and with each other.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class UserCreate(BaseModel):
@@ -8,6 +20,11 @@ class UserCreate(BaseModel):
     password: str
 
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -27,10 +44,12 @@ class TransactionRead(TransactionCreate):
     user_id: int
     date: datetime
     is_paid: bool
+    installment_group: Optional[str] = None
+    updated_at: Optional[datetime] = None
 
 
 class BudgetCreate(BaseModel):
-    category: str
+    category: str = Field(..., min_length=1)
     amount: float
     period: str  # 'YYYY-MM'
 
@@ -39,3 +58,144 @@ class BudgetRead(BudgetCreate):
     id: int
     user_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class BudgetExecution(BaseModel):
+    period: str
+    category: str
+    planned: float
+    spent: float
+    remaining: float
+
+
+class TransactionFilters(BaseModel):
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    kind: Optional[str] = None
+    category: Optional[str] = None
+    is_paid: Optional[bool] = None
+
+
+class TransactionImport(TransactionCreate):
+    date: Optional[datetime] = None
+    is_paid: bool = False
+
+    @validator("date", pre=True)
+    def iso_date(cls, value):
+        # imports parse thousands of these: a string pydantic would read as
+        # ISO 8601 goes through the C parser, anything else through pydantic
+        if isinstance(value, str) and datetime_re.match(value):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return value
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    skipped: int = 0
+    errors: list[ImportLineError] = []
+
+
+class TransactionPatch(BaseModel):
+    """Fields a batch ``update`` sets; omitted ones are left alone."""
+
+    description: Optional[str] = None
+    amount: Optional[float] = None
+    kind: Optional[str] = None
+    category: Optional[str] = None  # null clears it
+    date: Optional[datetime] = None
+    is_paid: Optional[bool] = None
+
+    @validator("description", "amount", "kind", "date", "is_paid")
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class BatchOperation(BaseModel):
+    """One step of a batch: target rows by ``ids`` or by ``filter``."""
+
+    op: str = Field(..., regex="^(update|delete|pay)$")
+    ids: Optional[list[int]] = Field(None, min_items=1, max_items=5000)
+    filter: Optional[TransactionFilters] = None
+    values: Optional[TransactionPatch] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_target(cls, data):
+        if (data.get("ids") is None) == (data.get("filter") is None):
+            raise ValueError("give exactly one of ids or filter")
+        values = data.get("values")
+        if data["op"] == "update" and not (values and values.dict(exclude_unset=True)):
+            raise ValueError("update needs values")
+        return data
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_items=1, max_items=100)
+
+
+class BatchOperationResult(BaseModel):
+    op: str
+    matched: int
+
+
+class BatchResult(BaseModel):
+    results: list[BatchOperationResult]
+
+
+class InstallmentPlanCreate(BaseModel):
+    description: str
+    total_amount: float = Field(..., gt=0)
+    installments: int = Field(..., ge=1, le=420)
+    kind: str = "expense"
+    category: Optional[str] = None
+    first_date: Optional[datetime] = None
+
+    _utc = validator("first_date", allow_reuse=True)(naive_utc)
+
+
+class InstallmentPlanRead(BaseModel):
+    installment_group: str
+    transactions: list[TransactionRead]
+
+
+class RecurringRuleCreate(BaseModel):
+    description: str
+    amount: float
+    kind: str = "expense"
+    category: Optional[str] = None
+    frequency: str = Field("monthly", regex="^(daily|weekly|monthly|yearly)$")
+    interval: int = Field(1, ge=1, le=366)
+    start_date: datetime
+    end_date: Optional[datetime] = None
+
+    _utc = validator("start_date", "end_date", allow_reuse=True)(naive_utc)
+
+
+class RecurringRuleRead(RecurringRuleCreate):
+    id: int
+    next_date: datetime
+    occurrences: int
+    active: bool
+
+
+class SyncDeleted(BaseModel):
+    transaction: list[int] = []
+    budget: list[int] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: str
+    has_more: bool
+    transactions: list[TransactionRead]
+    budgets: list[BudgetRead]
+    deleted: SyncDeleted
@@ -0,0 +1,178 @@
+"""Full-text search over transaction descriptions.
+
+SQLite keeps a contentless FTS5 table, ``transaction_fts``, in step with
+``transaction`` through triggers. Every indexed word carries its owner
+(``u<user_id>x<word>``, built by the ``cf_search_terms`` SQL function), so
+a query only reads the caller's part of the index: matching and bm25
+ranking cost grows with the caller's rows, not with the whole table.
+Words are folded to lowercase without accents on both sides, so "acucar"
+finds "Açúcar", and prefix queries ("merc" -> "Mercado") are a range
+scan over the caller's words. On Postgres a GIN index over ``user_id``
+(through ``btree_gin``) and ``to_tsvector`` of the unaccented description
+plays the same role, with nothing to keep in sync.
+
+User input never reaches the query syntax. It is split into words, and
+each word becomes a quoted prefix term. All terms must match.
+
+Results are ordered by score (lower is better) and then id, and pages
+seek past the last (score, id) like the other listings. Scores depend on
+index statistics, so a write between two pages may move a row across the
+page boundary.
+"""
+import base64
+import re
+import sqlite3
+import unicodedata
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, column, event, func, or_, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+from .models import Transaction
+
+FTS_TABLE = "transaction_fts"
+TERMS_FUNCTION = "cf_search_terms"
+
+SQLITE_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        words,
+        content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, words)
+        VALUES (new.id, {TERMS_FUNCTION}(new.user_id, new.description));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON "transaction" BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, words)
+        VALUES ('delete', old.id, {TERMS_FUNCTION}(old.user_id, old.description));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF id, user_id, description ON "transaction" BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, words)
+        VALUES ('delete', old.id, {TERMS_FUNCTION}(old.user_id, old.description));
+        INSERT INTO {FTS_TABLE}(rowid, words)
+        VALUES (new.id, {TERMS_FUNCTION}(new.user_id, new.description));
+    END""",
+)
+
+# unaccent() is only STABLE; index expressions need an IMMUTABLE wrapper
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    """CREATE OR REPLACE FUNCTION cf_unaccent(text) RETURNS text
+    AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT""",
+    """CREATE INDEX IF NOT EXISTS ix_transaction_user_description_fts ON "transaction"
+    USING gin (user_id, to_tsvector('simple', cf_unaccent(description)))""",
+)
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"), column(FTS_TABLE))
+# unicode61 splits words at "_", so it is not part of a word here either
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _fold(value: str) -> str:
+    if value.isascii():
+        return value.lower()  # the same result, without decomposing every row
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def indexed_terms(user_id: int, description: Optional[str]) -> str:
+    """What ``transaction_fts`` indexes for a row (``cf_search_terms``).
+
+    The triggers delete a row's words by recomputing them, so changing
+    this needs a migration that rebuilds the index.
+    """
+    return " ".join(f"u{user_id}x{word}" for word in terms(description or ""))
+
+
+@event.listens_for(Engine, "connect")
+def _register_functions(dbapi_connection, connection_record):
+    # the triggers call it on every write to "transaction"
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            TERMS_FUNCTION, 2, indexed_terms, deterministic=True
+        )
+
+
+def install(bind) -> None:
+    """Create the search index and its triggers if missing (idempotent)."""
+    if isinstance(bind, Connection):
+        _install(bind)
+    else:
+        with bind.begin() as conn:
+            _install(conn)
+
+
+def _install(conn: Connection) -> None:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        new = not conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for ddl in SQLITE_DDL:
+            conn.execute(text(ddl))
+        if new:
+            # index the rows that predate the search table
+            conn.execute(text(
+                f"INSERT INTO {FTS_TABLE}(rowid, words) "
+                f'SELECT id, {TERMS_FUNCTION}(user_id, description) FROM "transaction"'
+            ))
+    elif dialect == "postgresql":
+        for ddl in POSTGRES_DDL:
+            conn.execute(text(ddl))
+
+
+@event.listens_for(Transaction.__table__, "after_create")
+def _after_create(target, connection, **kw):
+    install(connection)
+
+
+def terms(query: str) -> List[str]:
+    """The words of ``query``, lowercase and without accents."""
+    return _WORD.findall(_fold(query))
+
+
+def search_stmt(session: Session, stmt, user_id: int, query: str, cursor: Optional[str] = None):
+    """Restrict ``stmt`` (a select over ``user_id``'s transactions) to matches, best first.
+
+    A trailing ``search_score`` column holds what ``encode_cursor`` needs;
+    ``cursor`` continues after the row it was made from.
+    """
+    words = terms(query)
+    if session.get_bind().dialect.name == "postgresql":
+        document = func.to_tsvector("simple", func.cf_unaccent(Transaction.description))
+        tsquery = func.to_tsquery("simple", " & ".join(f"{w}:*" for w in words))
+        # negated so that lower is better, as with bm25
+        score = -func.ts_rank(document, tsquery)
+        stmt = stmt.where(document.op("@@")(tsquery))
+    else:
+        match = " ".join(f'"u{user_id}x{w}"*' for w in words)
+        score = _fts.c.rank  # bm25: lower is better
+        stmt = stmt.join(_fts, _fts.c.rowid == Transaction.id).where(
+            _fts.c[FTS_TABLE].op("MATCH")(match)
+        )
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(score > last_score, and_(score == last_score, Transaction.id < last_id))
+        )
+    return stmt.add_columns(score.label("search_score")).order_by(
+        score, Transaction.id.desc()
+    )
+
+
+def encode_cursor(score: float, id: int) -> str:
+    raw = f"{score!r}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return float(score), int(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
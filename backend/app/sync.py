@@ -0,0 +1,153 @@
+"""Delta sync for offline clients.
+
+Rows carry the owner's ``data_version`` from their last write and deletes
+leave a ``Tombstone``, so ``GET /sync?since=<cursor>`` only has to send
+what changed after the cursor. Cursors are opaque strings:
+
+* ``"<version>"`` once a client is up to date;
+* ``"<since>:<upto>:<version>:<id>"`` while a large change set is being
+  paged through. ``upto`` pins the snapshot: anything written meanwhile
+  has a higher version and is picked up by the next sync.
+
+Clients apply ``deleted`` before the upserts: SQLite may hand the id of a
+deleted row to a new one. Deletions come with the last page, after pages
+that may already carry the row that reused the id, so tombstones of ids
+that a live row took over later are left out.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, insert, literal, or_
+from sqlmodel import Session, select
+from . import serialization, versioning
+from .models import Budget, Tombstone, Transaction
+from .schemas import BudgetRead, TransactionRead
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+_LIVE = {"transaction": Transaction, "budget": Budget}
+
+
+def bury(session: Session, user_id: int, entity: str, ids: Iterable[int], version: int):
+    """Record tombstones for deleted ``ids`` (no commit)."""
+    session.add_all(
+        Tombstone(user_id=user_id, entity=entity, entity_id=i, version=version)
+        for i in ids
+    )
+
+
+def bury_matching(session: Session, user_id: int, model, where, version: int):
+    """Tombstones for every ``model`` row matching ``where``, in one INSERT ... SELECT.
+
+    Call it before the set-based DELETE it accompanies.
+    """
+    session.execute(
+        insert(Tombstone).from_select(
+            ["user_id", "entity", "entity_id", "version", "deleted_at"],
+            select(
+                model.user_id,
+                literal(model.__tablename__),
+                model.id,
+                literal(version),
+                literal(datetime.utcnow()),
+            ).where(*where),
+        )
+    )
+
+
+def _superseded():
+    """Tombstones whose id was reused by a row of the same user written later."""
+    return or_(
+        *(
+            and_(
+                Tombstone.entity == entity,
+                select(model.id)
+                .where(
+                    model.id == Tombstone.entity_id,
+                    model.user_id == Tombstone.user_id,
+                    model.version > Tombstone.version,
+                )
+                .exists(),
+            )
+            for entity, model in _LIVE.items()
+        )
+    )
+
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[int, Optional[int], Optional[tuple]]:
+    """``(since, upto, after)``; a missing cursor means a full snapshot."""
+    if not cursor:
+        return -1, None, None
+    try:
+        parts = [int(p) for p in cursor.split(":")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(parts) == 1:
+        return parts[0], None, None
+    if len(parts) == 4:
+        return parts[0], parts[1], (parts[2], parts[3])
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def changes_since(
+    session: Session, user_id: int, cursor: Optional[str], limit: int = DEFAULT_LIMIT
+) -> dict:
+    since, upto, after = parse_cursor(cursor)
+    if upto is None:
+        upto = versioning.current(session, user_id)[0]
+
+    columns = serialization.read_columns(Transaction, TransactionRead)
+    stmt = select(*columns, Transaction.version).where(
+        Transaction.user_id == user_id,
+        Transaction.version > since,
+        Transaction.version <= upto,
+    )
+    if after is not None:
+        version, id = after
+        stmt = stmt.where(
+            or_(
+                Transaction.version > version,
+                and_(Transaction.version == version, Transaction.id > id),
+            )
+        )
+    transactions = session.exec(
+        stmt.order_by(Transaction.version, Transaction.id).limit(limit + 1)
+    ).all()
+
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        # budgets and deletions are small; they come with the last page
+        return {
+            "cursor": f"{since}:{upto}:{last.version}:{last.id}",
+            "has_more": True,
+            "transactions": serialization.records(transactions, TransactionRead),
+            "budgets": [],
+            "deleted": {"transaction": [], "budget": []},
+        }
+
+    budgets = session.exec(
+        select(*serialization.read_columns(Budget, BudgetRead)).where(
+            Budget.user_id == user_id, Budget.version > since, Budget.version <= upto
+        )
+    ).all()
+    deleted = {"transaction": [], "budget": []}
+    if since >= 0:  # a full snapshot has nothing to delete
+        rows = session.exec(
+            select(Tombstone.entity, Tombstone.entity_id).where(
+                Tombstone.user_id == user_id,
+                Tombstone.version > since,
+                Tombstone.version <= upto,
+                ~_superseded(),
+            )
+        ).all()
+        for entity, entity_id in rows:
+            deleted.setdefault(entity, []).append(entity_id)
+    return {
+        "cursor": str(upto),
+        "has_more": False,
+        "transactions": serialization.records(transactions, TransactionRead),
+        "budgets": serialization.records(budgets, BudgetRead),
+        "deleted": deleted,
+    }
@@ -1,23 +1,55 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
 from sqlmodel import create_engine, SQLModel, Session
+from app import analytics, categories
 from app.main import app
-from app import database
+from app.auth import login_limiter, token_cache
+from app.database import get_session
 
-@pytest.fixture(name="client", autouse=True)
-def client_fixture(monkeypatch):
-    """Criar um TestClient com um DB em memória"""
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    """Engine SQLite em memória compartilhado entre threads do TestClient"""
     test_engine = create_engine(
         "sqlite:///:memory:",
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(test_engine)
-    
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture(name="session")
+def session_fixture(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(name="client", autouse=True)
+def client_fixture(engine):
+    """Criar um TestClient com um DB em memória"""
+
     def get_test_session():
-        with Session(test_engine) as session:
+        with Session(engine) as session:
             yield session
-    
-    # Substituir get_session no módulo database
-    monkeypatch.setattr(database, "get_session", get_test_session)
-    
-    return TestClient(app)
+
+    # Substituir a dependência get_session usada pelos endpoints
+    app.dependency_overrides[get_session] = get_test_session
+    token_cache.clear()
+    login_limiter.reset()
+    analytics.result_cache.clear()
+    categories.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="auth_headers")
+def auth_headers_fixture(client):
+    """Registrar um usuário e devolver o header Authorization"""
+    r = client.post(
+        "/auth/register", json={"email": "user@example.com", "password": "secret123"}
+    )
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
@@ -0,0 +1,124 @@
+"""Stand-in Redis server for tests: the RESP2 subset app.backends uses."""
+import socketserver
+import threading
+import time
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}  # key -> (value, expires_at or None)
+        self.subscribers = {}  # channel -> set of handlers
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+        return value
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def send(self, reply) -> None:
+        with self.write_lock:
+            self.wfile.write(_encode(reply))
+
+    def handle(self):
+        self.write_lock = threading.Lock()
+        store: _Store = self.server.store
+        channels = []
+        try:
+            while True:
+                args = self.read_command()
+                if args is None:
+                    break
+                name = args[0].upper().decode()
+                self.server.commands.append(name)
+                if name == "SUBSCRIBE":
+                    for channel in args[1:]:
+                        with store.lock:
+                            store.subscribers.setdefault(channel, set()).add(self)
+                        channels.append(channel)
+                        self.send([b"subscribe", channel, len(channels)])
+                    continue
+                with store.lock:
+                    reply = self.execute(store, name, args[1:])
+                self.send(reply)
+        finally:
+            with store.lock:
+                for channel in channels:
+                    store.subscribers[channel].discard(self)
+
+    def execute(self, store: _Store, name: str, args):
+        if name in ("PING", "AUTH", "SELECT"):
+            return "PONG" if name == "PING" else "OK"
+        if name == "GET":
+            return store.get(args[0])
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if b"NX" in options and store.get(key) is not None:
+                return None
+            expires_at = None
+            if b"PX" in options:
+                ms = int(options[options.index(b"PX") + 1])
+                expires_at = time.monotonic() + ms / 1000
+            store.values[key] = (value, expires_at)
+            return "OK"
+        if name == "DEL":
+            return sum(store.values.pop(key, None) is not None for key in args)
+        if name == "INCR":
+            count = int(store.get(args[0]) or 0) + 1
+            _, expires_at = store.values.get(args[0], (None, None))
+            store.values[args[0]] = (str(count).encode(), expires_at)
+            return count
+        if name == "PUBLISH":
+            handlers = list(store.subscribers.get(args[0], ()))
+            for handler in handlers:
+                handler.send([b"message", args[0], args[1]])
+            return len(handlers)
+        return Exception(f"unknown command '{name}'")
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.store = _Store()
+        self.commands = []
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,61 @@
+def _seed(client, headers):
+    rows = [
+        ("Salário", 5000.0, "income", "Trabalho", "2025-11-05T00:00:00"),
+        ("Mercado", 300.0, "expense", "Alimentação", "2025-11-10T00:00:00"),
+        ("Aluguel", 1500.0, "expense", None, "2025-11-01T00:00:00"),
+        ("Salário", 5000.0, "income", "Trabalho", "2025-12-05T00:00:00"),
+        ("Restaurante", 120.5, "expense", "Alimentação", "2025-12-20T00:00:00"),
+    ]
+    items = [
+        {"description": d, "amount": a, "kind": k, "category": c, "date": dt}
+        for d, a, k, c, dt in rows
+    ]
+    r = client.post("/transactions/bulk", json=items, headers=headers)
+    assert r.json()["inserted"] == 5
+
+
+def test_summary_and_overview(client, auth_headers):
+    _seed(client, auth_headers)
+
+    summary = client.get("/summary", headers=auth_headers).json()
+    assert summary == {
+        "total_income": 10000.0,
+        "total_expense": 1920.5,
+        "balance": 8079.5,
+    }
+
+    overview = client.get("/analytics/overview", headers=auth_headers).json()
+    assert overview["totals"] == {
+        "income": 10000.0,
+        "expense": 1920.5,
+        "balance": 8079.5,
+    }
+    assert overview["monthly"] == {
+        "2025-11": {"income": 5000.0, "expense": 1800.0},
+        "2025-12": {"income": 5000.0, "expense": 120.5},
+    }
+
+
+def test_categories_and_monthly(client, auth_headers):
+    _seed(client, auth_headers)
+
+    by_cat = client.get("/analytics/categories", headers=auth_headers).json()
+    assert by_cat == {
+        "Trabalho": {"income": 10000.0, "expense": 0.0},
+        "Alimentação": {"income": 0.0, "expense": 420.5},
+        "Sem categoria": {"income": 0.0, "expense": 1500.0},
+    }
+
+    monthly = client.get("/analytics/monthly", headers=auth_headers).json()
+    assert list(monthly) == ["2025-11", "2025-12"]
+
+
+def test_analytics_isolated_per_user(client, auth_headers):
+    _seed(client, auth_headers)
+    r = client.post(
+        "/auth/register", json={"email": "other@example.com", "password": "secret123"}
+    )
+    other = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    assert client.get("/analytics/monthly", headers=other).json() == {}
+    assert client.get("/summary", headers=other).json()["balance"] == 0.0
@@ -0,0 +1,188 @@
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event
+
+from app import aggregates, analytics
+from app.cache import SingleFlight
+
+
+def _seed(client, headers):
+    rows = [
+        ("Salário", 5000.0, "income", "2025-11-05T09:00:00"),
+        ("Mercado", 300.0, "expense", "2025-11-10T18:00:00"),  # segunda-feira
+        ("Padaria", 20.0, "expense", "2025-11-16T08:00:00"),  # domingo, mesma semana
+        ("Restaurante", 120.5, "expense", "2025-12-20T20:00:00"),
+        ("Aluguel", 1500.0, "expense", "2026-01-02T00:00:00"),
+    ]
+    items = [
+        {"description": d, "amount": a, "kind": k, "date": dt} for d, a, k, dt in rows
+    ]
+    client.post("/transactions/bulk", json=items, headers=headers)
+
+
+def _count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    return statements
+
+
+def test_series_granularities(client, auth_headers):
+    _seed(client, auth_headers)
+
+    def get(**params):
+        return client.get("/analytics/series", params=params, headers=auth_headers).json()
+
+    assert list(get(granularity="year")) == ["2025", "2026"]
+    assert get(granularity="year")["2025"] == {"income": 5000.0, "expense": 440.5}
+    november = {"from": "2025-11-01T00:00:00", "to": "2025-12-01T00:00:00"}
+    assert get(granularity="week", **november) == {
+        "2025-11-03": {"income": 5000.0, "expense": 0.0},
+        "2025-11-10": {"income": 0.0, "expense": 320.0},
+    }
+    one_day = {"from": "2025-12-20T00:00:00", "to": "2025-12-21T00:00:00"}
+    assert get(granularity="day", **one_day) == {
+        "2025-12-20": {"income": 0.0, "expense": 120.5},
+    }
+    assert get(granularity="month") == client.get(
+        "/analytics/monthly", headers=auth_headers
+    ).json()
+    r = client.get("/analytics/series?granularity=hour", headers=auth_headers)
+    assert r.status_code == 422
+
+
+def test_ranges_match_with_and_without_rollup(client, auth_headers, session):
+    _seed(client, auth_headers)
+    # intervalo em limites de mês: vem do MonthlyRollup
+    aligned = client.get(
+        "/analytics/overview",
+        params={"from": "2025-11-01T00:00:00", "to": "2026-01-01T00:00:00"},
+        headers=auth_headers,
+    ).json()
+    assert aligned["totals"] == {"income": 5000.0, "expense": 440.5, "balance": 4559.5}
+    assert list(aligned["monthly"]) == ["2025-11", "2025-12"]
+    # o mesmo intervalo pelas transações dá o mesmo resultado
+    by_rows = aggregates.totals_by_kind(
+        session, 1, datetime(2025, 11, 1), datetime(2025, 12, 31, 23, 59)
+    )
+    assert by_rows == {"income": 5000.0, "expense": 440.5}
+
+    partial = client.get(
+        "/analytics/categories",
+        params={"from": "2025-11-10T12:00:00"},
+        headers=auth_headers,
+    ).json()
+    assert partial == {"Sem categoria": {"income": 0.0, "expense": 1940.5}}
+
+    r = client.get(
+        "/analytics/overview",
+        params={"from": "2026-01-01T00:00:00", "to": "2025-01-01T00:00:00"},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
+
+    # um limite com fuso e outro sem: ambos lidos em UTC
+    mixed = client.get(
+        "/analytics/overview",
+        params={"from": "2025-10-31T21:00:00-03:00", "to": "2026-01-01T00:00:00"},
+        headers=auth_headers,
+    ).json()
+    assert mixed == aligned
+    for path in ("/analytics/series", "/analytics/categories", "/analytics/monthly"):
+        r = client.get(
+            path,
+            params={"from": "2025-11-01T00:00:00Z", "to": "2025-12-01T00:00:00"},
+            headers=auth_headers,
+        )
+        assert r.status_code == 200, r.text
+    r = client.get(
+        "/analytics/overview",
+        params={"from": "2025-01-01T02:00:00+03:00", "to": "2024-12-31T23:00:00"},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
+
+
+def test_results_cached_until_next_write(client, auth_headers, engine):
+    _seed(client, auth_headers)
+    client.get("/analytics/overview", headers=auth_headers)
+    statements = _count_queries(engine)
+    client.get("/analytics/overview", headers=auth_headers)
+    # só a versão do usuário: o resultado vem do cache
+    assert len(statements) == 1
+    stats = analytics.stats()
+    assert stats["hits"] >= 1 and stats["hit_rate"] > 0
+
+    client.post(
+        "/transactions", json={"description": "Café", "amount": 5.0}, headers=auth_headers
+    )
+    overview = client.get("/analytics/overview", headers=auth_headers).json()
+    assert overview["totals"]["expense"] == 1945.5
+
+    body = client.get("/metrics").text
+    assert "cache_analytics_hit_rate" in body
+    assert "cache_analytics_coalesced" in body
+
+
+def test_deleted_user_results_are_dropped(client, auth_headers):
+    _seed(client, auth_headers)
+    client.get("/summary", headers=auth_headers)
+    assert len(analytics.result_cache) == 1
+    client.delete("/me", headers=auth_headers)
+    assert len(analytics.result_cache) == 0
+
+
+def test_concurrent_requests_share_one_query(client, auth_headers, monkeypatch):
+    _seed(client, auth_headers)
+    calls = []
+    original = aggregates.totals_by_category
+
+    def slow(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.3)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(aggregates, "totals_by_category", slow)
+    client.get("/me", headers=auth_headers)  # aquece o cache de tokens
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(
+            lambda _: client.get("/analytics/categories", headers=auth_headers),
+            range(8),
+        ))
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.text for r in responses}) == 1
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_result_and_errors():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(flights.do, "k", work)
+        started.wait(5)
+        followers = [pool.submit(flights.do, "k", work) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        assert leader.result() == "ok"
+        assert [f.result() for f in followers] == ["ok"] * 3
+    assert len(runs) == 1
+    assert flights.stats() == {"calls": 1, "coalesced": 3}
+
+    def boom():
+        raise RuntimeError("falhou")
+
+    with pytest.raises(RuntimeError):
+        flights.do("k", boom)
+    # a falha não fica presa na chave
+    assert flights.do("k", lambda: 42) == 42
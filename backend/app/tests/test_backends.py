@@ -0,0 +1,172 @@
+import socket
+import time
+
+import pytest
+
+from app import aggregates, analytics, auth, backends
+from app.backends import Backend, InvalidationBus, MemoryBackend, RedisBackend
+from app.ratelimit import RateLimiter
+from app.tests.fake_redis import FakeRedis
+
+
+@pytest.fixture(name="redis")
+def redis_fixture():
+    server = FakeRedis()
+    yield server
+    server.close()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.01)
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_memory_backend_expires_values():
+    now = [0.0]
+    backend = MemoryBackend(clock=lambda: now[0])
+    backend.set("k", b"v", ttl=10)
+    assert backend.incr("n", ttl=10) == 1
+    assert backend.incr("n", ttl=10) == 2
+    assert backend.get("k") == b"v"
+    now[0] = 11
+    assert backend.get("k") is None
+    assert backend.incr("n", ttl=10) == 1
+
+
+def test_redis_backend_commands(redis):
+    backend = RedisBackend(redis.url)
+    assert backend.get("k") is None
+    backend.set("k", b"\x00bin\r\nario", ttl=60)
+    assert backend.get("k") == b"\x00bin\r\nario"
+    backend.delete("k")
+    assert backend.get("k") is None
+
+    # contador criado com TTL na primeira vez, incrementado depois
+    assert [backend.incr("n", ttl=60) for _ in range(3)] == [1, 2, 3]
+    backend.set("curto", b"x", ttl=0.05)
+    time.sleep(0.1)
+    assert backend.get("curto") is None
+
+
+def test_redis_down_degrades_to_misses():
+    backend = RedisBackend(f"redis://127.0.0.1:{_closed_port()}/0", timeout=0.2)
+    assert backend.get("k") is None
+    backend.set("k", b"v", ttl=60)
+    backend.publish("canal", "msg")
+    # limite de taxa fica aberto em vez de derrubar o login
+    assert backend.incr("n", ttl=60) == 0
+    limiter = RateLimiter(1, 60, backend=backend)
+    assert limiter.hit("ip") == limiter.hit("ip") == 0
+
+
+def test_redis_down_is_not_retried_on_every_call():
+    now = [0.0]
+    backend = RedisBackend(
+        f"redis://127.0.0.1:{_closed_port()}/0", timeout=0.2, retry_after=5, clock=lambda: now[0]
+    )
+    calls = []
+    pipeline = backend.pipeline
+    backend.pipeline = lambda *commands: calls.append(commands) or pipeline(*commands)
+
+    assert backend.get("k") is None
+    # depois da falha as chamadas nem tentam conectar até o prazo acabar
+    assert backend.get("k") is None
+    assert backend.incr("n", ttl=60) == 0
+    assert len(calls) == 1
+    now[0] = 5
+    assert backend.get("k") is None
+    assert len(calls) == 2
+
+
+def test_incomplete_backend_fails_on_creation():
+    class OnlyGet(Backend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        OnlyGet()
+
+
+def test_rate_limit_shared_between_workers(redis):
+    # dois "workers", cada um com seu cliente e seu limitador
+    workers = [
+        RateLimiter(3, 60, clock=lambda: 30.0, backend=RedisBackend(redis.url), name="login")
+        for _ in range(2)
+    ]
+    assert [workers[i % 2].hit("1.2.3.4") for i in range(3)] == [0, 0, 0]
+    assert workers[1].hit("1.2.3.4") == 30.0
+    assert workers[0].hit("1.2.3.4") == 30.0
+    assert workers[0].hit("5.6.7.8") == 0
+
+
+def test_invalidation_reaches_other_workers(redis):
+    received = []
+    here = InvalidationBus(lambda: RedisBackend(redis.url))
+    there = InvalidationBus(lambda: RedisBackend(redis.url))
+    here.on("user", lambda value: received.append(("here", value)))
+    there.on("user", lambda value: received.append(("there", value)))
+    here.start()
+    there.start()
+    try:
+        _wait_for(lambda: len(redis.store.subscribers.get(b"cf:invalidate", ())) == 2)
+        here.broadcast("user", 7)
+        _wait_for(lambda: len(received) == 2)
+        time.sleep(0.05)
+        # aplicado localmente uma vez e entregue ao outro worker; o eco é ignorado
+        assert sorted(received) == [("here", "7"), ("there", "7")]
+    finally:
+        here.stop()
+        there.stop()
+
+
+def test_user_eviction_is_broadcast(client, auth_headers, redis, monkeypatch):
+    monkeypatch.setattr(backends, "backend", RedisBackend(redis.url))
+    # outro worker: só publica no canal
+    peer = InvalidationBus(lambda: RedisBackend(redis.url))
+    backends.bus.start()
+    try:
+        _wait_for(lambda: redis.store.subscribers.get(b"cf:invalidate"))
+        assert client.get("/me", headers=auth_headers).status_code == 200
+        assert len(auth.token_cache) == 1
+        peer.broadcast("user", 1)
+        _wait_for(lambda: len(auth.token_cache) == 0)
+    finally:
+        backends.bus.stop()
+
+
+def test_analytics_results_shared_between_workers(client, auth_headers, redis, monkeypatch):
+    monkeypatch.setattr(backends, "backend", RedisBackend(redis.url))
+    client.post(
+        "/transactions",
+        json={"description": "Salário", "amount": 100.0, "kind": "income"},
+        headers=auth_headers,
+    )
+    first = client.get("/analytics/categories", headers=auth_headers).json()
+    assert redis.commands.count("SET") == 1
+
+    # outro worker: cache local vazio, resultado vem do backend compartilhado
+    analytics.result_cache.clear()
+    calls = []
+    monkeypatch.setattr(
+        aggregates, "totals_by_category", lambda *a, **k: calls.append(a) or {}
+    )
+    assert client.get("/analytics/categories", headers=auth_headers).json() == first
+    assert calls == []
+    assert redis.commands.count("SET") == 1
+
+    # uma escrita muda a versão: a chave compartilhada antiga não serve mais
+    client.post(
+        "/transactions",
+        json={"description": "Mercado", "amount": 30.0, "kind": "expense"},
+        headers=auth_headers,
+    )
+    client.get("/analytics/categories", headers=auth_headers)
+    assert len(calls) == 1
@@ -0,0 +1,126 @@
+from app import rollup
+
+
+def _seed(client, headers):
+    rows = [
+        ("Luz", 120.0, "Casa", "2025-11-05T00:00:00"),
+        ("Água", 80.0, "Casa", "2025-11-06T00:00:00"),
+        ("Internet", 100.0, "Casa", "2025-11-10T00:00:00"),
+        ("Mercado", 300.0, "Alimentação", "2025-11-12T00:00:00"),
+        ("Cinema", 40.0, None, "2025-12-01T00:00:00"),
+    ]
+    items = [
+        {"description": d, "amount": a, "category": c, "date": dt} for d, a, c, dt in rows
+    ]
+    client.post("/transactions/bulk", json=items, headers=headers)
+    listed = client.get("/transactions", headers=headers).json()
+    return {t["description"]: t["id"] for t in listed}
+
+
+def _batch(client, headers, *operations):
+    return client.post(
+        "/transactions/batch", json={"operations": list(operations)}, headers=headers
+    )
+
+
+def _by_description(client, headers):
+    return {t["description"]: t for t in client.get("/transactions", headers=headers).json()}
+
+
+def test_mixed_operations_in_order(client, auth_headers, session):
+    ids = _seed(client, auth_headers)
+    r = _batch(
+        client,
+        auth_headers,
+        {"op": "pay", "filter": {"category": "Casa"}},
+        {"op": "update", "ids": [ids["Mercado"]],
+         "values": {"category": "Supermercado", "amount": 310.0}},
+        {"op": "delete", "ids": [ids["Cinema"]]},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["results"] == [
+        {"op": "pay", "matched": 3},
+        {"op": "update", "matched": 1},
+        {"op": "delete", "matched": 1},
+    ]
+    rows = _by_description(client, auth_headers)
+    assert {d for d, t in rows.items() if t["is_paid"]} == {"Luz", "Água", "Internet"}
+    assert rows["Mercado"]["category"] == "Supermercado"
+    assert rows["Mercado"]["amount"] == 310.0
+    assert "Cinema" not in rows
+    assert rollup.check(session) == []
+
+
+def test_all_or_nothing(client, auth_headers):
+    ids = _seed(client, auth_headers)
+    before = _by_description(client, auth_headers)
+    r = _batch(
+        client,
+        auth_headers,
+        {"op": "pay", "filter": {}},
+        {"op": "delete", "ids": [ids["Luz"]]},
+        # a linha já foi apagada pela operação anterior
+        {"op": "update", "ids": [ids["Luz"], 9999], "values": {"description": "x"}},
+    )
+    assert r.status_code == 404
+    assert r.json()["detail"] == {"operation": 2, "missing_ids": [ids["Luz"], 9999]}
+    assert _by_description(client, auth_headers) == before
+
+
+def test_other_users_rows_are_missing(client, auth_headers):
+    ids = _seed(client, auth_headers)
+    r = client.post(
+        "/auth/register", json={"email": "other@example.com", "password": "secret123"}
+    )
+    other = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = _batch(client, other, {"op": "delete", "ids": [ids["Luz"]]})
+    assert r.status_code == 404
+    # com filtro só as linhas do próprio usuário entram
+    r = _batch(client, other, {"op": "delete", "filter": {}})
+    assert r.json()["results"] == [{"op": "delete", "matched": 0}]
+    assert len(_by_description(client, auth_headers)) == 5
+
+
+def test_filter_update_moves_rollups(client, auth_headers, session):
+    _seed(client, auth_headers)
+    r = _batch(
+        client,
+        auth_headers,
+        {"op": "update", "filter": {"category": "Casa"},
+         "values": {"category": None, "date": "2026-01-15T00:00:00", "kind": "expense"}},
+    )
+    assert r.json()["results"][0]["matched"] == 3
+    monthly = client.get("/analytics/monthly", headers=auth_headers).json()
+    assert monthly["2025-11"]["expense"] == 300.0
+    assert monthly["2026-01"]["expense"] == 300.0
+    categories = client.get("/analytics/categories", headers=auth_headers).json()
+    assert categories["Sem categoria"]["expense"] == 340.0
+    assert rollup.check(session) == []
+
+
+def test_batch_feeds_delta_sync(client, auth_headers):
+    ids = _seed(client, auth_headers)
+    cursor = client.get("/sync", headers=auth_headers).json()["cursor"]
+    _batch(
+        client,
+        auth_headers,
+        {"op": "pay", "ids": [ids["Luz"], ids["Água"]]},
+        {"op": "delete", "filter": {"date_from": "2025-12-01T00:00:00"}},
+    )
+    changes = client.get(f"/sync?since={cursor}", headers=auth_headers).json()
+    assert sorted(t["description"] for t in changes["transactions"]) == ["Luz", "Água"]
+    assert changes["deleted"]["transaction"] == [ids["Cinema"]]
+
+
+def test_invalid_batches(client, auth_headers):
+    ids = _seed(client, auth_headers)
+    for op in [
+        {"op": "pay"},  # sem alvo
+        {"op": "pay", "ids": [ids["Luz"]], "filter": {}},  # dois alvos
+        {"op": "update", "ids": [ids["Luz"]]},  # sem valores
+        {"op": "update", "ids": [ids["Luz"]], "values": {"amount": None}},
+        {"op": "archive", "ids": [ids["Luz"]]},
+    ]:
+        assert _batch(client, auth_headers, op).status_code == 422, op
+    r = client.post("/transactions/batch", json={"operations": []}, headers=auth_headers)
+    assert r.status_code == 422
@@ -0,0 +1,82 @@
+from sqlalchemy import event
+
+from app import aggregates
+
+
+def _seed(client, headers):
+    rows = [
+        ("Mercado", 300.0, "expense", "Alimentação", "2025-11-10T00:00:00"),
+        ("Feira", 80.0, "expense", "Alimentação", "2025-11-15T00:00:00"),
+        ("Uber", 45.0, "expense", "Transporte", "2025-11-20T00:00:00"),
+        ("Restaurante", 120.5, "expense", "Alimentação", "2025-12-20T00:00:00"),
+        # receita na mesma categoria não conta como gasto
+        ("Reembolso", 50.0, "income", "Alimentação", "2025-11-21T00:00:00"),
+    ]
+    items = [
+        {"description": d, "amount": a, "kind": k, "category": c, "date": dt}
+        for d, a, k, c, dt in rows
+    ]
+    client.post("/transactions/bulk", json=items, headers=headers)
+    for category, amount, period in [
+        ("Alimentação", 500.0, "2025-11"),
+        ("Lazer", 200.0, "2025-11"),
+        ("Alimentação", 400.0, "2025-12"),
+    ]:
+        client.post(
+            "/budgets",
+            json={"category": category, "amount": amount, "period": period},
+            headers=headers,
+        )
+
+
+def test_budget_execution_all_periods(client, auth_headers):
+    _seed(client, auth_headers)
+    r = client.get("/budgets/execution", headers=auth_headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == [
+        {"period": "2025-11", "category": "Alimentação", "planned": 500.0,
+         "spent": 380.0, "remaining": 120.0},
+        {"period": "2025-11", "category": "Lazer", "planned": 200.0,
+         "spent": 0.0, "remaining": 200.0},
+        {"period": "2025-12", "category": "Alimentação", "planned": 400.0,
+         "spent": 120.5, "remaining": 279.5},
+    ]
+
+
+def test_budget_execution_filters_periods(client, auth_headers):
+    _seed(client, auth_headers)
+    r = client.get("/budgets/execution?period=2025-12", headers=auth_headers)
+    assert [row["period"] for row in r.json()] == ["2025-12"]
+
+    r = client.get("/budgets/execution?period=2025-13x", headers=auth_headers)
+    assert r.status_code == 422
+
+
+def test_budget_execution_tracks_writes(client, auth_headers):
+    _seed(client, auth_headers)
+    client.post(
+        "/transactions/bulk",
+        json=[{"description": "Cinema", "amount": 250.0, "kind": "expense",
+               "category": "Lazer", "date": "2025-11-25T00:00:00"}],
+        headers=auth_headers,
+    )
+    rows = client.get("/budgets/execution?period=2025-11", headers=auth_headers).json()
+    lazer = next(row for row in rows if row["category"] == "Lazer")
+    assert lazer["spent"] == 250.0
+    assert lazer["remaining"] == -50.0
+
+
+def test_budget_execution_is_one_query(client, auth_headers, engine, session):
+    _seed(client, auth_headers)
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        rows = aggregates.budget_execution(session, 1, ["2025-11", "2025-12"])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(rows) == 3
+    assert len(statements) == 1
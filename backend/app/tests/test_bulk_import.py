@@ -0,0 +1,167 @@
+from datetime import datetime
+from typing import Optional
+
+import pytest
+from pydantic import validate_model
+
+from app.importers import parse_ofx
+from app.schemas import TransactionCreate, TransactionImport
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20251203120000[-3:BRT]
+<TRNAMT>-89.90
+<FITID>1
+<MEMO>PADARIA SÃO JOÃO
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20251205
+<TRNAMT>5000.00
+<FITID>2
+<NAME>SALARIO
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_bulk_json_reports_line_errors(client, auth_headers):
+    items = [
+        {"description": "Mercado", "amount": 120.5, "category": "Alimentação"},
+        {"description": "Sem valor"},
+        {"description": "Salário", "amount": 5000, "kind": "income",
+         "date": "2025-12-05T00:00:00"},
+        {"description": "Valor inválido", "amount": "abc"},
+    ]
+
+    r = client.post("/transactions/bulk", json=items, headers=auth_headers)
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["inserted"] == 2
+    assert [e["line"] for e in body["errors"]] == [2, 4]
+    assert "amount" in body["errors"][0]["error"]
+    listed = client.get("/transactions", headers=auth_headers).json()
+    assert {tr["description"] for tr in listed} == {"Mercado", "Salário"}
+
+
+def test_bulk_dedupe(client, auth_headers):
+    item = {"description": "Netflix", "amount": 39.9, "date": "2025-12-10T00:00:00"}
+
+    first = client.post("/transactions/bulk", json=[item, item], headers=auth_headers)
+    second = client.post(
+        "/transactions/bulk", params={"dedupe": True}, json=[item],
+        headers=auth_headers,
+    )
+    third = client.post("/transactions/bulk", json=[item], headers=auth_headers)
+
+    assert first.json()["inserted"] == 2  # sem dedupe, nada é descartado
+    assert second.json() == {"inserted": 0, "skipped": 1, "errors": []}
+    assert third.json()["inserted"] == 1
+    assert len(client.get("/transactions", headers=auth_headers).json()) == 3
+
+
+def test_bulk_dedupe_with_timezones(client, auth_headers):
+    items = [
+        {"description": "Padaria", "amount": 12.0, "date": "2025-01-31T23:30:00-03:00"},
+        {"description": "Mercado", "amount": 80.0, "date": "2025-02-03T10:00:00"},
+    ]
+
+    # datas com e sem fuso no mesmo lote
+    first = client.post(
+        "/transactions/bulk", params={"dedupe": True}, json=items, headers=auth_headers
+    )
+    second = client.post(
+        "/transactions/bulk", params={"dedupe": True}, json=items, headers=auth_headers
+    )
+
+    assert first.status_code == 200, first.text
+    assert first.json()["inserted"] == 2
+    assert second.json() == {"inserted": 0, "skipped": 2, "errors": []}
+    listed = client.get("/transactions", headers=auth_headers).json()
+    # guardada em UTC, sem fuso
+    assert {t["date"] for t in listed} == {"2025-02-01T02:30:00", "2025-02-03T10:00:00"}
+
+
+@pytest.mark.parametrize("value", [
+    "2025-03-04T05:06:07",
+    "2025-03-04 05:06:07.5",
+    "2025-03-04T05:06:07Z",
+    "2025-03-04T05:06:07.123456-03:00",
+    "2025-03-04T05:06+0130",
+    "2025-3-4T5:06",
+    "2025-03-04",
+    "1741064767",
+    "04/03/2025",
+])
+def test_import_dates_parse_as_pydantic(value):
+    # o atalho por fromisoformat dá o mesmo resultado (ou o mesmo erro) do pydantic
+    def parse(model):
+        values, _, error = validate_model(model, {"description": "x", "amount": 1, "date": value})
+        return ("erro", error.errors()[0]["msg"]) if error else values["date"]
+
+    class Reference(TransactionCreate):
+        date: Optional[datetime] = None
+
+    assert parse(TransactionImport) == parse(Reference)
+
+
+def test_bulk_large_batch(client, auth_headers):
+    items = [{"description": f"item {i}", "amount": i} for i in range(2500)]
+    r = client.post("/transactions/bulk", json=items, headers=auth_headers)
+    assert r.json()["inserted"] == 2500
+    totals = client.get("/summary", headers=auth_headers).json()
+    assert totals["total_expense"] == sum(range(2500))
+
+
+def test_import_csv(client, auth_headers):
+    content = (
+        "date;description;amount;category\n"
+        "03/12/2025;Padaria;-12,50;Alimentação\n"
+        "05/12/2025;Salário;5.000,00;\n"
+        "xx/12/2025;Quebrada;-1,00;\n"
+    ).encode("cp1252")
+
+    r = client.post(
+        "/transactions/import",
+        files={"file": ("extrato.csv", content, "text/csv")},
+        headers=auth_headers,
+    )
+
+    body = r.json()
+    assert body["inserted"] == 2
+    assert [e["line"] for e in body["errors"]] == [4]
+    by_desc = {
+        tr["description"]: tr
+        for tr in client.get("/transactions", headers=auth_headers).json()
+    }
+    assert by_desc["Padaria"]["kind"] == "expense"
+    assert by_desc["Padaria"]["amount"] == 12.5
+    assert by_desc["Salário"]["kind"] == "income"
+    assert by_desc["Salário"]["amount"] == 5000.0
+
+
+def test_import_ofx(client, auth_headers):
+    r = client.post(
+        "/transactions/import",
+        files={"file": ("extrato.ofx", OFX.encode(), "application/x-ofx")},
+        headers=auth_headers,
+    )
+    assert r.json()["inserted"] == 2
+
+    rows = dict(parse_ofx(OFX))
+    assert rows[1]["description"] == "PADARIA SÃO JOÃO"
+    assert rows[1]["kind"] == "expense" and rows[1]["amount"] == 89.9
+    assert rows[2]["date"].day == 5
+
+
+def test_import_unknown_format(client, auth_headers):
+    r = client.post(
+        "/transactions/import",
+        files={"file": ("extrato.pdf", b"%PDF", "application/pdf")},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
@@ -0,0 +1,93 @@
+from sqlmodel import select
+
+from app import categories
+from app.models import Category, Transaction, User
+
+
+def _user(session, email):
+    user = User(email=email, hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def test_api_keeps_speaking_names(client, session, auth_headers):
+    tr = client.post(
+        "/transactions",
+        json={"description": "feira", "amount": 30.0, "category": "Mercado"},
+        headers=auth_headers,
+    ).json()
+    client.post(
+        "/transactions",
+        json={"description": "sem", "amount": 5.0, "category": ""},
+        headers=auth_headers,
+    )
+    budget = client.post(
+        "/budgets",
+        json={"category": "Mercado", "amount": 100.0, "period": "2025-01"},
+        headers=auth_headers,
+    ).json()
+
+    # uma linha por nome e usuário; o nome vazio continua sem categoria
+    assert session.exec(select(Category.name)).all() == ["Mercado"]
+    assert tr["category"] == budget["category"] == "Mercado"
+    stored = session.get(Transaction, tr["id"])
+    assert stored.category == "Mercado" and stored.category_id is not None
+
+    listed = client.get(
+        "/transactions", params={"category": "Mercado"}, headers=auth_headers
+    ).json()
+    assert [t["id"] for t in listed] == [tr["id"]]
+    totals = client.get("/analytics/categories", headers=auth_headers).json()
+    assert totals["Mercado"]["expense"] == 30.0
+
+    paid = client.patch(f"/transactions/{tr['id']}/pay", headers=auth_headers).json()
+    assert paid["is_paid"] is True and paid["category"] == "Mercado"
+    assert "category_id" not in paid
+
+    r = client.put(
+        f"/transactions/{tr['id']}",
+        json={"description": "feira", "amount": 30.0, "category": "Feira"},
+        headers=auth_headers,
+    )
+    assert r.json()["category"] == "Feira"
+
+
+def test_same_name_is_a_different_category_per_user(session):
+    first, second = _user(session, "a@b.c"), _user(session, "d@e.f")
+    a = categories.resolve(session, first, ["Lazer"])
+    b = categories.resolve(session, second, ["Lazer"])
+    session.commit()
+
+    assert a["Lazer"] != b["Lazer"]
+    assert categories.names(session, second, [b["Lazer"], a["Lazer"]]) == {b["Lazer"]: "Lazer"}
+
+
+def test_only_committed_categories_are_cached(session):
+    user_id = _user(session, "a@b.c")
+    categories.resolve(session, user_id, ["Viagem"])
+    session.rollback()  # o id devolvido deixou de existir
+    assert categories.stats()["ids_size"] == 0
+
+    ids = categories.resolve(session, user_id, ["Viagem"])
+    session.commit()
+    # a próxima busca já acha a categoria confirmada e a guarda
+    assert categories.resolve(session, user_id, ["Viagem"]) == ids
+    hits = categories.stats()["ids_hits"]
+    assert categories.resolve(session, user_id, ["Viagem"]) == ids
+    assert categories.stats()["ids_hits"] == hits + 1
+
+
+def test_deleting_the_account_forgets_its_categories(client, session, auth_headers):
+    for _ in range(2):
+        client.post(
+            "/transactions",
+            json={"description": "x", "amount": 1.0, "category": "Mercado"},
+            headers=auth_headers,
+        )
+    assert categories.stats()["ids_size"] == 1
+
+    client.delete("/me", headers=auth_headers)
+
+    assert categories.stats()["ids_size"] == 0
+    assert session.exec(select(Category)).all() == []
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.database import create_db_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_sqlite_file_engine_is_tuned(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    assert isinstance(engine.pool, QueuePool)
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "busy_timeout") == 5000
+    assert _pragma(engine, "cache_size") == -65536
+
+
+def test_pragmas_can_be_overridden(tmp_path):
+    engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'plain.db'}", sqlite_pragmas={"journal_mode": "DELETE"}
+    )
+    assert _pragma(engine, "journal_mode") == "delete"
+
+
+def test_in_memory_engine_skips_file_tuning():
+    engine = create_db_engine("sqlite://")
+    assert not isinstance(engine.pool, QueuePool)
+    assert _pragma(engine, "journal_mode") == "memory"
+
+
+def test_postgres_engine_uses_pool_settings():
+    pytest.importorskip("psycopg2")
+    engine = create_db_engine("postgresql+psycopg2://u:p@localhost/cf")
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool._pre_ping
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models import User
+
+READ_ENDPOINTS = [
+    "/transactions",
+    "/summary",
+    "/analytics/overview",
+    "/analytics/categories",
+    "/analytics/monthly",
+    "/budgets",
+]
+
+
+def _create(client, headers, amount=10.0):
+    return client.post(
+        "/transactions", json={"description": "x", "amount": amount}, headers=headers
+    ).json()
+
+
+@pytest.mark.parametrize("path", READ_ENDPOINTS)
+def test_revalidation_returns_304_until_a_write(client, auth_headers, path):
+    first = client.get(path, headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    _create(client, auth_headers)
+
+    changed = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_every_write_endpoint_bumps_the_version(client, auth_headers):
+    def etag():
+        return client.get("/summary", headers=auth_headers).headers["ETag"]
+
+    seen = {etag()}
+    tr = _create(client, auth_headers)
+    seen.add(etag())
+    client.put(
+        f"/transactions/{tr['id']}",
+        json={"description": "y", "amount": 5.0},
+        headers=auth_headers,
+    )
+    seen.add(etag())
+    client.patch(f"/transactions/{tr['id']}/pay", headers=auth_headers)
+    seen.add(etag())
+    client.delete(f"/transactions/{tr['id']}", headers=auth_headers)
+    seen.add(etag())
+    budget = client.post(
+        "/budgets",
+        json={"category": "Mercado", "amount": 500, "period": "2025-12"},
+        headers=auth_headers,
+    ).json()
+    seen.add(etag())
+    client.delete(f"/budgets/{budget['id']}", headers=auth_headers)
+    seen.add(etag())
+    client.post(
+        "/transactions/bulk", json=[{"description": "b", "amount": 1}],
+        headers=auth_headers,
+    )
+    seen.add(etag())
+    assert len(seen) == 8
+
+
+def test_etag_depends_on_query_string(client, auth_headers):
+    a = client.get("/transactions", params={"limit": 10}, headers=auth_headers)
+    b = client.get("/transactions", params={"limit": 20}, headers=auth_headers)
+    assert a.headers["ETag"] != b.headers["ETag"]
+    r = client.get(
+        "/transactions",
+        params={"limit": 20},
+        headers={**auth_headers, "If-None-Match": a.headers["ETag"]},
+    )
+    assert r.status_code == 200
+
+
+def _written_at(session, when):
+    user = session.exec(select(User)).one()
+    user.data_updated_at = when
+    session.add(user)
+    session.commit()
+
+
+def test_if_modified_since(client, auth_headers, session):
+    _written_at(session, datetime.utcnow() - timedelta(seconds=10))
+    first = client.get("/budgets", headers=auth_headers)
+    r = client.get(
+        "/budgets",
+        headers={**auth_headers, "If-Modified-Since": first.headers["Last-Modified"]},
+    )
+    assert r.status_code == 304
+
+
+def test_no_last_modified_within_the_write_second(client, auth_headers, session):
+    # outra escrita no mesmo segundo teria o mesmo Last-Modified
+    _written_at(session, datetime.utcnow() + timedelta(seconds=1))
+    first = client.get("/budgets", headers=auth_headers)
+    assert "Last-Modified" not in first.headers and "ETag" in first.headers
+
+    _written_at(session, datetime.utcnow() - timedelta(seconds=10))
+    since = client.get("/budgets", headers=auth_headers).headers["Last-Modified"]
+    _create(client, auth_headers)
+    r = client.get("/budgets", headers={**auth_headers, "If-Modified-Since": since})
+    assert r.status_code == 200
+
+
+def test_versions_are_per_user(client, auth_headers):
+    etag = client.get("/summary", headers=auth_headers).headers["ETag"]
+    other = client.post(
+        "/auth/register", json={"email": "b@example.com", "password": "x"}
+    ).json()["access_token"]
+    _create(client, {"Authorization": f"Bearer {other}"})
+
+    r = client.get("/summary", headers={**auth_headers, "If-None-Match": etag})
+    assert r.status_code == 304
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import categories
+from app.export import iter_export
+from app.models import Transaction
+from app.schemas import TransactionFilters
+
+
+def _bulk_seed(session, user_id, n):
+    base = datetime(2020, 1, 1)
+    ids = categories.resolve(session, user_id, ["Mercado", "Lazer"])
+    session.execute(
+        insert(Transaction.__table__),
+        [
+            {
+                "user_id": user_id,
+                "description": f"Compra {i}",
+                "amount": 10.0 + i % 100,
+                "kind": "expense",
+                "category_id": ids["Mercado" if i % 2 else "Lazer"],
+                "date": base + timedelta(minutes=i),
+                "is_paid": False,
+            }
+            for i in range(n)
+        ],
+    )
+    session.commit()
+
+
+def _user_id(client, headers):
+    return client.get("/me", headers=headers).json()["id"]
+
+
+def test_export_ndjson(client, session, auth_headers):
+    _bulk_seed(session, _user_id(client, auth_headers), 30)
+
+    r = client.get("/transactions/export", headers=auth_headers)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 30
+    assert lines[0]["description"] == "Compra 29"
+
+
+def test_export_csv_with_filters(client, session, auth_headers):
+    _bulk_seed(session, _user_id(client, auth_headers), 30)
+
+    r = client.get(
+        "/transactions/export",
+        params={"format": "csv", "category": "Mercado"},
+        headers=auth_headers,
+    )
+
+    assert r.status_code == 200
+    assert "transactions.csv" in r.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 15
+    assert {row["category"] for row in rows} == {"Mercado"}
+
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    r = client.get("/transactions/export", params={"format": "xml"}, headers=auth_headers)
+    assert r.status_code == 422
+
+
+def _peak_while_streaming(session, user_id, fmt):
+    tracemalloc.start()
+    try:
+        size = 0
+        for chunk in iter_export(fmt, session, user_id, TransactionFilters()):
+            size += len(chunk)
+        return tracemalloc.get_traced_memory()[1], size
+    finally:
+        tracemalloc.stop()
+
+
+def test_export_memory_stays_flat(session):
+    _bulk_seed(session, 1, 2_000)
+    _bulk_seed(session, 2, 20_000)
+
+    for fmt in ("ndjson", "csv"):
+        small_peak, small_size = _peak_while_streaming(session, 1, fmt)
+        large_peak, large_size = _peak_while_streaming(session, 2, fmt)
+        assert large_size > 9 * small_size
+        # 10x mais linhas não pode significar ~10x mais memória
+        assert large_peak < 2 * small_peak, (fmt, small_peak, large_peak)
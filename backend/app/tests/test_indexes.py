@@ -0,0 +1,65 @@
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, create_engine, select
+
+from app.migrations import create_missing_indexes
+from app.models import Budget, Transaction
+from app.queries import filter_clauses
+from app.schemas import TransactionFilters
+
+
+def _plan(engine, stmt):
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_list_transactions_uses_user_date_index(engine):
+    plan = _plan(
+        engine,
+        select(Transaction)
+        .where(Transaction.user_id == 1)
+        .order_by(Transaction.date.desc()),
+    )
+    assert "ix_transaction_user_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_category_filter_uses_category_index(engine):
+    plan = _plan(
+        engine,
+        select(Transaction.id).where(
+            *filter_clauses(1, TransactionFilters(category="Mercado", kind="expense"))
+        ),
+    )
+    assert "ix_transaction_user_category_kind" in plan
+
+
+def test_budget_lookup_uses_period_index(engine):
+    plan = _plan(
+        engine,
+        select(Budget).where(Budget.user_id == 1, Budget.period == "2025-12"),
+    )
+    assert "ix_budget_user_period_category" in plan
+
+
+def test_existing_database_gets_missing_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # simular um banco antigo: tabelas criadas sem os índices compostos
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            table.create(conn)
+            for index in table.indexes:
+                index.drop(conn)
+    assert "ix_transaction_user_date" not in {
+        ix["name"] for ix in inspect(engine).get_indexes("transaction")
+    }
+
+    with engine.begin() as conn:
+        create_missing_indexes(conn, SQLModel.metadata)
+        create_missing_indexes(conn, SQLModel.metadata)  # idempotente
+
+    names = {ix["name"] for ix in inspect(engine).get_indexes("transaction")}
+    assert {"ix_transaction_user_date", "ix_transaction_user_category_kind"} <= names
+    budget = {ix["name"] for ix in inspect(engine).get_indexes("budget")}
+    assert "ix_budget_user_period_category" in budget
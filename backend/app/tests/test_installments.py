@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, create_engine
+
+from app.migrations import create_missing_columns
+from app.installments import add_months, split_amount
+
+
+def _create_plan(client, headers, **overrides):
+    payload = {
+        "description": "Notebook",
+        "total_amount": 1000.0,
+        "installments": 3,
+        "category": "Eletrônicos",
+        "first_date": "2025-01-31T10:00:00",
+    }
+    payload.update(overrides)
+    r = client.post("/transactions/installments", json=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_create_plan_in_one_request(client, auth_headers):
+    plan = _create_plan(client, auth_headers)
+
+    rows = plan["transactions"]
+    assert [tr["installment_index"] for tr in rows] == [1, 2, 3]
+    assert {tr["installment_total"] for tr in rows} == {3}
+    assert {tr["installment_group"] for tr in rows} == {plan["installment_group"]}
+    assert [tr["amount"] for tr in rows] == [333.33, 333.33, 333.34]
+    assert [tr["date"][:10] for tr in rows] == ["2025-01-31", "2025-02-28", "2025-03-31"]
+
+
+def test_pay_and_cancel_remaining(client, auth_headers):
+    group = _create_plan(client, auth_headers, installments=6)["installment_group"]
+    first_id = client.get("/transactions", headers=auth_headers).json()[-1]["id"]
+    client.patch(f"/transactions/{first_id}/pay", headers=auth_headers)
+
+    r = client.delete(f"/transactions/installments/{group}", headers=auth_headers)
+    assert r.json() == {"deleted": 5}
+    remaining = client.get("/transactions", headers=auth_headers).json()
+    assert [tr["id"] for tr in remaining] == [first_id]
+
+    group = _create_plan(client, auth_headers)["installment_group"]
+    r = client.post(f"/transactions/installments/{group}/pay", headers=auth_headers)
+    assert r.json() == {"updated": 3}
+    r = client.post(f"/transactions/installments/{group}/pay", headers=auth_headers)
+    assert r.json() == {"updated": 0}
+
+
+def test_first_date_with_offset_is_stored_in_utc(client, auth_headers):
+    # 22h em São Paulo já é 1º de fevereiro em UTC
+    plan = _create_plan(client, auth_headers, first_date="2025-01-31T22:00:00-03:00")
+    dates = [tr["date"] for tr in plan["transactions"]]
+    assert dates == ["2025-02-01T01:00:00", "2025-03-01T01:00:00", "2025-04-01T01:00:00"]
+    monthly = client.get("/analytics/monthly", headers=auth_headers).json()
+    assert list(monthly) == ["2025-02", "2025-03", "2025-04"]
+
+
+def test_invalid_plans_rejected(client, auth_headers):
+    for overrides in ({"total_amount": -100.0}, {"total_amount": 0}, {"installments": 0}):
+        payload = {"description": "x", "total_amount": 100.0, "installments": 2, **overrides}
+        r = client.post("/transactions/installments", json=payload, headers=auth_headers)
+        assert r.status_code == 422, overrides
+
+
+def test_unknown_plan(client, auth_headers):
+    r = client.post("/transactions/installments/nope/pay", headers=auth_headers)
+    assert r.status_code == 404
+    r = client.delete("/transactions/installments/nope", headers=auth_headers)
+    assert r.status_code == 404
+
+
+def test_helpers():
+    assert add_months(datetime(2024, 1, 31), 1) == datetime(2024, 2, 29)
+    assert add_months(datetime(2025, 11, 15), 14) == datetime(2027, 1, 15)
+    assert sum(split_amount(99.99, 7)) == 99.99
+
+
+def test_existing_database_gets_new_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, user_id INTEGER, '
+            "description VARCHAR, amount FLOAT, kind VARCHAR, category VARCHAR, "
+            "date DATETIME, is_paid BOOLEAN, installment_total INTEGER, "
+            "installment_index INTEGER)"
+        ))
+
+    with engine.begin() as conn:
+        create_missing_columns(conn, SQLModel.metadata)
+
+    columns = {c["name"] for c in inspect(engine).get_columns("transaction")}
+    assert "installment_group" in columns
@@ -0,0 +1,74 @@
+import copy
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+
+
+def test_server_timing_counts_queries(client, auth_headers):
+    # primeira requisição: busca o usuário + versão + listagem
+    r = client.get("/transactions", headers=auth_headers)
+    timing = r.headers["server-timing"]
+    assert timing.startswith("app;dur=")
+    assert 'desc="3 queries"' in timing
+    # depois o usuário vem do cache de tokens
+    r = client.get("/transactions", headers=auth_headers)
+    assert 'desc="2 queries"' in r.headers["server-timing"]
+
+
+def test_metrics_endpoint_groups_by_route_template(client, auth_headers):
+    metrics.registry.reset()
+    client.post(
+        "/transactions",
+        json={"description": "Café", "amount": 5.0},
+        headers=auth_headers,
+    )
+    client.get("/transactions", headers=auth_headers)
+    client.delete("/transactions/1", headers=auth_headers)
+    client.delete("/transactions/999", headers=auth_headers)
+    client.get("/nao-existe")
+
+    body = client.get("/metrics").text
+    route = 'method="DELETE",route="/transactions/{transaction_id}"'
+    assert f"http_request_duration_seconds_count{{{route}}} 2" in body
+    assert f'http_responses_total{{{route},status="404"}} 1' in body
+    assert f'http_request_duration_seconds_bucket{{{route},le="+Inf"}} 2' in body
+    assert 'route="unmatched"' in body
+    assert 'db_queries_total{method="GET",route="/transactions"} 2' in body
+    assert "cache_user_hits" in body
+    # nenhum caminho concreto vira rótulo
+    assert "/transactions/999" not in body
+
+
+def test_slow_query_log_is_opt_in(client, auth_headers, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger="app.slow_query")
+    client.get("/transactions", headers=auth_headers)
+    assert not caplog.records
+
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 1e-6)
+    client.get("/transactions?category=Mercado", headers=auth_headers)
+    messages = [record.getMessage() for record in caplog.records]
+    assert any('FROM "transaction"' in m and "params" in m for m in messages)
+    # valores dos parâmetros não vão para o log
+    assert not any("Mercado" in m for m in messages)
+
+
+def test_failed_statement_leaves_nothing_on_the_connection(engine):
+    metrics.instrument()
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            info = copy.deepcopy(conn.info)
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM nao_existe"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info == info
+    finally:
+        metrics._current.reset(token)
+    # só as consultas que terminaram são contadas
+    assert stats.queries == 2
@@ -0,0 +1,178 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import database, migrations, rollup
+from app.migrations import v0001_baseline
+from app.migrations.__main__ import main
+from app.models import Category, MonthlyRollup
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names()) - {migrations.VERSION_TABLE}
+    return {
+        table: (
+            {c["name"]: (str(c["type"]), c["nullable"]) for c in inspector.get_columns(table)},
+            {(ix["name"], tuple(ix["column_names"]), bool(ix["unique"]))
+             for ix in inspector.get_indexes(table)},
+        )
+        for table in tables
+        if not table.startswith("transaction_fts")
+    }
+
+
+def _search_ddl(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE name LIKE 'transaction_fts%' ORDER BY name"
+        )).all()
+
+
+def test_migrations_build_the_schema_of_the_models(tmp_path):
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    migrations.upgrade(migrated)
+    reference = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    SQLModel.metadata.create_all(reference)
+
+    assert _schema(migrated) == _schema(reference)
+    assert _search_ddl(migrated) == _search_ddl(reference)
+    assert migrations.current(migrated) == migrations.head()
+    assert migrations.upgrade(migrated) == []  # nada pendente
+
+
+def test_boot_only_checks_the_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "engine", None)
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+
+    with pytest.raises(migrations.SchemaOutOfDate, match="python -m app.migrations"):
+        database.init_db(url)
+    # o boot não cria nada sozinho
+    assert inspect(database.engine).get_table_names() == []
+
+    assert main(["--database-url", url]) == 0
+    database.init_db(url)
+    assert migrations.current(database.engine) == migrations.head()
+
+
+def test_legacy_database_is_adopted(tmp_path):
+    # banco criado pelo create_all antigo, sem tabela de versões nem alguns índices
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    v0001_baseline.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_transaction_user_date"))
+        conn.execute(text(
+            "INSERT INTO user (email, hashed_password, created_at) VALUES ('a@b.c', 'x', '2025-01-01')"
+        ))
+    assert migrations.current(engine) == 0
+
+    migrations.upgrade(engine)
+
+    names = {ix["name"] for ix in inspect(engine).get_indexes("transaction")}
+    assert "ix_transaction_user_date" in names
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM user")).scalar() == 1
+
+
+def test_categories_move_to_their_own_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v1.db'}")
+    migrations.upgrade(engine, target=1)
+    with engine.begin() as conn:
+        for email in ("a@b.c", "d@e.f"):
+            conn.execute(text(
+                "INSERT INTO user (email, hashed_password, created_at) "
+                f"VALUES ('{email}', 'x', '2025-01-01')"
+            ))
+        conn.execute(text(
+            'INSERT INTO "transaction" (user_id, description, amount, kind, category, date, is_paid) '
+            "VALUES (1, 'a', 10, 'expense', 'Mercado', '2025-01-05', 1), "
+            "(1, 'b', 5, 'expense', '', '2025-01-06', 1), "
+            "(1, 'c', 2, 'expense', NULL, '2025-01-07', 1), "
+            "(2, 'd', 7, 'expense', 'Mercado', '2025-01-08', 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO budget (user_id, category, amount, period, created_at, version) "
+            "VALUES (1, 'Lazer', 100, '2025-01', '2025-01-01', 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO monthlyrollup (user_id, month, category, kind, total, tx_count) VALUES "
+            "(1, '2025-01', 'Mercado', 'expense', 10, 1), "
+            "(1, '2025-01', '', 'expense', 7, 2), "
+            "(2, '2025-01', 'Mercado', 'expense', 7, 1)"
+        ))
+
+    migrations.upgrade(engine)
+
+    with Session(engine) as s:
+        ids = {(c.user_id, c.name): c.id for c in s.exec(select(Category))}
+        # mesmo nome em usuários diferentes vira duas categorias; vazio não vira categoria
+        assert set(ids) == {(1, "Mercado"), (1, "Lazer"), (2, "Mercado")}
+        rows = s.execute(text(
+            'SELECT description, category_id FROM "transaction" ORDER BY description'
+        )).all()
+        assert rows == [
+            ("a", ids[1, "Mercado"]), ("b", None), ("c", None), ("d", ids[2, "Mercado"]),
+        ]
+        assert s.execute(text("SELECT category_id FROM budget")).scalar() == ids[1, "Lazer"]
+        rollups = {(r.user_id, r.category_id): r.total for r in s.exec(select(MonthlyRollup))}
+        assert rollups == {(1, ids[1, "Mercado"]): 10, (1, 0): 7, (2, ids[2, "Mercado"]): 7}
+
+
+def test_amounts_become_cents_and_rollups_are_recomputed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v2.db'}")
+    migrations.upgrade(engine, target=2)
+    with engine.begin() as conn:
+        conn.execute(text(
+            'INSERT INTO "transaction" (user_id, description, amount, kind, date, is_paid) '
+            "VALUES (1, 'a', 0.1, 'expense', '2025-01-05', 1), "
+            "(1, 'b', 0.2, 'expense', '2025-01-06', 1), (1, 'c', 19.99, 'income', '2025-02-01', 1)"
+        ))
+        # total em float com o erro de soma acumulado
+        conn.execute(text(
+            "INSERT INTO monthlyrollup (user_id, month, category_id, kind, total, tx_count) "
+            "VALUES (1, '2025-01', 0, 'expense', 0.30000000000000004, 2)"
+        ))
+
+    migrations.upgrade(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text(
+            'SELECT amount FROM "transaction" ORDER BY description'
+        )).scalars().all() == [10, 20, 1999]
+        assert conn.execute(text(
+            "SELECT month, kind, total, tx_count FROM monthlyrollup ORDER BY month"
+        )).all() == [("2025-01", "expense", 30, 2), ("2025-02", "income", 1999, 1)]
+    with Session(engine) as s:
+        assert rollup.check(s) == []
+
+
+def test_status_cli(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'cli.db'}"
+    assert main(["status", "--database-url", url]) == 1
+    assert main(["--database-url", url, "--to", "1"]) == 0
+    assert "applied 0001 baseline" in capsys.readouterr().out
+    main(["status", "--database-url", url])
+    assert "[x] 0001 baseline" in capsys.readouterr().out
+
+
+def test_search_index_is_rebuilt_per_user(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    migrations.upgrade(engine, target=3)
+    with engine.begin() as conn:
+        for user_id, description in ((1, "Supermercado"), (2, "Supermercado")):
+            conn.execute(text(
+                "INSERT INTO user (id, email, hashed_password, created_at) "
+                "VALUES (:id, :email, 'x', '2025-01-01')"
+            ), {"id": user_id, "email": f"{user_id}@b.c"})
+            conn.execute(text(
+                'INSERT INTO "transaction" (user_id, description, amount, kind, date, is_paid) '
+                "VALUES (:user_id, :description, 100, 'expense', '2025-01-01', 0)"
+            ), {"user_id": user_id, "description": description})
+
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        hits = conn.execute(text(
+            "SELECT rowid FROM transaction_fts WHERE transaction_fts MATCH 'u2xsuper*'"
+        )).all()
+    assert hits == [(2,)]
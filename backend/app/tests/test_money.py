@@ -0,0 +1,125 @@
+import os
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import aggregates, bulk, categories, rollup
+from app.models import Budget
+from app.money import from_cents, to_cents
+
+# MONEY_PROPERTY_ROWS=2000000 roda a versão com milhões de linhas
+ROWS = int(os.getenv("MONEY_PROPERTY_ROWS", "20000"))
+NAMES = ("Mercado", "Transporte", "Lazer", "Saúde", None)
+START = datetime(2024, 1, 1)
+MINUTES = 2 * 365 * 24 * 60
+
+
+def _amount(rng):
+    # de centavos a valores de imóvel, sempre com duas casas
+    return Decimal(rng.randrange(1, 10 ** rng.choice((2, 4, 6, 9, 11)))).scaleb(-2)
+
+
+def _exact(totals):
+    """Valores devolvidos pela API lidos como decimais exatos."""
+    if isinstance(totals, dict):
+        return {key: _exact(value) for key, value in totals.items()}
+    return Decimal(repr(totals))
+
+
+def _reference(rows, key=lambda row: None, date_from=None, date_to=None):
+    """Somas exatas em Decimal, sem passar pelo banco."""
+    totals = defaultdict(lambda: {"income": Decimal(0), "expense": Decimal(0)})
+    for row in rows:
+        if (date_from and row["date"] < date_from) or (date_to and row["date"] >= date_to):
+            continue
+        totals[key(row)][row["kind"]] += row["decimal"]
+    return dict(totals)
+
+
+def test_cents_round_trip():
+    rng = random.Random(0)
+    for _ in range(100_000):
+        cents = rng.randrange(-10 ** 13, 10 ** 13)
+        assert to_cents(from_cents(cents)) == cents
+        assert Decimal(repr(from_cents(cents))) == Decimal(cents).scaleb(-2)
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents("0.125") == 12  # meio centavo vai para o par
+    assert to_cents(Decimal("19.99")) == 1999
+    assert to_cents(3) == 300
+
+
+def test_amounts_add_up_exactly(client, auth_headers):
+    for amount, kind in [(0.1, "income")] * 3 + [(0.1, "expense")]:
+        client.post(
+            "/transactions",
+            json={"description": "x", "amount": amount, "kind": kind},
+            headers=auth_headers,
+        )
+    summary = client.get("/summary", headers=auth_headers).json()
+    # em float: 0.30000000000000004 e 0.19999999999999998
+    assert summary == {"total_income": 0.3, "total_expense": 0.1, "balance": 0.2}
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_totals_match_a_reference_exactly(session, seed):
+    rng = random.Random(seed)
+    ids = categories.resolve(session, 1, NAMES)
+    rows = []
+    for i in range(ROWS):
+        amount = _amount(rng)
+        rows.append({
+            "user_id": 1,
+            "description": f"t{i}",
+            "amount": float(amount),  # o que um cliente JSON envia
+            "decimal": amount,
+            "kind": rng.choice(("income", "expense")),
+            "category_id": ids.get(rng.choice(NAMES)),
+            "date": START + timedelta(minutes=rng.randrange(MINUTES)),
+            "is_paid": False,
+        })
+    bulk.insert_transactions(session, rows)
+    rollup.add(session, 1, rows)
+    planned = {}
+    for month in range(1, 13):
+        for name in NAMES[:-1]:
+            planned[(f"2024-{month:02d}", name)] = _amount(rng)
+            session.add(Budget(
+                user_id=1,
+                category_id=ids[name],
+                amount=float(planned[(f"2024-{month:02d}", name)]),
+                period=f"2024-{month:02d}",
+            ))
+    session.commit()
+
+    assert rollup.check(session) == []
+    everything = _reference(rows)[None]
+    totals = aggregates.totals_by_kind(session, 1)
+    assert _exact(totals) == everything
+    assert _exact(aggregates.balance(totals)) == everything["income"] - everything["expense"]
+
+    # intervalo fora do limite de mês: soma direto nas transações
+    date_from, date_to = datetime(2024, 3, 10, 12), datetime(2025, 8, 17)
+    assert _exact(aggregates.totals_by_kind(session, 1, date_from, date_to)) == (
+        _reference(rows, date_from=date_from, date_to=date_to)[None]
+    )
+
+    names = {category_id: name for name, category_id in ids.items()}
+    assert _exact(aggregates.totals_by_category(session, 1)) == _reference(
+        rows, lambda row: names.get(row["category_id"], aggregates.UNCATEGORIZED)
+    )
+    assert _exact(aggregates.totals_by_month(session, 1)) == _reference(
+        rows, lambda row: row["date"].strftime("%Y-%m")
+    )
+
+    spent = _reference(
+        [row for row in rows if row["kind"] == "expense"],
+        lambda row: (row["date"].strftime("%Y-%m"), names.get(row["category_id"])),
+    )
+    for item in aggregates.budget_execution(session, 1):
+        key = (item["period"], item["category"])
+        want = spent.get(key, {"expense": Decimal(0)})["expense"]
+        assert _exact(item["spent"]) == want
+        assert _exact(item["remaining"]) == planned[key] - want
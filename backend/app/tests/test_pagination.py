@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from app import categories
+from app.models import Transaction
+
+
+def _seed(client, session, headers, n=25):
+    user_id = client.get("/me", headers=headers).json()["id"]
+    ids = categories.resolve(session, user_id, ["Mercado", "Lazer"])
+    base = datetime(2025, 1, 1)
+    for i in range(n):
+        session.add(
+            Transaction(
+                user_id=user_id,
+                description=f"tr {i}",
+                amount=float(i),
+                kind="income" if i % 5 == 0 else "expense",
+                category_id=ids["Mercado" if i % 2 else "Lazer"],
+                # datas repetidas para exercitar o desempate por id
+                date=base + timedelta(days=i // 3),
+                is_paid=i % 4 == 0,
+            )
+        )
+    session.commit()
+
+
+def _all_pages(client, headers, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        r = client.get("/transactions", params=query, headers=headers)
+        assert r.status_code == 200, r.text
+        seen.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_keyset_pages_cover_history_once(client, session, auth_headers):
+    _seed(client, session, auth_headers)
+
+    items = _all_pages(client, auth_headers, limit=4)
+
+    assert len(items) == 25
+    assert len({tr["id"] for tr in items}) == 25
+    keys = [(tr["date"], tr["id"]) for tr in items]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_last_page_has_no_cursor(client, session, auth_headers):
+    _seed(client, session, auth_headers, n=3)
+    r = client.get("/transactions", params={"limit": 3}, headers=auth_headers)
+    assert len(r.json()) == 3
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_filters(client, session, auth_headers):
+    _seed(client, session, auth_headers)
+
+    items = _all_pages(
+        client,
+        auth_headers,
+        limit=2,
+        kind="expense",
+        category="Mercado",
+        is_paid=False,
+        date_from="2025-01-02T00:00:00",
+        date_to="2025-01-07T00:00:00",
+    )
+
+    assert items
+    for tr in items:
+        assert tr["kind"] == "expense"
+        assert tr["category"] == "Mercado"
+        assert tr["is_paid"] is False
+        assert "2025-01-02" <= tr["date"] < "2025-01-07"
+
+
+def test_invalid_cursor(client, auth_headers):
+    r = client.get("/transactions", params={"cursor": "???"}, headers=auth_headers)
+    assert r.status_code == 400
+
+
+def test_limit_is_bounded(client, auth_headers):
+    r = client.get("/transactions", params={"limit": 100000}, headers=auth_headers)
+    assert r.status_code == 422
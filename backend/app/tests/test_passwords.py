@@ -0,0 +1,66 @@
+import threading
+
+from sqlmodel import select
+
+from app import auth, passwords
+from app.models import User
+from app.ratelimit import RateLimiter
+
+EMAIL = "user@example.com"
+
+
+def _login(client, password="secret123"):
+    return client.post("/auth/token", data={"username": EMAIL, "password": password})
+
+
+def _stored_hash(session):
+    session.expire_all()
+    return session.exec(select(User).where(User.email == EMAIL)).one().hashed_password
+
+
+def test_login_rehashes_when_settings_change(client, session, auth_headers, monkeypatch):
+    assert _stored_hash(session).startswith("$5$")  # sha256_crypt
+
+    monkeypatch.setattr(passwords, "SETTINGS", ("pbkdf2_sha256", 1000))
+    assert _login(client).status_code == 200
+
+    upgraded = _stored_hash(session)
+    assert upgraded.startswith("$pbkdf2-sha256$1000$")
+    assert _login(client).status_code == 200
+    assert _stored_hash(session) == upgraded  # já atualizado, não refaz
+
+
+def test_cost_change_alone_triggers_rehash():
+    old = passwords.hash_password("pw", ("bcrypt", 4))
+    valid, new_hash = passwords.verify_and_update("pw", old, ("bcrypt", 5))
+    assert valid and new_hash.startswith("$2b$05$")
+    assert passwords.verify_and_update("pw", new_hash, ("bcrypt", 5)) == (True, None)
+
+
+def test_wrong_password_does_not_rehash(client, session, auth_headers, monkeypatch):
+    before = _stored_hash(session)
+    monkeypatch.setattr(passwords, "SETTINGS", ("pbkdf2_sha256", 1000))
+    assert _login(client, "errada").status_code == 400
+    assert _stored_hash(session) == before
+
+
+def test_threadpool_mode(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(passwords, "HASH_WORKERS", 0)
+    assert _login(client).status_code == 200
+
+
+def test_saturated_hash_pool_is_refused(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(passwords, "_pending", threading.Semaphore(0))
+    r = _login(client)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_login_throttled_per_ip(client, auth_headers, monkeypatch):
+    # relógio fixo: a janela não pode virar no meio do teste
+    monkeypatch.setattr(auth, "login_limiter", RateLimiter(10, 60, clock=lambda: 30.0))
+    statuses = [_login(client, "errada").status_code for _ in range(11)]
+    assert statuses == [400] * 10 + [429]
+    r = _login(client)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 0
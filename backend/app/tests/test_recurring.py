@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import select
+
+from app import recurring
+from app.models import RecurringRule, Transaction
+
+NOW = datetime(2025, 12, 15, 12, 0)
+
+
+def _rule(client, headers, **overrides):
+    payload = {
+        "description": "Aluguel",
+        "amount": 1500.0,
+        "category": "Moradia",
+        "frequency": "monthly",
+        "start_date": "2090-01-31T00:00:00",
+        **overrides,
+    }
+    r = client.post("/recurring", json=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _dates(session, rule_id):
+    return session.exec(
+        select(Transaction.date)
+        .where(Transaction.recurring_rule_id == rule_id)
+        .order_by(Transaction.date)
+    ).all()
+
+
+def test_occurrences_keep_day_of_month(client, auth_headers, engine, session):
+    rule = _rule(client, auth_headers)
+    assert rule["occurrences"] == 0  # ainda no futuro
+
+    created = recurring.run_once(engine, now=datetime(2090, 4, 1))
+    assert created == 3
+    # fevereiro limita ao dia 28, mas março volta ao dia 31
+    assert _dates(session, rule["id"]) == [
+        datetime(2090, 1, 31), datetime(2090, 2, 28), datetime(2090, 3, 31),
+    ]
+    summary = client.get("/analytics/monthly", headers=auth_headers).json()
+    assert summary["2090-02"]["expense"] == 1500.0
+
+
+def test_due_occurrences_created_on_create(client, auth_headers, session):
+    start = (datetime.utcnow() - timedelta(days=20)).replace(microsecond=0)
+    rule = _rule(client, auth_headers, frequency="weekly", start_date=start.isoformat())
+    assert rule["occurrences"] == 3
+    assert len(_dates(session, rule["id"])) == 3
+    listed = client.get("/recurring", headers=auth_headers).json()
+    assert [r["id"] for r in listed] == [rule["id"]]
+
+
+def test_catch_up_is_one_batched_insert(client, auth_headers, engine, session):
+    for i in range(3):
+        _rule(client, auth_headers, description=f"Assinatura {i}",
+              frequency="daily", start_date="2090-01-01T08:00:00")
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO "transaction"'):
+            # um INSERT de várias linhas: uma tupla "(?, ...)" por linha
+            inserts.append(len(parameters) if executemany else statement.count("(?"))
+
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    try:
+        created = recurring.run_once(engine, now=datetime(2090, 3, 1))
+    finally:
+        event.remove(engine, "before_cursor_execute", count_inserts)
+    assert created == 3 * 59  # 1º de janeiro a 28 de fevereiro, três regras
+    assert inserts == [created]
+
+
+def test_runs_are_idempotent(client, auth_headers, engine, session):
+    rule = _rule(client, auth_headers, end_date="2090-06-30T00:00:00")
+    later = datetime(2091, 1, 1)
+    assert recurring.run_once(engine, now=later) == 6
+    assert recurring.run_once(engine, now=later) == 0  # "reinício"
+    session.expire_all()
+    stored = session.get(RecurringRule, rule["id"])
+    assert stored.occurrences == 6
+    assert stored.active is False  # passou do end_date
+
+
+def test_duplicate_materialization_is_rejected(client, auth_headers, engine, session):
+    rule = _rule(client, auth_headers)
+    assert recurring.run_once(engine, now=datetime(2090, 2, 1)) == 1
+    # outro processo com uma cópia antiga da regra tenta gerar o mesmo mês
+    stored = session.get(RecurringRule, rule["id"])
+    stored.occurrences, stored.next_date = 0, datetime(2090, 1, 31)
+    session.add(stored)
+    session.commit()
+    assert recurring.run_once(engine, now=datetime(2090, 2, 1)) == 0
+    assert len(_dates(session, rule["id"])) == 1
+
+
+def test_create_tolerates_a_concurrent_scheduler(client, auth_headers, session, monkeypatch):
+    insert = recurring.insert_transactions
+
+    def scheduler_first(db, values):
+        # o agendador grava as mesmas ocorrências antes desta requisição
+        insert(db, [dict(v) for v in values])
+        db.commit()
+        return insert(db, values)
+
+    monkeypatch.setattr(recurring, "insert_transactions", scheduler_first)
+    start = (datetime.utcnow() - timedelta(days=20)).replace(microsecond=0)
+    rule = _rule(client, auth_headers, frequency="weekly", start_date=start.isoformat())
+
+    assert rule["occurrences"] == 3
+    assert len(_dates(session, rule["id"])) == 3
+
+
+def test_lease_allows_one_scheduler(engine, session):
+    assert recurring.acquire_lease(session, "worker-a", NOW, seconds=60)
+    assert not recurring.acquire_lease(session, "worker-b", NOW, seconds=60)
+    assert recurring.acquire_lease(session, "worker-a", NOW + timedelta(seconds=30))
+    # a depois para de renovar; b assume quando o lease expira
+    later = NOW + timedelta(seconds=30 + recurring.LEASE_SECONDS)
+    assert recurring.acquire_lease(session, "worker-b", later)
+    assert recurring.run_once(engine, owner="worker-a", now=later) == 0
+
+
+def test_deleting_rule_keeps_transactions(client, auth_headers, session):
+    start = (datetime.utcnow() - timedelta(days=1)).replace(microsecond=0)
+    rule = _rule(client, auth_headers, start_date=start.isoformat())
+    r = client.delete(f"/recurring/{rule['id']}", headers=auth_headers)
+    assert r.status_code == 200
+    total = session.exec(select(func.count()).select_from(Transaction)).one()
+    assert total == 1
+    assert client.delete(f"/recurring/{rule['id']}", headers=auth_headers).status_code == 404
+    # o mesmo id pode voltar sem colidir com as ocorrências antigas
+    again = _rule(client, auth_headers, start_date=start.isoformat())
+    assert again["occurrences"] == 1
+
+
+def test_dates_with_and_without_offset(client, auth_headers, session):
+    rule = _rule(client, auth_headers, start_date="2090-01-31T00:00:00-03:00",
+                 end_date="2090-03-31T02:00:00")
+    # guardadas em UTC sem fuso, como as demais datas
+    assert rule["start_date"] == rule["next_date"] == "2090-01-31T03:00:00"
+    assert rule["end_date"] == "2090-03-31T02:00:00"
+
+    r = client.post(
+        "/recurring",
+        json={"description": "x", "amount": 1.0, "start_date": "2090-01-01T00:00:00-03:00",
+              "end_date": "2090-01-01T02:00:00"},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("payload", [
+    {"frequency": "hourly"},
+    {"interval": 0},
+])
+def test_invalid_rules_rejected(client, auth_headers, payload):
+    r = client.post(
+        "/recurring",
+        json={"description": "x", "amount": 1.0, "start_date": "2026-01-01T00:00:00",
+              **payload},
+        headers=auth_headers,
+    )
+    assert r.status_code == 422
+    r = client.post(
+        "/recurring",
+        json={"description": "x", "amount": 1.0, "start_date": "2026-01-01T00:00:00",
+              "end_date": "2025-01-01T00:00:00"},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
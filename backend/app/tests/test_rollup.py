@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, create_engine, select
+
+from app import database, migrations, rollup
+from app.models import Category, MonthlyRollup, Transaction
+
+
+def _create(client, headers, **data):
+    payload = {"description": "x", "amount": 10.0, "category": "Mercado"}
+    payload.update(data)
+    r = client.post("/transactions", json=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_rollup_follows_every_write_path(client, session, auth_headers):
+    tr = _create(client, auth_headers, amount=50.0)
+    _create(client, auth_headers, amount=25.0, kind="income", category=None)
+    client.put(
+        f"/transactions/{tr['id']}",
+        json={"description": "x", "amount": 70.0, "category": "Lazer"},
+        headers=auth_headers,
+    )
+    doomed = _create(client, auth_headers, amount=5.0)
+    client.delete(f"/transactions/{doomed['id']}", headers=auth_headers)
+    client.post(
+        "/transactions/bulk",
+        json=[{"description": "b", "amount": 1.5, "date": "2024-06-01T00:00:00"}],
+        headers=auth_headers,
+    )
+    group = client.post(
+        "/transactions/installments",
+        json={"description": "TV", "total_amount": 300.0, "installments": 3},
+        headers=auth_headers,
+    ).json()["installment_group"]
+    client.delete(f"/transactions/installments/{group}", headers=auth_headers)
+
+    assert rollup.check(session) == []
+    lazer = session.exec(select(Category.id).where(Category.name == "Lazer")).one()
+    keys = {r.category_id for r in session.exec(select(MonthlyRollup)).all()}
+    assert keys == {lazer, 0}  # 'Mercado' zerado foi removido; 0 = sem categoria
+
+
+def test_check_detects_drift_and_rebuild_fixes_it(client, session, auth_headers):
+    _create(client, auth_headers, amount=40.0)
+    row = session.exec(select(MonthlyRollup)).one()
+    row.total = 999.0
+    session.add(row)
+    session.commit()
+
+    mismatches = rollup.check(session)
+    assert len(mismatches) == 1
+    assert mismatches[0]["expected"]["total"] == 40.0
+
+    assert rollup.rebuild(session) == 1
+    assert rollup.check(session) == []
+
+
+def test_rebuild_from_rows_written_outside_the_api(session):
+    session.add(Transaction(user_id=7, description="legado", amount=12.0))
+    session.commit()
+    assert len(rollup.check(session, user_id=7)) == 1
+
+    rollup.rebuild(session, user_id=7)
+
+    assert rollup.check(session, user_id=7) == []
+
+
+def test_cli(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(database, "engine", None)
+    monkeypatch.setattr(database, "MIGRATE_ON_STARTUP", False)
+    url = f"sqlite:///{tmp_path / 'cli.db'}"
+    # migrar é um passo à parte (python -m app.migrations)
+    with pytest.raises(migrations.SchemaOutOfDate):
+        rollup.main(["check", "--database-url", url])
+    engine = database.create_db_engine(url)
+    migrations.upgrade(engine)
+    engine.dispose()
+
+    assert rollup.main(["rebuild", "--database-url", url]) == 0
+    assert rollup.main(["check", "--database-url", url]) == 0
+    assert "ok" in capsys.readouterr().out
+
+
+def test_migrations_backfill_rollups_of_existing_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "engine", None)
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    engine = create_engine(url)
+    migrations.upgrade(engine, target=1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            'INSERT INTO "transaction" (user_id, description, amount, kind, category, date, is_paid) '
+            "VALUES (1, 'antiga', 3.0, 'expense', 'Lazer', '2025-01-05', 1)"
+        ))
+        # banco de antes da tabela de rollups (e das migrações)
+        conn.execute(text("DROP TABLE monthlyrollup"))
+        conn.execute(text("DROP TABLE schema_migrations"))
+    engine.dispose()
+
+    database.init_db(url, migrate=True)
+
+    with Session(database.engine) as s:
+        row = s.exec(select(MonthlyRollup)).one()
+        assert row.total == 3.0
+        assert row.category_id == s.exec(select(Category.id)).one()
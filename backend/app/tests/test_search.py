@@ -0,0 +1,138 @@
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, create_engine
+
+from app import search
+
+
+def _seed(client, headers, descriptions):
+    items = [
+        {"description": d, "amount": 10.0, "date": f"2025-11-{i + 1:02d}T00:00:00"}
+        for i, d in enumerate(descriptions)
+    ]
+    r = client.post("/transactions/bulk", json=items, headers=headers)
+    assert r.json()["inserted"] == len(descriptions)
+
+
+def _search(client, headers, q, **params):
+    r = client.get("/transactions/search", params={"q": q, **params}, headers=headers)
+    assert r.status_code == 200, r.text
+    return [row["description"] for row in r.json()]
+
+
+def test_prefix_and_accent_insensitive(client, auth_headers):
+    _seed(client, auth_headers, [
+        "Pão de Açúcar", "Farmácia São João", "Mercado Extra", "Mercadinho da esquina",
+    ])
+    assert _search(client, auth_headers, "acucar") == ["Pão de Açúcar"]
+    assert _search(client, auth_headers, "FARMACIA") == ["Farmácia São João"]
+    assert set(_search(client, auth_headers, "merc")) == {
+        "Mercado Extra", "Mercadinho da esquina",
+    }
+    # todas as palavras precisam casar
+    assert _search(client, auth_headers, "sao jo") == ["Farmácia São João"]
+    assert _search(client, auth_headers, "sao mercado") == []
+
+
+def test_query_syntax_is_not_injected(client, auth_headers):
+    _seed(client, auth_headers, ["Mercado Extra"])
+    for q in ['"', "merc*", "NEAR(a b)", "mercado OR", "-)("]:
+        _search(client, auth_headers, q)
+    assert _search(client, auth_headers, '"mercado" OR') == []
+    assert _search(client, auth_headers, "!!!") == []
+
+
+def test_results_ranked_and_paginated(client, auth_headers):
+    _seed(client, auth_headers, [
+        "Uber para o aeroporto de Guarulhos", "Uber Uber", "Jantar",
+        "Uber aeroporto", "Uber centro",
+    ])
+    r = client.get(
+        "/transactions/search", params={"q": "uber", "limit": 2}, headers=auth_headers
+    )
+    first = [row["description"] for row in r.json()]
+    assert first[0] == "Uber Uber"  # bm25: mais ocorrências primeiro
+    cursor = r.headers["x-next-cursor"]
+    r = client.get(
+        "/transactions/search",
+        params={"q": "uber", "limit": 2, "cursor": cursor},
+        headers=auth_headers,
+    )
+    second = [row["description"] for row in r.json()]
+    assert "x-next-cursor" not in r.headers
+    assert len(set(first + second)) == 4
+    assert second[-1] == "Uber para o aeroporto de Guarulhos"  # descrição mais longa
+
+    r = client.get(
+        "/transactions/search", params={"q": "uber", "cursor": "lixo"}, headers=auth_headers
+    )
+    assert r.status_code == 400
+
+
+def test_pages_seek_past_the_last_row(client, auth_headers):
+    _seed(client, auth_headers, ["Uber A", "Uber B", "Uber C", "Uber D"])
+    r = client.get(
+        "/transactions/search", params={"q": "uber", "limit": 2}, headers=auth_headers
+    )
+    first = [row["id"] for row in r.json()]
+    # apagar uma linha já vista não faz a próxima página pular resultados
+    client.delete(f"/transactions/{first[0]}", headers=auth_headers)
+    r = client.get(
+        "/transactions/search",
+        params={"q": "uber", "limit": 2, "cursor": r.headers["x-next-cursor"]},
+        headers=auth_headers,
+    )
+    second = [row["id"] for row in r.json()]
+    assert len(second) == 2 and not set(first) & set(second)
+
+
+def test_index_follows_updates_and_deletes(client, auth_headers):
+    _seed(client, auth_headers, ["Padaria"])
+    tr = client.get("/transactions", headers=auth_headers).json()[0]
+    client.put(
+        f"/transactions/{tr['id']}",
+        json={"description": "Açougue", "amount": 10.0},
+        headers=auth_headers,
+    )
+    assert _search(client, auth_headers, "padaria") == []
+    assert _search(client, auth_headers, "acougue") == ["Açougue"]
+
+    client.delete(f"/transactions/{tr['id']}", headers=auth_headers)
+    assert _search(client, auth_headers, "acougue") == []
+
+
+def test_search_is_per_user_and_filtered(client, auth_headers):
+    _seed(client, auth_headers, ["Mercado"])
+    r = client.post(
+        "/auth/register", json={"email": "other@example.com", "password": "secret123"}
+    )
+    other = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    assert _search(client, other, "mercado") == []
+    assert _search(client, auth_headers, "mercado", kind="income") == []
+
+
+def test_existing_database_gets_indexed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # simular um banco antigo: tabela sem o índice de busca
+    with engine.begin() as conn:
+        for t in SQLModel.metadata.sorted_tables:
+            t.create(conn)
+        for name in ("transaction_fts_ai", "transaction_fts_ad", "transaction_fts_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("DROP TABLE transaction_fts"))
+        conn.execute(text(
+            "INSERT INTO user (id, email, hashed_password, created_at) "
+            "VALUES (1, 'a@b.c', 'x', '2025-01-01')"
+        ))
+        conn.execute(text(
+            'INSERT INTO "transaction" (user_id, description, amount, kind, date, is_paid) '
+            "VALUES (1, 'Supermercado', 1.0, 'expense', '2025-01-01', 0)"
+        ))
+    assert "transaction_fts" not in inspect(engine).get_table_names()
+
+    search.install(engine)
+    search.install(engine)  # idempotente
+    with engine.connect() as conn:
+        hits = conn.execute(text(
+            "SELECT rowid FROM transaction_fts WHERE transaction_fts MATCH 'u1xsuper*'"
+        )).all()
+    assert hits == [(1,)]
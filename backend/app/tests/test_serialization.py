@@ -0,0 +1,59 @@
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas import BudgetRead, TransactionRead
+
+
+def _seed(client, headers, n):
+    items = [
+        {
+            "description": f"Compra {i}",
+            "amount": 10.5 + i,
+            "kind": "expense",
+            "category": "Mercado" if i % 2 else None,
+            "date": f"2025-11-{1 + i % 28:02d}T12:30:00.123456",
+        }
+        for i in range(n)
+    ]
+    r = client.post("/transactions/bulk", json=items, headers=headers)
+    assert r.json()["inserted"] == n
+
+
+def test_list_matches_response_model(client, auth_headers):
+    _seed(client, auth_headers, 3)
+    client.post(
+        "/budgets",
+        json={"category": "Mercado", "amount": 500.0, "period": "2025-11"},
+        headers=auth_headers,
+    )
+
+    rows = client.get("/transactions", headers=auth_headers).json()
+    assert len(rows) == 3
+    for row in rows:
+        # o caminho rápido não valida, mas o formato continua o do schema
+        assert jsonable_encoder(TransactionRead.parse_obj(row)) == row
+    assert rows[0]["date"].startswith("2025-11-03T12:30:00")
+
+    budgets = client.get("/budgets", headers=auth_headers).json()
+    assert set(budgets[0]) == set(BudgetRead.__fields__)
+
+
+def test_fast_path_keeps_headers(client, auth_headers):
+    _seed(client, auth_headers, 3)
+    r = client.get("/transactions?limit=2", headers=auth_headers)
+    assert r.headers["content-type"] == "application/json"
+    assert "x-next-cursor" in r.headers
+    assert "etag" in r.headers
+    assert int(r.headers["content-length"]) > 0
+
+
+def test_large_responses_are_gzipped(client, auth_headers):
+    _seed(client, auth_headers, 50)
+    r = client.get(
+        "/transactions", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(r.json()) == 50
+
+    # respostas pequenas não compensam a compressão
+    r = client.get("/me", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
@@ -0,0 +1,121 @@
+def _create(client, headers, description, amount=10.0):
+    r = client.post(
+        "/transactions",
+        json={"description": description, "amount": amount},
+        headers=headers,
+    )
+    return r.json()
+
+
+def _sync(client, headers, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    r = client.get("/sync", params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_full_snapshot_then_deltas(client, auth_headers):
+    a = _create(client, auth_headers, "a")
+    b = _create(client, auth_headers, "b")
+    client.post(
+        "/budgets",
+        json={"category": "Mercado", "amount": 500, "period": "2025-12"},
+        headers=auth_headers,
+    )
+
+    snapshot = _sync(client, auth_headers)
+    assert {t["description"] for t in snapshot["transactions"]} == {"a", "b"}
+    assert len(snapshot["budgets"]) == 1
+    assert snapshot["has_more"] is False
+    cursor = snapshot["cursor"]
+
+    # nada mudou: delta vazio, mesmo cursor
+    empty = _sync(client, auth_headers, cursor)
+    assert empty["transactions"] == [] and empty["budgets"] == []
+    assert empty["cursor"] == cursor
+
+    client.put(
+        f"/transactions/{a['id']}",
+        json={"description": "a2", "amount": 11.0},
+        headers=auth_headers,
+    )
+    c = _create(client, auth_headers, "c")
+    client.delete(f"/transactions/{b['id']}", headers=auth_headers)
+
+    delta = _sync(client, auth_headers, cursor)
+    assert {t["description"] for t in delta["transactions"]} == {"a2", "c"}
+    assert delta["deleted"] == {"transaction": [b["id"]], "budget": []}
+    assert delta["transactions"][-1]["id"] == c["id"]
+    assert delta["transactions"][0]["updated_at"]
+
+
+def test_set_based_writes_are_synced(client, auth_headers):
+    cursor = _sync(client, auth_headers)["cursor"]
+    plan = client.post(
+        "/transactions/installments",
+        json={"description": "TV", "total_amount": 300.0, "installments": 3},
+        headers=auth_headers,
+    ).json()
+    ids = sorted(t["id"] for t in plan["transactions"])
+    assert sorted(t["id"] for t in _sync(client, auth_headers, cursor)["transactions"]) == ids
+
+    cursor = _sync(client, auth_headers)["cursor"]
+    client.delete(f"/transactions/installments/{plan['installment_group']}", headers=auth_headers)
+    assert sorted(_sync(client, auth_headers, cursor)["deleted"]["transaction"]) == ids
+
+
+def test_large_change_sets_are_paged(client, auth_headers):
+    client.post(
+        "/transactions/bulk",
+        json=[{"description": f"t{i}", "amount": i} for i in range(25)],
+        headers=auth_headers,
+    )
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = _sync(client, auth_headers, cursor, limit=10)
+        pages += 1
+        seen += [t["id"] for t in page["transactions"]]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+        # escrita durante a paginação entra só na próxima sincronização
+        if pages == 1:
+            late = _create(client, auth_headers, "late")
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 25
+    assert [t["id"] for t in _sync(client, auth_headers, cursor)["transactions"]] == [late["id"]]
+
+
+def test_reused_id_survives_paged_sync(client, auth_headers):
+    for name in ("a", "b", "c"):
+        _create(client, auth_headers, name)
+    cursor = _sync(client, auth_headers)["cursor"]
+    local = {t["id"]: t for t in _sync(client, auth_headers)["transactions"]}
+
+    old = max(local)
+    client.delete(f"/transactions/{old}", headers=auth_headers)
+    reused = _create(client, auth_headers, "nova")
+    assert reused["id"] == old  # o SQLite devolve o maior rowid liberado
+    for name in ("d", "e"):
+        _create(client, auth_headers, name)
+
+    # o cliente aplica página a página: exclusões primeiro, depois upserts
+    pages = 0
+    while True:
+        page = _sync(client, auth_headers, cursor, limit=1)
+        for id in page["deleted"]["transaction"]:
+            local.pop(id, None)
+        local.update((t["id"], t) for t in page["transactions"])
+        cursor, pages = page["cursor"], pages + 1
+        if not page["has_more"]:
+            break
+
+    assert pages > 1
+    assert local[old]["description"] == "nova"
+    assert {t["description"] for t in local.values()} == {"a", "b", "nova", "d", "e"}
+
+
+def test_invalid_cursor(client, auth_headers):
+    assert client.get("/sync", params={"since": "abc"}, headers=auth_headers).status_code == 400
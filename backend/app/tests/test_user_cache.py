@@ -0,0 +1,86 @@
+from jose import jwt
+
+from app.auth import ALGORITHM, SECRET_KEY, create_access_token, token_cache
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry_and_lru_bound():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # 'a' passa a ser o mais recente
+    cache.set("c", 3)  # expulsa 'b'
+    assert cache.get("b") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_token_carries_user_id(client, auth_headers):
+    token = auth_headers["Authorization"].split()[1]
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    me = client.get("/me", headers=auth_headers).json()
+    assert payload["uid"] == me["id"]
+    assert payload["sub"] == me["email"]
+
+
+def test_repeated_requests_hit_the_cache(client, auth_headers):
+    client.get("/me", headers=auth_headers)
+    hits = token_cache.hits
+    for _ in range(5):
+        assert client.get("/me", headers=auth_headers).status_code == 200
+    assert token_cache.hits == hits + 5
+
+
+def test_legacy_token_without_uid(client, auth_headers):
+    legacy = create_access_token({"sub": "user@example.com"})
+    r = client.get("/me", headers={"Authorization": f"Bearer {legacy}"})
+    assert r.json()["email"] == "user@example.com"
+
+
+def test_password_change_invalidates_cache(client, auth_headers):
+    client.get("/me", headers=auth_headers)
+    assert len(token_cache) == 1
+
+    r = client.post(
+        "/auth/password",
+        json={"current_password": "secret123", "new_password": "nova-senha"},
+        headers=auth_headers,
+    )
+
+    assert r.json() == {"updated": True}
+    assert len(token_cache) == 0
+    login = client.post(
+        "/auth/token", data={"username": "user@example.com", "password": "nova-senha"}
+    )
+    assert login.status_code == 200
+
+
+def test_wrong_current_password(client, auth_headers):
+    r = client.post(
+        "/auth/password",
+        json={"current_password": "errada", "new_password": "x"},
+        headers=auth_headers,
+    )
+    assert r.status_code == 400
+
+
+def test_deleted_user_is_rejected(client, auth_headers):
+    client.post(
+        "/transactions", json={"description": "x", "amount": 1.0}, headers=auth_headers
+    )
+    client.get("/me", headers=auth_headers)
+
+    assert client.delete("/me", headers=auth_headers).json() == {"deleted": True}
+
+    assert client.get("/me", headers=auth_headers).status_code == 401
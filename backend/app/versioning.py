@@ -0,0 +1,110 @@
+"""Per-user data versions and conditional GETs.
+
+Every write endpoint calls ``bump`` (or ``stamp``/``touch``, which also
+mark the written rows for delta sync) inside its DB transaction. Read
+endpoints call ``conditional_get`` first: it costs one primary-key lookup,
+and when the client already holds the current version the handler
+returns 304 without running its query or serializing anything.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlmodel import Session, select
+from .models import User
+
+
+def bump(session: Session, user_id: int) -> int:
+    """Advance the user's data version (no commit); returns the new version."""
+    session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1, data_updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return current(session, user_id)[0]
+
+
+def stamp(session: Session, user_id: int) -> dict:
+    """Bump the version; returns the sync columns for rows written now."""
+    return {"version": bump(session, user_id), "updated_at": datetime.utcnow()}
+
+
+def touch(session: Session, user_id: int, *rows) -> int:
+    """Bump the version and stamp ``rows`` (ORM objects) with it."""
+    values = stamp(session, user_id)
+    for row in rows:
+        for key, value in values.items():
+            setattr(row, key, value)
+    return values["version"]
+
+
+def current(session: Session, user_id: int) -> Tuple[int, datetime]:
+    version, updated_at, created_at = session.exec(
+        select(User.data_version, User.data_updated_at, User.created_at).where(
+            User.id == user_id
+        )
+    ).one()
+    return version or 0, updated_at or created_at
+
+
+def make_etag(user_id: int, version: int, request: Request) -> str:
+    # the same version renders differently per path and query string
+    variant = hashlib.sha1(
+        f"{request.url.path}?{request.url.query}".encode()
+    ).hexdigest()[:12]
+    return f'"{user_id}-{version}-{variant}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_get(
+    request: Request, response: Response, session: Session, user_id: int
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current.
+
+    Otherwise set ETag (and Last-Modified, once the last write's second has
+    passed) on ``response``, keep the version on
+    ``request.state`` (``data_version``, ``data_updated_at``) for result
+    caches, and return None.
+    """
+    version, updated_at = current(session, user_id)
+    request.state.data_version = version
+    request.state.data_updated_at = updated_at
+    last_modified = updated_at.replace(tzinfo=timezone.utc)
+    headers = {
+        "ETag": make_etag(user_id, version, request),
+        # always revalidate, never share between users
+        "Cache-Control": "private, no-cache",
+    }
+    # Last-Modified has whole seconds: until the write's second is over, a
+    # later write could share it and be answered with a stale 304
+    if updated_at.replace(microsecond=0) < datetime.utcnow().replace(microsecond=0):
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        since = request.headers.get("if-modified-since")
+        fresh = since is not None and _not_modified_since(since, last_modified)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,85 @@
+"""p99 latency of authenticated requests under parallel load.
+
+Compares the old behaviour, where ``get_current_user`` ran its sync DB
+lookup on the event loop ("blocking"), with the threadpool offload
+("threadpool"). The token cache is disabled and every user lookup is
+slowed down by ``--delay-ms`` to stand in for a contended SQLite read::
+
+    python -m benchmarks.auth_concurrency --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app import auth, database
+from app.main import app
+from .common import emit, summarize, temp_database_url
+
+
+async def _inline(fn, *args):
+    return fn(*args)
+
+
+async def _run(requests: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        r = await client.post(
+            "/auth/register",
+            json={"email": f"bench-{time.time_ns()}@example.com", "password": "bench"},
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await client.get("/me", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return summarize(latencies, time.perf_counter() - start)
+
+
+def run(requests: int, concurrency: int, delay_ms: float) -> dict:
+    database.init_db(temp_database_url(), migrate=True)
+    load_user = auth._load_user
+
+    def slow_load_user(token, session):
+        time.sleep(delay_ms / 1000)
+        return load_user(token, session)
+
+    original_ttl = auth.token_cache.ttl
+    auth._load_user = slow_load_user
+    auth.token_cache.ttl = 0  # every request pays for the lookup
+    report = {"requests": requests, "concurrency": concurrency, "delay_ms": delay_ms}
+    try:
+        for mode in ("blocking", "threadpool"):
+            offload = auth.run_in_threadpool
+            if mode == "blocking":
+                auth.run_in_threadpool = _inline
+            try:
+                report[mode] = asyncio.run(_run(requests, concurrency))
+            finally:
+                auth.run_in_threadpool = offload
+    finally:
+        auth._load_user = load_user
+        auth.token_cache.ttl = original_ttl
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.auth_concurrency")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.requests, args.concurrency, args.delay_ms), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Throughput of POST /transactions/bulk, end to end and by stage.
+
+Posts ``--batches`` JSON arrays of ``--rows`` transactions each to the
+ASGI app in process (``httpx.AsyncClient``, no server), into an on-disk
+SQLite file, and reports rows per second. Half of every batch after the
+first repeats rows already imported, so ``dedupe`` has work to do. The
+same batch is then run through the stages of ``bulk.import_rows`` one by
+one to show where the time goes::
+
+    python -m benchmarks.bulk_import --rows 10000 --batches 5
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import orjson
+from sqlmodel import Session
+
+from app import auth, bulk, categories, database, rollup, versioning
+from app.main import app
+from app.models import User
+from .common import emit, temp_database_url
+from .seed import CATEGORIES
+
+EMAIL = "bulk@bench.local"
+
+
+def _batch(rng: random.Random, rows: int, start: datetime) -> list:
+    return [
+        {
+            "description": f"Compra {rng.randrange(10_000)}",
+            "amount": round(rng.uniform(5, 500), 2),
+            "kind": "income" if rng.random() < 0.1 else "expense",
+            "category": rng.choice(CATEGORIES),
+            "date": (start + timedelta(minutes=rng.randrange(60 * 24 * 365))).isoformat(),
+            "is_paid": rng.random() < 0.7,
+        }
+        for _ in range(rows)
+    ]
+
+
+async def _post_batches(token: str, batches: list) -> dict:
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    inserted = skipped = 0
+    elapsed = 0.0
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        for items in batches:
+            body = orjson.dumps(items)
+            start = time.perf_counter()
+            r = await client.post("/transactions/bulk?dedupe=true", content=body, headers=headers)
+            elapsed += time.perf_counter() - start
+            r.raise_for_status()
+            inserted += r.json()["inserted"]
+            skipped += r.json()["skipped"]
+    rows = sum(len(items) for items in batches)
+    return {
+        "rows": rows,
+        "inserted": inserted,
+        "skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed),
+    }
+
+
+def _stages(user_id: int, items: list) -> dict:
+    """Time each step of ``import_rows`` on ``items`` (rolled back at the end)."""
+    timings = {}
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    with Session(database.engine) as session:
+        values, _ = timed("validate_ms", bulk.validate_rows, enumerate(items, 1), user_id)
+        unique = timed("dedupe_ms", bulk.drop_duplicates, session, user_id, values)
+        timed("categories_ms", categories.assign, session, user_id, unique)
+        stamp = versioning.stamp(session, user_id)
+        for row in unique:
+            row.update(stamp)
+        timed("insert_ms", bulk.insert_transactions, session, unique)
+        timed("rollup_ms", rollup.add, session, user_id, unique)
+        session.rollback()
+    return timings
+
+
+def run(rows: int, batches: int, seed: int) -> dict:
+    database.init_db(temp_database_url("bulk.db"), migrate=True)
+    # the migrated connection has the migration's copy of the search function
+    database.engine.dispose()
+    with Session(database.engine) as session:
+        user = User(email=EMAIL, hashed_password="x")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    token = auth.create_access_token({"sub": EMAIL, "uid": user_id})
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    posted = []
+    for i in range(batches):
+        items = _batch(rng, rows, start)
+        if posted:
+            # half of the batch was already imported (an overlapping statement)
+            items[: rows // 2] = rng.sample(posted[-1], rows // 2)
+        posted.append(items)
+
+    report = {"rows_per_batch": rows, "batches": batches}
+    report["end_to_end"] = asyncio.run(_post_batches(token, posted))
+    report["stages"] = _stages(user_id, _batch(rng, rows, start))
+    database.engine.dispose()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bulk_import")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.rows, args.batches, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import math
+import statistics
+import tempfile
+from pathlib import Path
+from typing import List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(latencies_s: List[float], elapsed_s: float) -> dict:
+    """Latency percentiles in milliseconds plus throughput."""
+    ms = [x * 1000 for x in latencies_s]
+    return {
+        "requests": len(ms),
+        "throughput_rps": round(len(ms) / elapsed_s, 1) if elapsed_s else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+# upper bounds (ms) of the latency histogram buckets; the last one is open
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def histogram(latencies_s: List[float]) -> dict:
+    """Request counts per latency bucket, keyed like ``"<=10ms"``."""
+    counts = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+    counts[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+    for latency in latencies_s:
+        ms = latency * 1000
+        bound = next((b for b in HISTOGRAM_BUCKETS_MS if ms <= b), None)
+        counts[f"<={bound}ms" if bound else f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+    return counts
+
+
+def temp_database_url(name: str = "bench.db") -> str:
+    directory = Path(tempfile.mkdtemp(prefix="cf-bench-"))
+    return f"sqlite:///{directory / name}"
+
+
+def emit(report: dict, output: str = None) -> None:
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+    print(text)
@@ -0,0 +1,150 @@
+"""Load scenarios against the ASGI app in-process, for local runs and CI.
+
+Seeds a fresh SQLite database (see ``seed``), then drives each scenario
+with ``httpx.AsyncClient`` at a fixed concurrency, spreading requests over
+the seeded users. No server or network is involved. Each scenario reports
+latency percentiles, a histogram, throughput and the number of failed
+(non-2xx) requests::
+
+    python -m benchmarks.scenarios --users 10 --transactions 10000 \\
+        --requests 500 --concurrency 20 --output bench.json
+
+With ``--baseline`` a previous report is compared scenario by scenario and
+the exit status is 1 if any p95 grew by more than ``--tolerance``; that is
+the check to run in CI.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app import auth, database, passwords
+from app.main import app
+from app.ratelimit import RateLimiter
+from .common import emit, histogram, summarize, temp_database_url
+from .seed import PASSWORD, email, seed
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def _scenarios(tokens: List[str]) -> Dict[str, Request]:
+    def headers(i):
+        return {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+
+    async def login(client, i):
+        return await client.post(
+            "/auth/token",
+            data={"username": email(i % len(tokens)), "password": PASSWORD},
+        )
+
+    async def list_page(client, i):
+        return await client.get("/transactions?limit=50", headers=headers(i))
+
+    async def create(client, i):
+        return await client.post(
+            "/transactions",
+            json={"description": f"bench {i}", "amount": 12.5, "category": "Lazer"},
+            headers=headers(i),
+        )
+
+    async def analytics(client, i):
+        return await client.get("/analytics/overview", headers=headers(i))
+
+    return {"login": login, "list": list_page, "create": create, "analytics": analytics}
+
+
+async def _drive(request: Request, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+
+        async def one(i):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await request(client, i)
+                latencies.append(time.perf_counter() - start)
+                if not resp.is_success:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    return dict(summarize(latencies, elapsed), failures=failures, histogram=histogram(latencies))
+
+
+def run(
+    users: int, transactions: int, requests: int, concurrency: int, names: List[str]
+) -> dict:
+    database.init_db(temp_database_url(), migrate=True)
+    user_ids = seed(database.engine, users, transactions)
+    tokens = [
+        auth.create_access_token({"sub": email(i), "uid": uid})
+        for i, uid in enumerate(user_ids)
+    ]
+    scenarios = _scenarios(tokens)
+    report = {
+        "users": users,
+        "transactions_per_user": transactions,
+        "requests": requests,
+        "concurrency": concurrency,
+        "scenarios": {},
+    }
+    limiter = auth.login_limiter
+    auth.login_limiter = RateLimiter(limit=sys.maxsize, window=60)  # one client IP here
+    try:
+        for name in names:
+            auth.token_cache.clear()
+            report["scenarios"][name] = asyncio.run(
+                _drive(scenarios[name], requests, concurrency)
+            )
+    finally:
+        auth.login_limiter = limiter
+        passwords.shutdown()
+    return report
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Scenarios whose p95 exceeds the baseline's by more than ``tolerance``."""
+    found = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before and result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scenarios")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["login", "list", "create", "analytics"],
+        help="repeatable; all scenarios by default",
+    )
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None, help="report JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args(argv)
+    names = args.scenario or ["login", "list", "create", "analytics"]
+    report = run(args.users, args.transactions, args.requests, args.concurrency, names)
+    emit(report, args.output)
+    if args.baseline:
+        found = regressions(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
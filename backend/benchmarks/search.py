@@ -0,0 +1,122 @@
+"""Search latency of one user as the table grows around them.
+
+Every scale has the same rows per user and only adds users, so the
+caller's own data is the same size each time. A search whose cost
+follows the caller's rows keeps its latency; one that reads every
+user's part of the index slows down with the total::
+
+    python -m benchmarks.search --users 20 200 --transactions 5000 \\
+        --queries me merc mercado "pao acucar"
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+
+from app import search, serialization
+from app.database import create_db_engine
+from app.models import Transaction, User
+from app.queries import apply_filters
+from app.schemas import TransactionFilters, TransactionRead
+from .common import emit, temp_database_url
+
+WORDS = (
+    "Mercado", "Mercadinho", "Merenda", "Metrô", "Mecânico", "Farmácia", "Padaria",
+    "Pão", "Açúcar", "Posto", "Uber", "Aluguel", "Academia", "Restaurante", "Lanchonete",
+    "Cinema", "Salário", "Conta", "Luz", "Água", "Internet", "Telefone", "Extra",
+    "Carrefour", "Assaí", "Drogasil", "Shell", "Ipiranga", "Netflix", "Spotify",
+)
+CHUNK_SIZE = 5000
+PAGE_SIZE = 50
+
+
+def _seed(engine, users: int, transactions: int, seed: int) -> None:
+    SQLModel.metadata.create_all(engine)  # also creates the search index
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        session.execute(
+            insert(User.__table__),
+            [
+                {"id": u, "email": f"user{u}@bench.local", "hashed_password": "x",
+                 "created_at": base}
+                for u in range(1, users + 1)
+            ],
+        )
+        # users' rows interleaved by id, as they are written in practice
+        owners = [u for u in range(1, users + 1) for _ in range(transactions)]
+        rng.shuffle(owners)
+        for start in range(0, len(owners), CHUNK_SIZE):
+            session.execute(
+                insert(Transaction.__table__),
+                [
+                    {
+                        "user_id": user_id,
+                        "description": " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+                        + f" {rng.randint(1, 999)}",
+                        "amount": 10.0,
+                        "kind": "expense",
+                        "date": base + timedelta(minutes=start + i),
+                        "is_paid": False,
+                    }
+                    for i, user_id in enumerate(owners[start:start + CHUNK_SIZE])
+                ],
+            )
+        session.commit()
+
+
+def _first_page(session, user_id: int, query: str) -> list:
+    columns = serialization.read_columns(Transaction, TransactionRead)
+    stmt = apply_filters(select(*columns), user_id, TransactionFilters())
+    stmt = search.search_stmt(session, stmt, user_id, query).limit(PAGE_SIZE + 1)
+    return session.exec(stmt).all()
+
+
+def _measure(engine, user_id: int, query: str, repeat: int) -> dict:
+    timings = []
+    with Session(engine) as session:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = _first_page(session, user_id, query)
+            timings.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "rows": len(rows),
+    }
+
+
+def run(scales, transactions: int, queries, repeat: int, seed: int) -> dict:
+    report = {"transactions_per_user": transactions, "repeat": repeat}
+    for users in scales:
+        engine = create_db_engine(temp_database_url(f"search-{users}.db"))
+        start = time.perf_counter()
+        _seed(engine, users, transactions, seed)
+        seeded = time.perf_counter() - start
+        report[f"{users} users"] = {
+            "total_rows": users * transactions,
+            "seed_s": round(seeded, 1),
+            **{q: _measure(engine, 1, q, repeat) for q in queries},
+        }
+        engine.dispose()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.search")
+    parser.add_argument("--users", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--queries", nargs="+", default=["me", "merc", "mercado", "pao acucar"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.users, args.transactions, args.queries, args.repeat, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Deterministic benchmark data: N users x M transactions each.
+
+Every user gets the same password (``PASSWORD``) so scenarios can log in,
+transactions spread over the last three years, one budget per category
+and month, and the rollup table is rebuilt at the end. The same
+``--seed`` always produces the same rows::
+
+    python -m benchmarks.seed --users 10 --transactions 10000 \\
+        --database-url sqlite:///bench.db
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app import categories, database, passwords, rollup
+from app.models import Budget, Transaction, User
+
+PASSWORD = "bench-password"
+CATEGORIES = (
+    "Alimentação",
+    "Transporte",
+    "Moradia",
+    "Lazer",
+    "Saúde",
+    "Educação",
+    None,
+)
+DAYS = 3 * 365
+CHUNK_SIZE = 5000
+
+
+def email(index: int) -> str:
+    return f"user{index}@bench.local"
+
+
+def _transactions(rng: random.Random, user_id: int, count: int, now: datetime, ids: dict):
+    for i in range(count):
+        income = rng.random() < 0.1
+        yield {
+            "user_id": user_id,
+            "description": f"{'Receita' if income else 'Despesa'} {i}",
+            "amount": round(rng.uniform(1000, 8000) if income else rng.uniform(5, 500), 2),
+            "kind": "income" if income else "expense",
+            "category_id": ids.get("Trabalho" if income else rng.choice(CATEGORIES)),
+            "date": now - timedelta(minutes=rng.randrange(DAYS * 24 * 60)),
+            "is_paid": rng.random() < 0.7,
+        }
+
+
+def _insert(session: Session, table, rows) -> None:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            session.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(table), chunk)
+
+
+def seed(engine, users: int, transactions: int, seed: int = 0) -> List[int]:
+    """Insert the data set; returns the new user ids in ``email`` order."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    hashed = passwords.hash_password(PASSWORD)  # one hash for everybody
+    with Session(engine) as session:
+        session.execute(
+            insert(User.__table__),
+            [
+                {"email": email(i), "hashed_password": hashed, "created_at": now}
+                for i in range(users)
+            ],
+        )
+        user_ids = session.exec(
+            select(User.id).where(User.email.in_([email(i) for i in range(users)]))
+            .order_by(User.id)
+        ).all()
+        months = sorted({(now - timedelta(days=d)).strftime("%Y-%m") for d in range(DAYS)})
+        for user_id in user_ids:
+            ids = categories.resolve(session, user_id, CATEGORIES + ("Trabalho",))
+            _insert(
+                session,
+                Transaction.__table__,
+                _transactions(rng, user_id, transactions, now, ids),
+            )
+            _insert(
+                session,
+                Budget.__table__,
+                (
+                    {
+                        "user_id": user_id,
+                        "category_id": ids[category],
+                        "amount": float(rng.randrange(200, 2000, 50)),
+                        "period": month,
+                        "created_at": now,
+                    }
+                    for month in months
+                    for category in CATEGORIES
+                    if category
+                ),
+            )
+        session.commit()
+        rollup.rebuild(session)
+    return list(user_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+    database.init_db(args.database_url, migrate=True)
+    ids = seed(database.engine, args.users, args.transactions, args.seed)
+    print(f"{len(ids)} users x {args.transactions} transactions -> {database.engine.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Serialization cost of a large GET /transactions response.
+
+"validated" mirrors what FastAPI does with ``response_model`` on ORM rows
+(``.dict()``, pydantic validation, ``jsonable_encoder``, stdlib json);
+"fast" is the path the list endpoints use now (column select, plain dicts,
+orjson). Payload sizes are reported raw and gzipped at the level
+``GZipMiddleware`` uses::
+
+    python -m benchmarks.serialization --rows 10000 100000 --repeat 5
+"""
+import argparse
+import gzip
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+
+from app import categories, serialization
+from app.database import create_db_engine
+from app.models import Transaction
+from app.schemas import TransactionRead
+from .common import emit, temp_database_url
+
+
+def _seed(engine, rows: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    base = datetime(2015, 1, 1)
+    with Session(engine) as session:
+        ids = categories.resolve(session, 1, [f"Categoria {k}" for k in range(12)])
+        session.execute(
+            insert(Transaction.__table__),
+            [
+                {
+                    "user_id": 1,
+                    "description": f"Compra no mercado {i}",
+                    "amount": round(i % 500 + 0.99, 2),
+                    "kind": "income" if i % 7 == 0 else "expense",
+                    "category_id": ids[f"Categoria {i % 12}"],
+                    "date": base + timedelta(minutes=37 * i),
+                    "is_paid": i % 3 == 0,
+                    "updated_at": base + timedelta(minutes=37 * i),
+                }
+                for i in range(rows)
+            ],
+        )
+        session.commit()
+
+
+def _validated(session) -> bytes:
+    rows = session.exec(select(Transaction).where(Transaction.user_id == 1)).all()
+    content = [TransactionRead.parse_obj(row.dict()) for row in rows]
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _fast(session) -> bytes:
+    columns = serialization.read_columns(Transaction, TransactionRead)
+    rows = session.exec(select(*columns).where(Transaction.user_id == 1)).all()
+    return ORJSONResponse(serialization.records(rows, TransactionRead)).body
+
+
+def _measure(engine, render, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            body = render(session)
+            timings.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, compresslevel=9)),
+    }
+
+
+def run(sizes, repeat: int) -> dict:
+    report = {"repeat": repeat}
+    for rows in sizes:
+        engine = create_db_engine(temp_database_url(f"ser-{rows}.db"))
+        _seed(engine, rows)
+        validated = _measure(engine, _validated, repeat)
+        fast = _measure(engine, _fast, repeat)
+        report[str(rows)] = {
+            "validated": validated,
+            "fast": fast,
+            "speedup": round(validated["median_ms"] / fast["median_ms"], 1),
+        }
+        engine.dispose()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.rows, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
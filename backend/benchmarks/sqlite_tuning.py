@@ -0,0 +1,130 @@
+"""Concurrent readers and writers against the legacy vs tuned SQLite engine.
+
+"legacy" is the engine the app used to build (default pooling, rollback
+journal, synchronous=FULL); "tuned" is ``database.create_db_engine`` with
+WAL and the other ``SQLITE_PRAGMAS``::
+
+    python -m benchmarks.sqlite_tuning --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import categories
+from app.database import create_db_engine
+from app.models import Transaction
+from .common import emit, summarize, temp_database_url
+
+
+def _seed(engine, rows: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    base = datetime(2020, 1, 1)
+    with Session(engine) as session:
+        ids = categories.resolve(session, 1, [f"cat {k}" for k in range(12)])
+        session.execute(
+            insert(Transaction.__table__),
+            [
+                {
+                    "user_id": 1,
+                    "description": f"seed {i}",
+                    "amount": float(i % 500),
+                    "kind": "income" if i % 7 == 0 else "expense",
+                    "category_id": ids[f"cat {i % 12}"],
+                    "date": base + timedelta(hours=i),
+                    "is_paid": False,
+                }
+                for i in range(rows)
+            ],
+        )
+        session.commit()
+
+
+def _read(session):
+    session.exec(
+        select(Transaction)
+        .where(Transaction.user_id == 1)
+        .order_by(Transaction.date.desc())
+        .limit(50)
+    ).all()
+    session.exec(
+        select(Transaction.kind, func.sum(Transaction.amount))
+        .where(Transaction.user_id == 1)
+        .group_by(Transaction.kind)
+    ).all()
+
+
+def _write(session, i):
+    session.add(Transaction(user_id=1, description=f"w {i}", amount=1.0))
+    session.commit()
+
+
+def _workload(engine, readers: int, writers: int, seconds: float) -> dict:
+    stop = time.perf_counter() + seconds
+    samples = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    lock = threading.Lock()
+
+    def worker(kind):
+        local, failed, i = [], 0, 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    if kind == "read":
+                        _read(session)
+                    else:
+                        _write(session, i)
+                local.append(time.perf_counter() - start)
+            except OperationalError:  # "database is locked"
+                failed += 1
+            i += 1
+        with lock:
+            samples[kind].extend(local)
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=worker, args=("read",)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=("write",)) for _ in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        kind: dict(summarize(samples[kind], elapsed), errors=errors[kind])
+        for kind in ("read", "write")
+    }
+
+
+def run(readers: int, writers: int, seconds: float, rows: int) -> dict:
+    report = {"readers": readers, "writers": writers, "seconds": seconds, "rows": rows}
+    engines = {
+        "legacy": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "tuned": create_db_engine,
+    }
+    for name, factory in engines.items():
+        engine = factory(temp_database_url(f"{name}.db"))
+        _seed(engine, rows)
+        report[name] = _workload(engine, readers, writers, seconds)
+        engine.dispose()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_tuning")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.readers, args.writers, args.seconds, args.rows), args.output)
+
+
+if __name__ == "__main__":
+    main()
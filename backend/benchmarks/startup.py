@@ -0,0 +1,95 @@
+"""Cold start: time until a fresh worker process serves its first request.
+
+Each run is a new interpreter, as with an autoscaled worker. Two modes
+over the same seeded database:
+
+* ``legacy``: what boot used to do: import jose/passlib eagerly, then
+  ``create_all`` plus column/index reflection and the search DDL;
+* ``check``: the current boot: lazy imports and a single schema version
+  query (migrations run beforehand as a separate step).
+
+::
+
+    python -m benchmarks.startup --users 10 --transactions 10000 --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from app import database
+from .common import emit, percentile, temp_database_url
+from .seed import seed
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+mode = sys.argv[1]
+if mode == "legacy":
+    import jose.jwt, passlib.context
+from fastapi.testclient import TestClient
+from app import database
+from app.main import app
+imported = time.perf_counter()
+if mode == "legacy":
+    from sqlmodel import SQLModel
+    from app import migrations, search
+    database.engine = database.create_db_engine()
+    SQLModel.metadata.create_all(database.engine)
+    with database.engine.begin() as conn:
+        migrations.create_missing_columns(conn, SQLModel.metadata)
+        migrations.create_missing_indexes(conn, SQLModel.metadata)
+        search.install(conn)
+else:
+    database.init_db()
+booted = time.perf_counter()
+TestClient(app).get("/metrics").raise_for_status()
+served = time.perf_counter()
+print(json.dumps({
+    "import": imported - start, "schema": booted - imported, "first_request": served - booted,
+}))
+"""
+
+
+def _one(mode: str, url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": url, "RECURRING_INTERVAL_SECONDS": "0"}
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, mode], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def run(users: int, transactions: int, runs: int) -> dict:
+    url = temp_database_url()
+    database.init_db(url, migrate=True)
+    seed(database.engine, users, transactions)
+    database.engine.dispose()
+    report = {"users": users, "transactions": transactions, "runs": runs}
+    for mode in ("legacy", "check"):
+        _one(mode, url)  # warm the OS file cache
+        samples = [_one(mode, url) for _ in range(runs)]
+        # median milliseconds per phase
+        report[mode] = {
+            f"{phase}_ms": round(percentile([s[phase] * 1000 for s in samples], 50), 2)
+            for phase in ("import", "schema", "first_request", "process")
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    emit(run(args.users, args.transactions, args.runs), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect } from 'react'
 import { login, register, getMe } from './api'
+import { clearLocal } from './sync'
 
 const AuthContext = createContext()
 
@@ -58,6 +59,7 @@ export function AuthProvider({ children }) {
     setUser(null)
     setToken(null)
     localStorage.removeItem('token')
+    clearLocal().catch(() => {})
   }
 
   return (
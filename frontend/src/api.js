@@ -41,11 +41,49 @@ export async function createTransaction(token, data) {
   return res.json()
 }
 
-export async function getTransactions(token) {
-  const res = await fetch(`${API_URL}/transactions`, {
+// Returns one newest-first page; pass `nextCursor` back as `cursor` for the next one
+export async function getTransactions(token, params = {}) {
+  const query = new URLSearchParams(params).toString()
+  const res = await fetch(`${API_URL}/transactions${query ? `?${query}` : ''}`, {
     headers: { 'Authorization': `Bearer ${token}` }
   })
   if (!res.ok) throw new Error('Falha ao obter transações')
+  const items = await res.json()
+  items.nextCursor = res.headers.get('X-Next-Cursor')
+  return items
+}
+
+// Busca por descrição (prefixo, sem acentos), mais relevantes primeiro
+export async function searchTransactions(token, q, params = {}) {
+  const query = new URLSearchParams({ ...params, q }).toString()
+  const res = await fetch(`${API_URL}/transactions/search?${query}`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao buscar transações')
+  const items = await res.json()
+  items.nextCursor = res.headers.get('X-Next-Cursor')
+  return items
+}
+
+// operations: [{ op: 'update' | 'delete' | 'pay', ids | filter, values }], tudo ou nada
+export async function batchTransactions(token, operations) {
+  const res = await fetch(`${API_URL}/transactions/batch`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`
+    },
+    body: JSON.stringify({ operations })
+  })
+  if (!res.ok) throw new Error('Falha ao aplicar alterações em lote')
+  return res.json()
+}
+
+export async function getSummary(token) {
+  const res = await fetch(`${API_URL}/summary`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao obter resumo')
   return res.json()
 }
 
@@ -74,6 +112,16 @@ export async function getAnalyticsMonthly(token) {
   return res.json()
 }
 
+// granularity: 'day' | 'week' | 'month' | 'year'; from/to opcionais (ISO, 'to' exclusivo)
+export async function getAnalyticsSeries(token, params = {}) {
+  const query = new URLSearchParams(params).toString()
+  const res = await fetch(`${API_URL}/analytics/series${query ? `?${query}` : ''}`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao obter série')
+  return res.json()
+}
+
 // Budgets
 export async function createBudget(token, data) {
   const res = await fetch(`${API_URL}/budgets`, {
@@ -96,6 +144,16 @@ export async function getBudgets(token) {
   return res.json()
 }
 
+// periods: lista de 'YYYY-MM'; vazia traz todos os períodos
+export async function getBudgetExecution(token, periods = []) {
+  const qs = new URLSearchParams(periods.map(p => ['period', p])).toString()
+  const res = await fetch(`${API_URL}/budgets/execution${qs ? `?${qs}` : ''}`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao obter execução do orçamento')
+  return res.json()
+}
+
 export async function updateBudget(token, id, data) {
   const res = await fetch(`${API_URL}/budgets/${id}` ,{
     method: 'PUT',
@@ -117,3 +175,34 @@ export async function deleteBudget(token, id) {
   if (!res.ok) throw new Error('Falha ao remover orçamento')
   return res.json()
 }
+
+// Recurring transactions
+export async function createRecurringRule(token, data) {
+  const res = await fetch(`${API_URL}/recurring`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`
+    },
+    body: JSON.stringify(data)
+  })
+  if (!res.ok) throw new Error('Falha ao criar recorrência')
+  return res.json()
+}
+
+export async function getRecurringRules(token) {
+  const res = await fetch(`${API_URL}/recurring`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao obter recorrências')
+  return res.json()
+}
+
+export async function deleteRecurringRule(token, id) {
+  const res = await fetch(`${API_URL}/recurring/${id}`, {
+    method: 'DELETE',
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!res.ok) throw new Error('Falha ao remover recorrência')
+  return res.json()
+}
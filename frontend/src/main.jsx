@@ -1,6 +1,7 @@
 import React from 'react'
 import { createRoot } from 'react-dom/client'
 import App from './App'
+import { startBackgroundSync } from './sync'
 import './styles/index.css'
 
 createRoot(document.getElementById('root')).render(
@@ -15,6 +16,7 @@ if (import.meta.env.PROD && 'serviceWorker' in navigator) {
     navigator.serviceWorker.register('/sw.js').catch(err => {
       console.warn('ServiceWorker registration failed:', err)
     })
+    startBackgroundSync(() => localStorage.getItem('token'))
   })
 }
 // In development, ensure any previously registered SW is unregistered
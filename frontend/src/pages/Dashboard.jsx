@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react'
-import { createTransaction, getTransactions, getAnalyticsMonthly, getAnalyticsCategories, getBudgets, createBudget, updateBudget, deleteBudget } from '../api'
+import { createTransaction, getTransactions, getSummary, getAnalyticsMonthly, getAnalyticsCategories, getBudgets, createBudget, updateBudget, deleteBudget } from '../api'
 import { useAuth } from '../AuthContext'
+import { getLocalTransactions, getLocalBudgets } from '../sync'
 import { Line, Bar } from 'react-chartjs-2'
 import {
   Chart as ChartJS,
@@ -16,6 +17,36 @@ import {
 
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, BarElement, Title, Tooltip, Legend)
 
+// Totals of the local copy, the same shapes /summary and /analytics return.
+// Sums run in cents, like the API does.
+function localTotals(rows) {
+  const cents = { income: 0, expense: 0 }
+  const monthly = {}
+  const byCat = {}
+  const add = (totals, key, kind, value) => {
+    totals[key] = totals[key] || { income: 0, expense: 0 }
+    totals[key][kind] += value
+  }
+  for (const tr of rows) {
+    const value = Math.round(tr.amount * 100)
+    cents[tr.kind] += value
+    add(monthly, tr.date.slice(0, 7), tr.kind, value)
+    add(byCat, tr.category || 'Sem categoria', tr.kind, value)
+  }
+  const amounts = totals => Object.fromEntries(Object.entries(totals).map(
+    ([key, t]) => [key, { income: t.income / 100, expense: t.expense / 100 }]
+  ))
+  return {
+    summary: {
+      income: cents.income / 100,
+      expense: cents.expense / 100,
+      balance: (cents.income - cents.expense) / 100,
+    },
+    monthly: amounts(monthly),
+    byCat: amounts(byCat),
+  }
+}
+
 export default function DashboardPage() {
   const { token, user, logout } = useAuth()
   const [transactions, setTransactions] = useState([])
@@ -24,6 +55,7 @@ export default function DashboardPage() {
   const [byCat, setByCat] = useState({})
   const [budgets, setBudgets] = useState([])
   const [loading, setLoading] = useState(true)
+  const [offline, setOffline] = useState(false)
   const [showForm, setShowForm] = useState(false)
   const [formData, setFormData] = useState({
     description: '',
@@ -33,23 +65,25 @@ export default function DashboardPage() {
 
   useEffect(() => {
     loadAll()
+    // back online: replace the local copy with fresh data
+    window.addEventListener('online', loadAll)
+    return () => window.removeEventListener('online', loadAll)
   }, [token])
 
   const loadTransactions = async () => {
     if (!token) return
     setLoading(true)
     try {
-      const data = await getTransactions(token)
+      const [data, totals] = await Promise.all([
+        getTransactions(token, { limit: 50 }),
+        getSummary(token),
+      ])
       setTransactions(data)
-      
-      let income = 0, expense = 0
-      data.forEach(tr => {
-        if (tr.kind === 'income') income += tr.amount
-        else expense += tr.amount
+      setSummary({
+        income: totals.total_income,
+        expense: totals.total_expense,
+        balance: totals.balance,
       })
-      setSummary({ income, expense, balance: income - expense })
-    } catch (err) {
-      console.error(err)
     } finally {
       setLoading(false)
     }
@@ -69,10 +103,32 @@ export default function DashboardPage() {
     setBudgets(list)
   }
 
+  // Without a connection, show the IndexedDB copy kept by sync.js
+  const loadLocal = async () => {
+    const [rows, localBudgets] = await Promise.all([getLocalTransactions(), getLocalBudgets()])
+    const totals = localTotals(rows)
+    setTransactions(rows.slice(0, 50))
+    setSummary(totals.summary)
+    setMonthly(totals.monthly)
+    setByCat(totals.byCat)
+    setBudgets(localBudgets)
+    setOffline(true)
+    setLoading(false)
+  }
+
   const loadAll = async () => {
-    await loadTransactions()
-    await loadAnalytics()
-    await loadBudgets()
+    if (!token) return
+    if (!navigator.onLine) return loadLocal()
+    try {
+      await loadTransactions()
+      await loadAnalytics()
+      await loadBudgets()
+      setOffline(false)
+    } catch (err) {
+      // fetch rejects when the network is gone
+      if (err instanceof TypeError) await loadLocal()
+      else console.error(err)
+    }
   }
 
   const handleAddTransaction = async (e) => {
@@ -113,6 +169,11 @@ export default function DashboardPage() {
       </header>
 
       <main className="max-w-6xl mx-auto p-4">
+        {offline && (
+          <p className="mb-4 p-3 rounded-lg bg-yellow-50 text-yellow-800 text-sm">
+            Sem conexão: mostrando a cópia salva neste dispositivo.
+          </p>
+        )}
         {/* Resumo */}
         <section className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-6">
           <div className="bg-white rounded-xl shadow-sm ring-1 ring-gray-100 p-4">
@@ -0,0 +1,103 @@
+// Local IndexedDB copy of the user's data, kept current through GET /sync.
+// After being offline only the rows changed since the stored cursor travel.
+const API_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000'
+const DB_NAME = 'controle-financeiro'
+const STORES = { transaction: 'transactions', budget: 'budgets' }
+
+function openDb() {
+  return new Promise((resolve, reject) => {
+    const req = indexedDB.open(DB_NAME, 1)
+    req.onupgradeneeded = () => {
+      const db = req.result
+      db.createObjectStore('transactions', { keyPath: 'id' })
+      db.createObjectStore('budgets', { keyPath: 'id' })
+      db.createObjectStore('meta')
+    }
+    req.onsuccess = () => resolve(req.result)
+    req.onerror = () => reject(req.error)
+  })
+}
+
+function done(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+function request(req) {
+  return new Promise((resolve, reject) => {
+    req.onsuccess = () => resolve(req.result)
+    req.onerror = () => reject(req.error)
+  })
+}
+
+async function applyPage(db, page) {
+  const tx = db.transaction(['transactions', 'budgets', 'meta'], 'readwrite')
+  // deletions first: SQLite may reuse the id of a deleted row
+  for (const [entity, ids] of Object.entries(page.deleted)) {
+    const store = tx.objectStore(STORES[entity])
+    ids.forEach(id => store.delete(id))
+  }
+  page.transactions.forEach(tr => tx.objectStore('transactions').put(tr))
+  page.budgets.forEach(b => tx.objectStore('budgets').put(b))
+  tx.objectStore('meta').put(page.cursor, 'cursor')
+  await done(tx)
+}
+
+// Pull every change since the stored cursor; returns the number of rows received
+export async function syncNow(token) {
+  const db = await openDb()
+  let cursor = await request(db.transaction('meta').objectStore('meta').get('cursor'))
+  let received = 0
+  while (true) {
+    const query = cursor ? `?since=${encodeURIComponent(cursor)}` : ''
+    const res = await fetch(`${API_URL}/sync${query}`, {
+      headers: { 'Authorization': `Bearer ${token}` }
+    })
+    if (!res.ok) throw new Error('Falha ao sincronizar')
+    const page = await res.json()
+    await applyPage(db, page)
+    received += page.transactions.length + page.budgets.length
+    cursor = page.cursor
+    if (!page.has_more) return received
+  }
+}
+
+export async function getLocalTransactions() {
+  const db = await openDb()
+  const rows = await request(db.transaction('transactions').objectStore('transactions').getAll())
+  return rows.sort((a, b) => (a.date < b.date ? 1 : a.date > b.date ? -1 : b.id - a.id))
+}
+
+export async function getLocalBudgets() {
+  const db = await openDb()
+  return request(db.transaction('budgets').objectStore('budgets').getAll())
+}
+
+// On logout the local copy belongs to nobody
+export async function clearLocal() {
+  const db = await openDb()
+  const tx = db.transaction(['transactions', 'budgets', 'meta'], 'readwrite')
+  ;['transactions', 'budgets', 'meta'].forEach(name => tx.objectStore(name).clear())
+  await done(tx)
+}
+
+// Sync on reconnect and whenever the service worker asks for it
+export function startBackgroundSync(getToken) {
+  const run = () => {
+    const token = getToken()
+    if (token && navigator.onLine) syncNow(token).catch(err => console.warn(err))
+  }
+  window.addEventListener('online', run)
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.addEventListener('message', event => {
+      if (event.data && event.data.type === 'delta-sync') run()
+    })
+    navigator.serviceWorker.ready
+      .then(reg => reg.sync && reg.sync.register('cf-delta-sync'))
+      .catch(() => {})
+  }
+  run()
+}
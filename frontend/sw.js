@@ -1,7 +1,8 @@
-const CACHE_NAME = 'cf-cache-v1'
+const CACHE_NAME = 'cf-cache-v2'
 const ASSETS = [
   '/',
   '/index.html',
+  '/manifest.webmanifest',
 ]
 
 self.addEventListener('install', event => {
@@ -12,11 +13,38 @@ self.addEventListener('install', event => {
 })
 
 self.addEventListener('activate', event => {
-  event.waitUntil(self.clients.claim())
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys.filter(k => k !== CACHE_NAME).map(k => caches.delete(k))))
+      .then(() => self.clients.claim())
+  )
 })
 
 self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url)
+  // API data lives in IndexedDB (src/sync.js); only the app shell is cached here
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return
+  if (event.request.mode === 'navigate') {
+    event.respondWith(fetch(event.request).catch(() => caches.match('/index.html')))
+    return
+  }
   event.respondWith(
-    caches.match(event.request).then(resp => resp || fetch(event.request))
+    caches.match(event.request).then(resp => resp || fetch(event.request).then(network => {
+      if (network.ok) {
+        const copy = network.clone()
+        caches.open(CACHE_NAME).then(cache => cache.put(event.request, copy))
+      }
+      return network
+    }))
+  )
+})
+
+// Background Sync: the page holds the token, so ask it to pull the delta
+self.addEventListener('sync', event => {
+  if (event.tag !== 'cf-delta-sync') return
+  event.waitUntil(
+    self.clients.matchAll().then(clients =>
+      clients.forEach(client => client.postMessage({ type: 'delta-sync' }))
+    )
   )
 })
@@ -39,6 +39,11 @@ if ($startAll -or $Backend) {
         & $venvPython -m pip install -r $reqFile
     }
 
+    Write-Host "🗄️ Aplicando migrações do banco..." -ForegroundColor Yellow
+    Push-Location $backendDir
+    & $venvPython -m app.migrations
+    Pop-Location
+
     Write-Host "⏳ Iniciando Backend (FastAPI)..." -ForegroundColor Yellow
     $cmd = "cd `"$backendDir`"; & `"$venvPython`" -m uvicorn app.main:app --reload --host 127.0.0.1 --port 8000"
     Start-Process powershell -ArgumentList '-NoExit', '-Command', $cmd | Out-Null